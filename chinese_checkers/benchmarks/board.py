@@ -0,0 +1,114 @@
+import argparse
+import random
+import time
+from copy import deepcopy
+from typing import Callable, List, Tuple, Type
+
+from chinese_checkers.bitboard_game import CCBitboardGame
+from chinese_checkers.game import CCGame
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+"""
+Benchmark of the list of lists board (CCGame) against the bitboard
+backend (CCBitboardGame), on positions sampled from random games.
+
+python -m chinese_checkers.benchmarks.board --board_size 9
+"""
+
+Position = Tuple[List[List[int]], int]
+
+
+def sample_positions(width: int,
+                     player_row_span: int,
+                     n_positions: int,
+                     seed: int = 1) -> List[Position]:
+    """
+    Plays random games and returns (board, player turn) snapshots
+    """
+    rnd = random.Random(seed)
+    positions: List[Position] = []
+    while len(positions) < n_positions:
+        game = CCGame(width=width, player_row_span=player_row_span)
+        for _ in range(0, 4 * width):
+            moves = CCReasoner.available_moves(game, game.player_turn)
+            game.apply_move_sequence(rnd.choice(moves))
+            if game.state() != 0:
+                break
+            positions.append((deepcopy(game.board), game.player_turn))
+    return positions[:n_positions]
+
+
+def load(game_class: Type[CCGame],
+         width: int,
+         player_row_span: int,
+         position: Position) -> CCGame:
+    board, turn = position
+    game = game_class(width=width, player_row_span=player_row_span)
+    game.set_board(deepcopy(board))
+    if game.player_turn != turn:
+        game.rotate_turn()
+    return game
+
+
+def timed(function: Callable, games: List[CCGame], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        for game in games:
+            function(game)
+    return time.perf_counter() - start
+
+
+def all_destinations(game: CCGame):
+    """Destinations of every piece of the player to move"""
+    if isinstance(game, CCBitboardGame):
+        return [game.destinations(row, column)
+                for row, column in game.positions(
+                    game.pieces[game.player_turn])]
+    moves = CCReasoner.available_moves(game, game.player_turn)
+    return set((move.board_positions[0], move.board_positions[-1])
+               for move in moves)
+
+
+def run(width: int, player_row_span: int, n_positions: int, repeat: int):
+    positions = sample_positions(width, player_row_span, n_positions)
+
+    benchmarks = [
+        ('available_moves',
+         lambda game: CCReasoner.available_moves(game, game.player_turn),
+         repeat),
+        ('destinations', all_destinations, repeat),
+        ('packed_moves',
+         lambda game: list(CCReasoner.generate_packed_moves(
+             game, game.player_turn)),
+         repeat * 10),
+        ('state', lambda game: game.state(), repeat * 100),
+        ('select_move',
+         lambda game: MinMaxStrategy(steps=1).select_move(
+             game, game.player_turn),
+         1),
+    ]
+
+    print(f'board_size={width} player_row_span={player_row_span} '
+          f'positions={len(positions)}')
+    print(f'{"benchmark":<16}{"CCGame":>12}{"CCBitboardGame":>16}'
+          f'{"speedup":>10}')
+    for name, function, times in benchmarks:
+        results = []
+        for game_class in [CCGame, CCBitboardGame]:
+            games = [load(game_class, width, player_row_span, position)
+                     for position in positions]
+            results.append(timed(function, games, times))
+        print(f'{name:<16}{results[0]:>11.3f}s{results[1]:>15.3f}s'
+              f'{results[0] / results[1]:>9.2f}x')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--board_size", type=int, default=9)
+    parser.add_argument("--player_row_span", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    run(args.board_size, args.player_row_span, args.positions, args.repeat)
@@ -0,0 +1,125 @@
+import argparse
+import time
+from typing import List, Tuple
+
+from chinese_checkers.benchmarks.board import sample_positions, load
+from chinese_checkers.game import CCGame
+from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+"""
+Leaf evaluation throughput of MinMaxStrategy, evaluating the moves right
+above the leaves one by one (making, scoring and undoing each of them)
+against all at once (batch_leaves), on positions sampled from random
+games. Both on their own, and as part of whole searches (where alpha-beta
+pruning would have skipped some of the leaves evaluated in batches).
+
+python -m chinese_checkers.benchmarks.leaves --board_size 9 --steps 1 2
+"""
+
+
+def leaf_times(game: CCGame, repeat: int) -> Tuple[int, float, float]:
+    """
+    Returns: tuple
+        - position 0: moves of the player to move
+        - position 1: seconds to evaluate all of them one by one
+        - position 2: seconds to evaluate all of them in a batch
+    """
+    heuristic = OptimizedCombinedHeuristic()
+    game.add_visitor(heuristic)
+    strategy = MinMaxStrategy(heuristic=heuristic, batch_leaves=True)
+    player = game.player_turn
+    moves = strategy._ordered_moves(game, player, 0)
+
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        for move in moves:
+            game.make_move(move)
+            game.rotate_turn()
+            if strategy._end_score(game, player, 0) is None:
+                strategy._leaf_score(game, player, 0)
+            game.rotate_turn()
+            game.unmake_move()
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        strategy._batch_leaf_scores(game, player, 0, moves)
+    batch = time.perf_counter() - start
+    return (len(moves), one_by_one, batch)
+
+
+def run(width: int,
+        player_row_span: int,
+        n_positions: int,
+        steps_list: List[int]):
+    positions = sample_positions(width, player_row_span, n_positions)
+
+    repeat = 100
+    leaves = 0
+    one_by_one = 0.0
+    batch = 0.0
+    for position in positions:
+        game = load(CCGame, width, player_row_span, position)
+        n_moves, one_by_one_time, batch_time = leaf_times(game, repeat)
+        leaves += n_moves * repeat
+        one_by_one += one_by_one_time
+        batch += batch_time
+    print(f'{len(positions)} positions, {leaves / len(positions) / repeat:.1f}'
+          f' moves per position')
+    print(f'one by one: {leaves / one_by_one:.0f} leaves/s')
+    print(f'     batch: {leaves / batch:.0f} leaves/s, '
+          f'{one_by_one / batch:.2f}x')
+
+    for steps in steps_list:
+        print(f'{len(positions)} positions, {steps * 2} plies')
+        scores = {}
+        for batch_leaves in [False, True]:
+            nodes = 0
+            elapsed = 0.0
+            scores[batch_leaves] = []
+            for position in positions:
+                game = load(CCGame, width, player_row_span, position)
+                heuristic = OptimizedCombinedHeuristic()
+                game.add_visitor(heuristic)
+                strategy = MinMaxStrategy(steps=steps,
+                                          pre_sort_moves=True,
+                                          heuristic=heuristic,
+                                          batch_leaves=batch_leaves)
+                start = time.perf_counter()
+                _, score = strategy._select_move(game, game.player_turn, 0,
+                                                 -100000.0, 100000.0)
+                elapsed += time.perf_counter() - start
+                nodes += strategy.search_stats.nodes
+                scores[batch_leaves].append(score)
+            name = 'batch' if batch_leaves else 'one by one'
+            print(f'{name:>10}: {elapsed:.2f}s, {nodes} nodes, '
+                  f'{nodes / elapsed:.0f} nodes/s')
+        print(f'same scores: {scores[False] == scores[True]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=5,
+        help="Length of the longest row of the board.")
+    parser.add_argument(
+        "--player_row_span",
+        type=int,
+        default=3,
+        help="How many rows each player spans.")
+    parser.add_argument(
+        "--positions",
+        type=int,
+        default=20,
+        help="Number of positions searched.")
+    parser.add_argument(
+        "--steps",
+        type=int,
+        nargs='+',
+        default=[1, 2],
+        help="Steps (own move plus reply) the strategy searches.")
+    args = parser.parse_args()
+    run(args.board_size, args.player_row_span, args.positions, args.steps)
@@ -0,0 +1,103 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+from chinese_checkers.benchmarks.board import load, sample_positions
+from chinese_checkers.game import CCGame
+from chinese_checkers.move import CCMove
+from chinese_checkers.reasoner import CCReasoner
+
+"""
+Benchmark of the memory and allocations used by CCMove objects compared
+to packed (int) moves, as generated per search node and as stored in a
+transposition table.
+
+python -m chinese_checkers.benchmarks.moves --board_size 9
+"""
+
+
+def deep_size(move) -> int:
+    """
+    Approximate number of bytes held by a move (shared objects like small
+    ints and CCMovement members are not counted)
+    """
+    if not isinstance(move, CCMove):
+        return sys.getsizeof(move)
+    return (sys.getsizeof(move) +
+            sys.getsizeof(move.__dict__) +
+            sys.getsizeof(move.board_positions) +
+            sum(sys.getsizeof(position)
+                for position in move.board_positions) +
+            sys.getsizeof(move.directions))
+
+
+def traced(function: Callable[[], list]):
+    """
+    Returns the (result, bytes still allocated, allocated blocks, seconds)
+    of calling function
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff
+                 for stat in after.compare_to(before, 'filename'))
+    return result, current, blocks, elapsed
+
+
+def run(width: int, player_row_span: int, n_positions: int):
+    positions = sample_positions(width, player_row_span, n_positions)
+    games: List[CCGame] = [load(CCGame, width, player_row_span, position)
+                           for position in positions]
+
+    print(f'board_size={width} player_row_span={player_row_span} '
+          f'nodes={len(games)}')
+    print(f'{"":<22}{"CCMove":>14}{"packed":>14}')
+
+    generators = [CCReasoner.generate_moves,
+                  CCReasoner.generate_packed_moves]
+    results = [
+        traced(lambda: [list(generate(game, game.player_turn))
+                        for game in games])
+        for generate in generators]
+    n_moves = sum(len(moves) for moves in results[0][0])
+
+    sizes = [sum(deep_size(move) for moves in result[0] for move in moves)
+             for result in results]
+    print(f'{"bytes per move":<22}'
+          f'{sizes[0] / n_moves:>14.1f}{sizes[1] / n_moves:>14.1f}')
+    print(f'{"bytes per node":<22}'
+          f'{results[0][1] / len(games):>14.1f}'
+          f'{results[1][1] / len(games):>14.1f}')
+    print(f'{"allocations per node":<22}'
+          f'{results[0][2] / len(games):>14.1f}'
+          f'{results[1][2] / len(games):>14.1f}')
+    print(f'{"usec per node":<22}'
+          f'{1e6 * results[0][3] / len(games):>14.1f}'
+          f'{1e6 * results[1][3] / len(games):>14.1f}')
+
+    # transposition table entries (best move, score, depth) keep their
+    # move alive after the node is gone
+    entries = [[(moves[0], 0.5, 2) for moves in result[0] if moves]
+               for result in results]
+    entry_sizes = [sum(sys.getsizeof(entry) + deep_size(entry[0])
+                       for entry in tt_entries) / len(tt_entries)
+                   for tt_entries in entries]
+    print(f'{"bytes per TT entry":<22}'
+          f'{entry_sizes[0]:>14.1f}{entry_sizes[1]:>14.1f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--board_size", type=int, default=9)
+    parser.add_argument("--player_row_span", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=200)
+
+    args = parser.parse_args()
+    run(args.board_size, args.player_row_span, args.positions)
@@ -0,0 +1,93 @@
+import argparse
+import time
+from copy import deepcopy
+from typing import Dict, List, Tuple
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+"""
+Benchmark of the move ordering and principal variation search options of
+MinMaxStrategy: positions visited and time spent by fixed depth searches
+on the test positions of tests/constants.py (run from the root of the
+repository).
+
+python -m chinese_checkers.benchmarks.ordering --steps 2
+"""
+
+CONFIGS: Dict[str, dict] = {
+    'alpha-beta': {},
+    'pre-sort': {'pre_sort_moves': True},
+    'pre-sort + tt': {'pre_sort_moves': True,
+                      'transposition_table': True},
+    'ordering': {'move_ordering': True},
+    'ordering + tt': {'move_ordering': True,
+                      'transposition_table': True},
+    'ordering + pre-sort + tt': {'move_ordering': True,
+                                 'pre_sort_moves': True,
+                                 'transposition_table': True},
+    'pvs': {'pvs': True},
+    'pvs + pre-sort + tt': {'pvs': True,
+                            'pre_sort_moves': True,
+                            'transposition_table': True},
+    'pvs + ordering + pre-sort + tt': {'pvs': True,
+                                       'move_ordering': True,
+                                       'pre_sort_moves': True,
+                                       'transposition_table': True},
+}
+
+
+def test_positions(steps: int) -> List[Tuple[str, CCGame]]:
+    """
+    Ongoing games of tests/constants.py, with each player to move, in
+    which the strategy would search a min/max tree
+    """
+    from tests import constants
+
+    positions = []
+    for name in sorted(dir(constants)):
+        if not name.startswith('TEST_BOARD'):
+            continue
+        for player in [1, 2]:
+            game = CCGame(width=5, player_row_span=3)
+            game.set_board(deepcopy(getattr(constants, name)))
+            if game.player_turn != player:
+                game.rotate_turn()
+            if(game.state() == 0 and
+               not MinMaxStrategy(steps=steps)._use_only_max(game)):
+                positions.append((f'{name} ({player})', game))
+    return positions
+
+
+def run(steps: int):
+    positions = test_positions(steps)
+    print(f'{len(positions)} positions, {steps * 2} plies')
+
+    baseline = None
+    for config_name, config in CONFIGS.items():
+        nodes = 0
+        researches = 0
+        start = time.perf_counter()
+        for _, game in positions:
+            # a fresh strategy per position, tables are not shared
+            strategy = MinMaxStrategy(steps=steps, **config)
+            strategy.select_move(game, game.player_turn)
+            nodes += strategy.search_stats.nodes
+            researches += strategy.search_stats.researches
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = nodes
+        print(f'{config_name:>32}: {nodes:>9} nodes '
+              f'({nodes / baseline:.2f}x), {elapsed:.2f}s, '
+              f'{researches} researches')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=2,
+        help="Steps (own move plus reply) the strategies search.")
+    args = parser.parse_args()
+    run(args.steps)
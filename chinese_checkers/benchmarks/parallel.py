@@ -0,0 +1,99 @@
+import argparse
+import os
+import time
+from typing import List
+
+from chinese_checkers.benchmarks.board import sample_positions, load
+from chinese_checkers.game import CCGame
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+"""
+Speedup of the parallel root search of MinMaxStrategy against the number
+of worker processes, on positions sampled from random games.
+
+python -m chinese_checkers.benchmarks.parallel --steps 2 3 \
+    --workers 1 2 4 8 16
+"""
+
+
+def min_max_positions(width: int,
+                      player_row_span: int,
+                      n_positions: int,
+                      steps: int) -> List[CCGame]:
+    """
+    Positions in which the strategy would search a min/max tree
+    """
+    games = [load(CCGame, width, player_row_span, position)
+             for position in sample_positions(width, player_row_span,
+                                              10 * n_positions)]
+    games = [game for game in games
+             if not MinMaxStrategy(steps=steps)._use_only_max(game)]
+    return games[:n_positions]
+
+
+def run(width: int,
+        player_row_span: int,
+        n_positions: int,
+        steps_list: List[int],
+        workers_list: List[int]):
+    print(f'{os.cpu_count()} cpus')
+    for steps in steps_list:
+        games = min_max_positions(width, player_row_span, n_positions, steps)
+        print(f'{len(games)} positions, {steps * 2} plies')
+        sequential = None
+        for workers in workers_list:
+            strategy = MinMaxStrategy(steps=steps,
+                                      pre_sort_moves=True,
+                                      transposition_table=True,
+                                      move_ordering=True,
+                                      pvs=True,
+                                      workers=workers)
+            # start the worker processes before timing
+            strategy.select_move(games[0], games[0].player_turn)
+
+            nodes = 0
+            start = time.perf_counter()
+            for game in games:
+                strategy.select_move(game, game.player_turn)
+                nodes += strategy.search_stats.nodes
+            elapsed = time.perf_counter() - start
+            strategy.close()
+
+            if sequential is None:
+                sequential = elapsed
+            print(f'{workers:>3} workers: {elapsed:.2f}s, '
+                  f'{sequential / elapsed:.2f}x speedup, {nodes} nodes')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=5,
+        help="Length of the longest row of the board.")
+    parser.add_argument(
+        "--player_row_span",
+        type=int,
+        default=3,
+        help="How many rows each player spans.")
+    parser.add_argument(
+        "--positions",
+        type=int,
+        default=4,
+        help="Number of positions searched.")
+    parser.add_argument(
+        "--steps",
+        type=int,
+        nargs='+',
+        default=[2, 3],
+        help="Steps (own move plus reply) the strategy searches.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs='+',
+        default=[1, 2, 4, 8, 16],
+        help="Numbers of worker processes to compare.")
+    args = parser.parse_args()
+    run(args.board_size, args.player_row_span, args.positions, args.steps,
+        args.workers)
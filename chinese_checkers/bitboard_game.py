@@ -0,0 +1,296 @@
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+from chinese_checkers.game import CCGame, ListOfGameVisitors
+from chinese_checkers.geometry import CCGeometry, OFF_BOARD, board_geometry
+from chinese_checkers.move import pack_move, MOVE_CELL_BITS, MOVE_CELL_MASK
+from chinese_checkers.movement import CCMovement
+
+"""
+Bitboard backend for CCGame.
+
+Each player's pieces are kept as a single python int, one bit per cell.
+Bits are laid out on a padded, skewed grid in which the six movement
+directions become constant shifts: row r of the board is stored at
+r * (width + 1) and the column is skewed by (r - half_board) on the lower
+half of the board. The extra column of padding guarantees that shifting
+across the edge of a row never lands on a valid cell.
+"""
+
+
+class CCBitboardTables:
+    """
+    Shift/mask tables of the bitboard layout for a board of a given size.
+    """
+
+    def __init__(self, geometry: CCGeometry):
+        self.stride = geometry.width + 1
+        stride = self.stride
+
+        self.cell_bit: List[int] = []
+        for cell in range(0, geometry.n_cells):
+            row, column = geometry.position(cell)
+            skew = max(0, row - geometry.half_board)
+            self.cell_bit.append(row * stride + column + skew)
+        self.bit_cell = {bit: cell for cell, bit in enumerate(self.cell_bit)}
+        # destination part of the packed moves (see move.pack_move) to
+        # every bit
+        self.bit_destinations = {
+            bit: pack_move(0, cell) for bit, cell in self.bit_cell.items()}
+
+        # single-bit mask of every (row, column) position of the board
+        self.position_masks = [
+            [1 << self.cell_bit[geometry.cell(row, column)]
+             for column in range(0, length)]
+            for row, length in enumerate(geometry.row_lengths)]
+
+        # single-bit mask of every cell
+        self.cell_masks = [1 << bit for bit in self.cell_bit]
+
+        self.board_mask = 0
+        for bit in self.cell_bit:
+            self.board_mask |= 1 << bit
+
+        # (left shift, right shift) of each direction, in DIRECTIONS order
+        offsets = {
+            CCMovement.L: -1,
+            CCMovement.R: 1,
+            CCMovement.LN: -(stride + 1),
+            CCMovement.RN: -stride,
+            CCMovement.LS: stride,
+            CCMovement.RS: stride + 1,
+        }
+        self.shifts = tuple(
+            (max(0, offsets[movement]), max(0, -offsets[movement]))
+            for movement in CCMovement)
+
+        # neighbors of every cell, indexed by its bit
+        self.step_masks: Dict[int, int] = {}
+        for cell, bit in enumerate(self.cell_bit):
+            self.step_masks[bit] = 0
+            for neighbor in geometry.neighbors[cell]:
+                if neighbor != OFF_BOARD:
+                    self.step_masks[bit] |= 1 << self.cell_bit[neighbor]
+
+
+@lru_cache(maxsize=None)
+def bitboard_tables(width: int, player_row_span: int) -> CCBitboardTables:
+    return CCBitboardTables(board_geometry(width, player_row_span))
+
+
+class CCBitboardGame(CCGame):
+    """
+    CCGame that additionally tracks the pieces of each player as bitsets,
+    so that occupancy tests, move generation and win detection are reduced
+    to a few bitwise operations.
+
+    The list of lists board is still kept up to date (heuristics and the
+    GUI read it), so this class can be used anywhere a CCGame is expected.
+    Note: like the goal counts of CCGame, the bitsets are only rebuilt by
+    set_board.
+    """
+
+    def __init__(self,
+                 width: int = 5,
+                 player_row_span=3,
+                 visitors: ListOfGameVisitors = []):
+        self.tables = bitboard_tables(width, player_row_span)
+        super().__init__(width, player_row_span, visitors)
+
+    def set_board(self, board: list):
+        self.board = board
+        self._build_pieces()
+        super().set_board(board)
+
+    def _build_pieces(self):
+        # pieces of each player (index 0 unused)
+        self.pieces = [0, 0, 0]
+        for row in range(0, len(self.board)):
+            for column in range(0, len(self.board[row])):
+                if self.board[row][column]:
+                    self.pieces[self.board[row][column]] |= (
+                        self.tables.position_masks[row][column])
+
+    def shift(self, bits: int, movement: CCMovement) -> int:
+        """
+        Moves all the bits one position in the direction of the movement,
+        dropping the ones that leave the board
+        """
+        left, right = self.tables.shifts[movement.value - 1]
+        return ((bits << left) >> right) & self.tables.board_mask
+
+    def empty(self) -> int:
+        return self.tables.board_mask & ~(self.pieces[1] | self.pieces[2])
+
+    def positions(self, bits: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the (row, column) positions of the bits set
+        """
+        geometry = self.geometry
+        bit_cell = self.tables.bit_cell
+        while bits:
+            lowest = bits & -bits
+            cell = bit_cell[lowest.bit_length() - 1]
+            yield (geometry.cell_row[cell], geometry.cell_column[cell])
+            bits ^= lowest
+
+    def step_destinations(self, row: int, column: int) -> int:
+        """
+        Bitset of empty positions reachable from (row, column) with a
+        single step
+        """
+        origin = self.tables.position_masks[row][column]
+        empty = self.empty()
+        mask = self.tables.board_mask
+        destinations = 0
+        for left, right in self.tables.shifts:
+            destinations |= ((origin << left) >> right) & mask
+        return destinations & empty
+
+    def jump_destinations(self, row: int, column: int) -> int:
+        """
+        Bitset of positions reachable from (row, column) by a sequence of
+        one or more jumps. The position of the moving piece is considered
+        empty, and is never part of the result.
+        """
+        origin = self.tables.position_masks[row][column]
+        return self._jumps(origin, (self.pieces[1] | self.pieces[2]) &
+                           ~origin)
+
+    def _jumps(self, origin: int, occupied: int) -> int:
+        """
+        jump_destinations of the piece at the origin bit, occupied being
+        the rest of the pieces
+        """
+        # the shifts of the six directions, unrolled (see
+        # CCBitboardTables.shifts)
+        row = self.tables.stride
+        row_1 = row + 1
+        empty = self.tables.board_mask & ~occupied
+        reached = origin
+        frontier = origin
+        while frontier:
+            landed = ((((frontier >> 1) & occupied) >> 1) |
+                      (((frontier << 1) & occupied) << 1) |
+                      (((frontier >> row_1) & occupied) >> row_1) |
+                      (((frontier >> row) & occupied) >> row) |
+                      (((frontier << row) & occupied) << row) |
+                      (((frontier << row_1) & occupied) << row_1)) & empty
+            frontier = landed & ~reached
+            reached |= frontier
+        return reached & ~origin
+
+    def destinations(self, row: int, column: int) -> int:
+        """
+        Bitset of all the positions the piece at (row, column) can end its
+        move at
+        """
+        return (self.step_destinations(row, column) |
+                self.jump_destinations(row, column))
+
+    def packed_moves(self, player: int) -> Iterator[int]:
+        """
+        Packed moves (see move.pack_move) of the player, as generated by
+        CCReasoner.generate_packed_moves: the destinations of every piece
+        are found with bitwise operations, and yielded in cell order
+        """
+        tables = self.tables
+        bit_cell = tables.bit_cell
+        bit_destinations = tables.bit_destinations
+        step_masks = tables.step_masks
+        occupied = self.pieces[1] | self.pieces[2]
+        empty = tables.board_mask & ~occupied
+        can_step = not self.player_can_only_jump
+        pieces = self.pieces[player]
+
+        # pieces that can jump at all, found for all of them at once, so
+        # that only those have to be flood filled
+        row = tables.stride
+        row_1 = row + 1
+        jumpers = pieces & (
+            ((((empty << 1) & occupied) << 1) |
+             (((empty >> 1) & occupied) >> 1) |
+             (((empty << row_1) & occupied) << row_1) |
+             (((empty << row) & occupied) << row) |
+             (((empty >> row) & occupied) >> row) |
+             (((empty >> row_1) & occupied) >> row_1)))
+
+        while pieces:
+            origin = pieces & -pieces
+            pieces ^= origin
+            bit = origin.bit_length() - 1
+            destinations = (step_masks[bit] & empty) if can_step else 0
+            if origin & jumpers:
+                destinations |= self._jumps(origin, occupied & ~origin)
+            origin_cell = bit_cell[bit]
+            while destinations:
+                dest = destinations & -destinations
+                destinations ^= dest
+                yield origin_cell | bit_destinations[dest.bit_length() - 1]
+
+    def _can_jump(self, row: int, column: int, movement: CCMovement):
+        left, right = self.tables.shifts[movement.value - 1]
+        mask = self.tables.board_mask
+        dest = ((self.tables.position_masks[row][column] << left)
+                >> right) & mask
+        dest = ((dest << left) >> right) & mask
+        return dest != 0 and not dest & (self.pieces[1] | self.pieces[2])
+
+    def can_move(self, row: int, column: int, movement: CCMovement):
+        left, right = self.tables.shifts[movement.value - 1]
+        mask = self.tables.board_mask
+        occupied = self.pieces[1] | self.pieces[2]
+        dest = ((self.tables.position_masks[row][column] << left)
+                >> right) & mask
+        if not dest:
+            return False
+        if dest & occupied:
+            # only allowed if we can jump this piece
+            dest = ((dest << left) >> right) & mask
+            return dest != 0 and not dest & occupied
+        return not self.player_can_only_jump
+
+    # make_move and unmake_move are those of CCGame, with the bitsets
+    # updated along with the board (not calling them saves a call per
+    # node of the search)
+    def make_move(self, move: int):
+        geometry = self.geometry
+        origin = move & MOVE_CELL_MASK
+        dest = move >> MOVE_CELL_BITS
+        from_row = geometry.cell_row[origin]
+        from_column = geometry.cell_column[origin]
+        dest_row = geometry.cell_row[dest]
+        dest_column = geometry.cell_column[dest]
+
+        board = self.board
+        player = board[from_row][from_column]
+        board[dest_row][dest_column] = player
+        board[from_row][from_column] = 0
+        masks = self.tables.cell_masks
+        self.pieces[player] ^= masks[origin] | masks[dest]
+        self._update_goal_pieces(player, from_row, dest_row)
+        self.move_history.append(move)
+
+        for listener in self._move_listeners:
+            listener(from_row, from_column, dest_row, dest_column, player)
+
+    def unmake_move(self):
+        geometry = self.geometry
+        move = self.move_history.pop()
+        origin = move >> MOVE_CELL_BITS
+        dest = move & MOVE_CELL_MASK
+        from_row = geometry.cell_row[origin]
+        from_column = geometry.cell_column[origin]
+        dest_row = geometry.cell_row[dest]
+        dest_column = geometry.cell_column[dest]
+
+        board = self.board
+        player = board[from_row][from_column]
+        board[dest_row][dest_column] = player
+        board[from_row][from_column] = 0
+        masks = self.tables.cell_masks
+        self.pieces[player] ^= masks[origin] | masks[dest]
+        self._update_goal_pieces(player, from_row, dest_row)
+
+        for listener in self._move_listeners:
+            listener(from_row, from_column, dest_row, dest_column, player)
@@ -0,0 +1,123 @@
+import argparse
+import time
+from typing import Dict, List
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.helpers import CCZobristHash
+from chinese_checkers.move import move_origin, move_destination
+from chinese_checkers.record_file import write_record_file
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.opening_book import (
+    BOOK_METADATA, BOOK_VALUE_FORMAT
+)
+
+"""
+Builds an opening book (see CCOpeningBook) offline: starting from the
+initial position, every position reached in the first plies is searched
+deeply for its best move. Positions are expanded with the best move and
+the moves that advance the most, the ones players are likely to play.
+
+python -m chinese_checkers.build_opening_book --board_size 5 \
+    --player_row_span 3 --plies 8 --steps 3 --output book.bin
+"""
+
+
+def candidate_moves(game: CCGame, best_move: int, branching: int):
+    """
+    The best move plus the branching - 1 moves that advance the most
+    """
+    cell_row = game.geometry.cell_row
+    direction = 1 if game.player_turn == 1 else -1
+    moves = sorted(
+        (move for move in MinMaxStrategy.generate_packed_moves(
+            game, game.player_turn) if move != best_move),
+        key=lambda move: -direction * (cell_row[move_destination(move)] -
+                                       cell_row[move_origin(move)]))
+    return [best_move] + moves[:branching - 1]
+
+
+def build(width: int,
+          player_row_span: int,
+          plies: int,
+          steps: int,
+          branching: int) -> Dict[int, int]:
+    """
+    Returns the book, as a dict of position hash to best (packed) move
+    """
+    strategy = MinMaxStrategy(steps=steps,
+                              pre_sort_moves=True,
+                              transposition_table=True,
+                              move_ordering=True,
+                              pvs=True)
+    book: Dict[int, int] = {}
+    frontier = [CCGame(width=width, player_row_span=player_row_span)]
+    for ply in range(0, plies):
+        start = time.time()
+        next_frontier: List[CCGame] = []
+        seen = set()
+        for game in frontier:
+            key = CCZobristHash.of(game).get_hash(game)
+            if key in book:
+                continue
+            move = strategy.packed_move(
+                game, strategy.select_move(game, game.player_turn))
+            book[key] = move
+
+            for candidate in candidate_moves(game, move, branching):
+                child = CCGame.deserialize(game.serialize())
+                child.apply_move_sequence(
+                    strategy.unpack_move(child, candidate))
+                position = child.serialize()
+                if child.state() == 0 and position not in seen:
+                    seen.add(position)
+                    next_frontier.append(child)
+        print(f'Ply {ply}: {len(frontier)} positions, '
+              f'{time.time() - start:.1f}s')
+        frontier = next_frontier
+    return book
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=5,
+        help="Length of the longest row of the board.")
+    parser.add_argument(
+        "--player_row_span",
+        type=int,
+        default=3,
+        help="How many rows each player spans.")
+    parser.add_argument(
+        "--plies",
+        type=int,
+        default=8,
+        help="Number of moves (of both players) covered by the book.")
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=3,
+        help="Steps (own move plus reply) searched for every position.")
+    parser.add_argument(
+        "--branching",
+        type=int,
+        default=3,
+        help="Moves of every position added to the book.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="opening_book.bin",
+        help="Path of the book file.")
+    args = parser.parse_args()
+
+    book = build(args.board_size, args.player_row_span, args.plies,
+                 args.steps, args.branching)
+    write_record_file(args.output,
+                      book.items(),
+                      BOOK_VALUE_FORMAT,
+                      BOOK_METADATA.pack(args.board_size,
+                                         args.player_row_span,
+                                         # keys of CCZobristHash.of
+                                         0))
+    print(f'{len(book)} positions written to {args.output}')
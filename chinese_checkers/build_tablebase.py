@@ -0,0 +1,112 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set
+
+from chinese_checkers.record_file import write_record_file
+from chinese_checkers.strategy.tablebase import (
+    CCRaceGeometry, TABLEBASE_METADATA, TABLEBASE_VALUE_FORMAT,
+    check_board_size, race_geometry
+)
+
+"""
+Builds the race tablebase (see strategy/tablebase.py) by retrograde
+analysis: moves can always be undone, so the placements at distance n + 1
+of the goal are the successors of the ones at distance n not found yet.
+The search starts from the goal filled, and each layer is expanded in
+parallel by several processes.
+
+python -m chinese_checkers.build_tablebase --board_size 5 \
+    --player_row_span 3 --max_distance 12 --output tablebase.bin
+"""
+
+# race geometry of each worker process
+_race: CCRaceGeometry = None
+
+
+def _init_worker(width: int, player_row_span: int):
+    global _race
+    _race = race_geometry(width, player_row_span)
+
+
+def _expand(masks: List[int]) -> Set[int]:
+    successors = set()
+    for mask in masks:
+        for _, successor in _race.successors(mask):
+            successors.add(successor)
+    return successors
+
+
+def build(width: int,
+          player_row_span: int,
+          max_distance: int,
+          workers: int = 1) -> Dict[int, int]:
+    """
+    Returns the distance to the goal of every placement of the pieces of
+    player 1 up to max_distance moves away from it. Raises ValueError if
+    the board is too big to be stored in a tablebase file.
+    """
+    check_board_size(width, player_row_span)
+    distances = {race_geometry(width, player_row_span).goal: 0}
+    layer = list(distances)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(width, player_row_span)) as pool:
+        for distance in range(1, max_distance + 1):
+            start = time.time()
+            chunk_size = max(1, len(layer) // (4 * workers))
+            chunks = [layer[i:i + chunk_size]
+                      for i in range(0, len(layer), chunk_size)]
+            next_layer = []
+            for successors in pool.map(_expand, chunks):
+                for mask in successors:
+                    if mask not in distances:
+                        distances[mask] = distance
+                        next_layer.append(mask)
+            print(f'Distance {distance}: {len(next_layer)} placements, '
+                  f'{time.time() - start:.1f}s')
+            layer = next_layer
+            if not layer:
+                break
+    return distances
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=5,
+        help="Length of the longest row of the board.")
+    parser.add_argument(
+        "--player_row_span",
+        type=int,
+        default=3,
+        help="How many rows each player spans.")
+    parser.add_argument(
+        "--max_distance",
+        type=int,
+        default=12,
+        help="Placements up to this many moves away from the goal are "
+             "stored.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes expanding the placements.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="tablebase.bin",
+        help="Path of the tablebase file.")
+    args = parser.parse_args()
+
+    distances = build(args.board_size, args.player_row_span,
+                      args.max_distance, args.workers)
+    write_record_file(args.output,
+                      distances.items(),
+                      TABLEBASE_VALUE_FORMAT,
+                      TABLEBASE_METADATA.pack(args.board_size,
+                                              args.player_row_span,
+                                              args.max_distance))
+    print(f'{len(distances)} placements written to {args.output}')
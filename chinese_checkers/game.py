@@ -1,9 +1,13 @@
-from typing import List
+from contextlib import contextmanager
+from typing import Iterable, List
 
 from chinese_checkers.movement import CCMovement
+from chinese_checkers.geometry import OFF_BOARD, board_geometry, dest_position
 from chinese_checkers.exceptions import InvalidMoveException
 from chinese_checkers.game_visitor import GameVisitor
-from chinese_checkers.move import CCMove
+from chinese_checkers.move import (
+    CCMove, pack_move, move_destination, MOVE_CELL_BITS, MOVE_CELL_MASK
+)
 
 ListOfGameVisitors = List[GameVisitor]
 
@@ -14,6 +18,15 @@ class CCGame:
     Represents the board and the state of the game.
     Encodes the rules i.e. it can be used to derive the allowed movements
     and state transitions.
+
+    The pieces of each player in its goal are counted as they move, so that
+    the state of the game is known without looking at the board.
+    A new board must be set with set_board, which counts them again and
+    tells the visitors. The same goes for positions of the board modified
+    directly: set_board(game.board) must be called after doing so.
+
+    Visitors are notified once per whole move (see apply_move_sequence),
+    and can be muted while searching (see only_visitors).
     """
 
     # minimum width of longest row of the board
@@ -32,41 +45,116 @@ class CCGame:
 
         self.width = width
         self.player_row_spawn = player_row_span
+        # lookup tables shared by all the games of this size
+        self.geometry = board_geometry(width, player_row_span)
 
         self.player_row_spawn = player_row_span
+        # pieces that fill a goal
+        self.goal_size = player_row_span * (player_row_span + 1) // 2
+        # goal of player 1 starts at this row, goal of player 2 ends right
+        # before row player_row_span
+        self.goal_row_1 = self.geometry.height - player_row_span
         # player 1
-        self.board = [[1] * i for i in range(1, self.player_row_spawn + 1)]
+        board = [[1] * i for i in range(1, self.player_row_spawn + 1)]
         # rest of board (empty)
-        self.board += [[0] * i for i in range(self.player_row_spawn + 1,
-                                              width + 1)]
-        self.board += [[0] * i for i in reversed(
+        board += [[0] * i for i in range(self.player_row_spawn + 1,
+                                         width + 1)]
+        board += [[0] * i for i in reversed(
             range(self.player_row_spawn + 1, width))]
         # player 2
-        self.board += [[2] * i for i in reversed(
+        board += [[2] * i for i in reversed(
             range(1, self.player_row_spawn + 1))]
-        self.half_board = int(len(self.board) / 2)
+        self.half_board = int(len(board) / 2)
 
         # player 1 always starts
         self.player_turn = 1
         self.player_can_only_jump = False
 
-        self.moved_row: List[int] = []
-        self.moved_column: List[int] = []
-        self.moved_to_row: List[int] = []
-        self.moved_to_column: List[int] = []
+        # moves done so far (packed, see move.pack_move), to undo them
+        self.move_history: List[int] = []
+
+        # visitors not to be notified, see only_visitors
+        self._muted_visitors: ListOfGameVisitors = []
+        self.visitors = list(visitors)
+        self._update_listeners()
+        self.set_board(board)
 
-        self.visitors = visitors
+    def set_board(self, board: list):
+        """
+        Replaces the board (which may be the current one, modified in
+        place), counting the pieces in the goals again and initializing the
+        visitors with it. The turn is left as it is.
+        """
+        self.board = board
+        self._count_goal_pieces()
         for visitor in self.visitors:
-            visitor.on_init_game(self.board)
+            visitor.on_init_game(board)
+
+    def _update_listeners(self):
+        """
+        Bound methods of the visitors to notify, so that notifying them
+        doesn't need any lookup
+        """
+        active = [visitor for visitor in self.visitors
+                  if all(visitor is not muted
+                         for muted in self._muted_visitors)]
+        self._move_listeners = [visitor.on_move for visitor in active]
+        # most visitors don't care about turns
+        self._turn_listeners = [
+            visitor.on_rotate_turn for visitor in active
+            if(getattr(type(visitor), 'on_rotate_turn', None) is not
+               GameVisitor.on_rotate_turn)]
+
+    def _count_goal_pieces(self):
+        # pieces of each player in its goal (index 0 unused)
+        self.goal_pieces = [0, 0, 0]
+        for row in range(0, len(self.board)):
+            if row >= self.goal_row_1:
+                self.goal_pieces[1] += self.board[row].count(1)
+            elif row < self.player_row_spawn:
+                self.goal_pieces[2] += self.board[row].count(2)
+
+    def _update_goal_pieces(self, player: int, from_row: int, dest_row: int):
+        if player == 1:
+            self.goal_pieces[1] += ((dest_row >= self.goal_row_1) -
+                                    (from_row >= self.goal_row_1))
+        elif player == 2:
+            span = self.player_row_spawn
+            self.goal_pieces[2] += (dest_row < span) - (from_row < span)
+
+    def add_visitor(self, visitor: GameVisitor):
+        """
+        Registers a visitor once the game has already been created
+        """
+        self.visitors.append(visitor)
+        self._update_listeners()
+        visitor.on_init_game(self.board)
+
+    @contextmanager
+    def only_visitors(self, visitors: Iterable[GameVisitor]):
+        """
+        Within the block, only the given visitors (and the ones registered
+        inside the block) are notified, the rest of them are muted. The
+        board and turn must be the same at the end of the block as at its
+        beginning (e.g. a search that undoes every move it makes), so that
+        the muted visitors don't miss any change.
+        """
+        previously_muted = self._muted_visitors
+        self._muted_visitors = [
+            visitor for visitor in self.visitors
+            if all(visitor is not kept for kept in visitors)]
+        self._update_listeners()
+        try:
+            yield self
+        finally:
+            self._muted_visitors = previously_muted
+            self._update_listeners()
 
     def within_bounds(self, row: int, column: int):
         """
         True if the position is allowed on this board, False otherwise
         """
-        return not(
-            (row < 0 or row >= len(self.board)) or
-            (column < 0 or column >= len(self.board[row]))
-        )
+        return self.geometry.within_bounds(row, column)
 
     def _dest_position(self, row: int, column: int, movement: CCMovement):
         """
@@ -74,34 +162,7 @@ class CCGame:
         position. Returns a tuple (dest_row, dest_column).
         The calculated position might be out of bounds.
         """
-        dest_row = row
-        dest_column = column
-
-        if(movement == CCMovement.LN or
-           movement == CCMovement.RN):
-            dest_row -= 1
-        elif(movement == CCMovement.LS or
-             movement == CCMovement.RS):
-            dest_row += 1
-        elif(movement == CCMovement.L):
-            dest_column -= 1
-        elif(movement == CCMovement.R):
-            dest_column += 1
-
-        if(movement == CCMovement.LN):
-            if(dest_row < self.half_board):
-                dest_column -= 1
-        elif(movement == CCMovement.RS):
-            if(dest_row <= self.half_board):
-                dest_column += 1
-        elif(movement == CCMovement.LS):
-            if(dest_row > self.half_board):
-                dest_column -= 1
-        elif(movement == CCMovement.RN):
-            if(dest_row >= self.half_board):
-                dest_column += 1
-
-        return (dest_row, dest_column)
+        return dest_position(row, column, movement, self.half_board)
 
     def rotate_turn(self):
         """
@@ -110,66 +171,95 @@ class CCGame:
         """
         self.player_turn = 2 if self.player_turn == 1 else 1
         self.player_can_only_jump = False
+        for listener in self._turn_listeners:
+            listener(self.player_turn)
         return self
 
-    def _dest_jump_position(self, row: int, column: int, movement: CCMovement):
-        dest_row, dest_column = self._dest_position(row, column, movement)
-        return self._dest_position(dest_row, dest_column, movement)
-
     def _can_jump(self, row: int, column: int, movement: CCMovement):
-        dest_row_jump, dest_column_jump = (
-            self._dest_jump_position(row, column, movement)
-        )
-        if(not self.within_bounds(dest_row_jump, dest_column_jump)
-           or self.board[dest_row_jump][dest_column_jump] != 0):
-            return False
-        return True
+        geometry = self.geometry
+        dest = geometry.jumps[geometry.row_offsets[row] + column][
+            movement.value - 1]
+        return (dest != OFF_BOARD and
+                self.board[geometry.cell_row[dest]][
+                    geometry.cell_column[dest]] == 0)
+
+    def make_move(self, move: int):
+        """
+        Moves a piece straight from the origin to the destination of a
+        packed move (see move.pack_move), whole jump sequences included.
+        Nothing is validated, the move must come from the engine's own
+        move generation (use move/apply_move_sequence otherwise). The turn
+        is not rotated.
+        """
+        geometry = self.geometry
+        origin = move & MOVE_CELL_MASK
+        dest = move >> MOVE_CELL_BITS
+        from_row = geometry.cell_row[origin]
+        from_column = geometry.cell_column[origin]
+        dest_row = geometry.cell_row[dest]
+        dest_column = geometry.cell_column[dest]
+
+        board = self.board
+        player = board[from_row][from_column]
+        board[dest_row][dest_column] = player
+        board[from_row][from_column] = 0
+        self._update_goal_pieces(player, from_row, dest_row)
+        self.move_history.append(move)
+
+        for listener in self._move_listeners:
+            listener(from_row, from_column, dest_row, dest_column, player)
+
+    def unmake_move(self):
+        """
+        Undoes the last move, done by make_move or any other way
+        """
+        geometry = self.geometry
+        move = self.move_history.pop()
+        from_row = geometry.cell_row[move >> MOVE_CELL_BITS]
+        from_column = geometry.cell_column[move >> MOVE_CELL_BITS]
+        dest_row = geometry.cell_row[move & MOVE_CELL_MASK]
+        dest_column = geometry.cell_column[move & MOVE_CELL_MASK]
+
+        board = self.board
+        player = board[from_row][from_column]
+        board[dest_row][dest_column] = player
+        board[from_row][from_column] = 0
+        self._update_goal_pieces(player, from_row, dest_row)
+
+        for listener in self._move_listeners:
+            listener(from_row, from_column, dest_row, dest_column, player)
 
     def _do_move(self, from_row: int, from_column: int,
                  dest_row: int, dest_column: int):
         """
         Internal method which moves a piece and updates the board.
-        Keeps track of what happened in internal variables.
+        Keeps track of what happened, so that it can be undone.
         """
-        self.board[dest_row][dest_column] = self.board[from_row][from_column]
-        self.board[from_row][from_column] = 0
-
-        # with these variables we could e.g. undo the last movement
-        self.moved_row.append(from_row)
-        self.moved_column.append(from_column)
-        self.moved_to_row.append(dest_row)
-        self.moved_to_column.append(dest_column)
-
-        for visitor in self.visitors:
-            visitor.on_move(from_row, from_column,
-                            dest_row, dest_column,
-                            self.player_turn)
+        offsets = self.geometry.row_offsets
+        self.make_move(pack_move(offsets[from_row] + from_column,
+                                 offsets[dest_row] + dest_column))
 
     def undo_last_move(self):
-        from_row = self.moved_to_row.pop()
-        from_column = self.moved_to_column.pop()
-        to_row = self.moved_row.pop()
-        to_column = self.moved_column.pop()
-        self.board[to_row][to_column] =\
-            self.board[from_row][from_column]
-        self.board[from_row][from_column] = 0
-
-        for visitor in self.visitors:
-            visitor.on_move(from_row, from_column,
-                            to_row, to_column,
-                            self.player_turn)
+        self.unmake_move()
 
     def can_move(self, row: int, column: int, movement: CCMovement):
         """
         True if the player can move in this direction from the row and
         column. Note: doesn't check if row, column are within bounds.
         """
-        dest_row, dest_column = self._dest_position(row, column, movement)
-        if not self.within_bounds(dest_row, dest_column):
+        geometry = self.geometry
+        cell = geometry.row_offsets[row] + column
+        direction = movement.value - 1
+        dest = geometry.neighbors[cell][direction]
+        if dest == OFF_BOARD:
             return False
-        if self.board[dest_row][dest_column] != 0:
+        if self.board[geometry.cell_row[dest]][
+                geometry.cell_column[dest]] != 0:
             # only allowed if we can jump this piece
-            return self._can_jump(row, column, movement)
+            dest = geometry.jumps[cell][direction]
+            return (dest != OFF_BOARD and
+                    self.board[geometry.cell_row[dest]][
+                        geometry.cell_column[dest]] == 0)
         else:
             return not self.player_can_only_jump
 
@@ -199,35 +289,41 @@ class CCGame:
             raise InvalidMoveException(
                 f"It is player's {self.player_turn} turn.")
 
-        dest_row, dest_column = self._dest_position(row, column, movement)
+        geometry = self.geometry
+        cell = geometry.row_offsets[row] + column
+        direction = movement.value - 1
+        dest = geometry.neighbors[cell][direction]
 
-        if not self.within_bounds(dest_row, dest_column):
+        if dest == OFF_BOARD:
             raise InvalidMoveException(
                 'Movement ends in an out-of-bounds position')
 
-        if self.board[dest_row][dest_column] != 0:
+        if self.board[geometry.cell_row[dest]][
+                geometry.cell_column[dest]] != 0:
             # only allowed if we can jump this piece
-            if not self._can_jump(row, column, movement):
+            dest = geometry.jumps[cell][direction]
+            if(dest == OFF_BOARD or
+               self.board[geometry.cell_row[dest]][
+                   geometry.cell_column[dest]] != 0):
                 raise InvalidMoveException("Can't jump over this piece")
             # else movement is valid and we jumped a piece
-            dest_row_jump, dest_column_jump = (
-                self._dest_jump_position(row, column, movement)
-            )
-            self._do_move(row, column, dest_row_jump, dest_column_jump)
+            self._do_move(row, column,
+                          geometry.cell_row[dest], geometry.cell_column[dest])
             # check if more jumps are still possible
             # if so, we exit and not rotate the turn, giving the current
             # player the possibility to still jump more
-            for possible_move in CCMovement:
-                if self._can_jump(dest_row_jump,
-                                  dest_column_jump,
-                                  possible_move):
+            for jump in geometry.jumps[dest]:
+                if(jump != OFF_BOARD and
+                   self.board[geometry.cell_row[jump]][
+                       geometry.cell_column[jump]] == 0):
                     self.player_can_only_jump = True
                     return self.player_turn
         else:
             if self.player_can_only_jump:
                 raise InvalidMoveException('Only more jumps are allowed')
             # destination is empty, movement is valid
-            self._do_move(row, column, dest_row, dest_column)
+            self._do_move(row, column,
+                          geometry.cell_row[dest], geometry.cell_column[dest])
         # rotate turn
         self.rotate_turn()
         return self.player_turn
@@ -244,9 +340,24 @@ class CCGame:
         positions = move_sequence.board_positions
         directions = move_sequence.directions
 
-        for i, direction in enumerate(directions):
-            row, column = positions[i]
-            self.move(row, column, direction)
+        # visitors are told about the whole move at once, not hop by hop
+        history_size = len(self.move_history)
+        listeners = self._move_listeners
+        self._move_listeners = []
+        try:
+            for i, direction in enumerate(directions):
+                row, column = positions[i]
+                self.move(row, column, direction)
+        finally:
+            self._move_listeners = listeners
+            if len(self.move_history) > history_size:
+                # as far as the piece got
+                from_row, from_column = positions[0]
+                dest_row, dest_column = self.geometry.position(
+                    move_destination(self.move_history[-1]))
+                for listener in listeners:
+                    listener(from_row, from_column, dest_row, dest_column,
+                             player)
 
         if self.player_turn == player:
             # if we have been jumping, finish the movement
@@ -259,16 +370,10 @@ class CCGame:
             print(f'{spacing}{str_row}')
 
     def _player_1_wins(self):
-        for i in range(0, self.player_row_spawn):
-            if self.board[len(self.board) - i - 1] != [1] * (i + 1):
-                return False
-        return True
+        return self.goal_pieces[1] == self.goal_size
 
     def _player_2_wins(self):
-        for i in range(0, self.player_row_spawn):
-            if self.board[i] != [2] * (i + 1):
-                return False
-        return True
+        return self.goal_pieces[2] == self.goal_size
 
     def state(self):
         """
@@ -279,8 +384,51 @@ class CCGame:
             - 1: Player 1 wins
             - 2: Player 2 wins
         """
-        return 2 if self._player_2_wins() else (
-            1 if self._player_1_wins() else 0)
+        goal_pieces = self.goal_pieces
+        if goal_pieces[2] == self.goal_size:
+            return 2
+        if goal_pieces[1] == self.goal_size:
+            return 1
+        return 0
+
+    def serialize(self) -> bytes:
+        """
+        Compact representation of the position, between turns: board
+        width, player row span, player turn and one byte per cell.
+        Visitors are not included.
+        """
+        return bytes([self.width, self.player_row_spawn, self.player_turn] +
+                     [cell for row in self.board for cell in row])
+
+    @classmethod
+    def deserialize(cls,
+                    data: bytes,
+                    visitors: ListOfGameVisitors = []) -> 'CCGame':
+        """
+        Builds a game from the output of serialize
+        """
+        game = cls(data[0], data[1])
+        game.set_position(data)
+        for visitor in visitors:
+            game.add_visitor(visitor)
+        return game
+
+    def set_position(self, data: bytes):
+        """
+        Sets the board (see set_board) and the turn from the output of
+        serialize, which must be of a game of the same size
+        """
+        if data[0] != self.width or data[1] != self.player_row_spawn:
+            raise ValueError(f"""
+                Position of a board of width {data[0]} and player row span
+                {data[1]}, the game has {self.width} and
+                {self.player_row_spawn}""")
+        cells = list(data[3:])
+        offsets = self.geometry.row_offsets
+        self.set_board([cells[offsets[row]:offsets[row] + length]
+                        for row, length
+                        in enumerate(self.geometry.row_lengths)])
+        self.player_turn = data[2]
 
     def __repr__(self):
         return f"C({self.board} turn:{self.player_turn})"
@@ -0,0 +1,152 @@
+import struct
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from chinese_checkers.exceptions import InvalidMoveException
+from chinese_checkers.game import CCGame
+from chinese_checkers.game_visitor import GameVisitor
+from chinese_checkers.geometry import board_geometry
+from chinese_checkers.move import pack_move, move_origin, move_destination
+from chinese_checkers.reasoner import CCReasoner
+
+"""
+Files of recorded games, written and read one game at a time, so that
+corpora of any size can be produced and processed without holding them
+in memory.
+
+Layout (little endian):
+    - MAGIC
+    - every game: header (board size, player row span, result, number of
+        moves), then the origin and destination cells of every move (see
+        move.pack_move), one byte each (two if the board has more than
+        256 cells)
+"""
+
+MAGIC = b'CCGAME01'
+GAME_HEADER = struct.Struct('<BBBH')
+
+
+def _apply_move(game: CCGame, move: int):
+    try:
+        game.apply_move_sequence(CCReasoner.unpack_move(game, move))
+    except InvalidMoveException as e:
+        raise ValueError(f"Move {move} can't be played: {e}")
+
+
+def _move_format(width: int, player_row_span: int) -> struct.Struct:
+    if board_geometry(width, player_row_span).n_cells <= 256:
+        return struct.Struct('<BB')
+    return struct.Struct('<HH')
+
+
+@dataclass
+class CCGameRecord:
+    """
+    A game from its initial position: board size, (packed) moves and
+    winner (0 if nobody won)
+    """
+    width: int
+    player_row_span: int
+    moves: List[int] = field(default_factory=list)
+    result: int = 0
+
+    def replay(self,
+               visitors: List[GameVisitor] = []
+               ) -> Iterator[Tuple[CCGame, int]]:
+        """
+        Yields (game, move) for every move, the game being in the position
+        the move is played from. The same game instance is used for the
+        whole replay, and the move is applied once the loop goes on.
+        Raises ValueError if a move can't be played.
+        """
+        game = CCGame(width=self.width,
+                      player_row_span=self.player_row_span,
+                      visitors=visitors)
+        for move in self.moves:
+            yield (game, move)
+            _apply_move(game, move)
+
+    def final_game(self, visitors: List[GameVisitor] = []) -> CCGame:
+        """
+        The game after all the moves. Raises ValueError if a move can't be
+        played.
+        """
+        game = CCGame(width=self.width,
+                      player_row_span=self.player_row_span,
+                      visitors=visitors)
+        for move in self.moves:
+            _apply_move(game, move)
+        return game
+
+
+class CCGameRecordWriter:
+    """
+    Appends games to a new file, as they are given
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.games = 0
+
+    def write(self, record: CCGameRecord):
+        """
+        Raises ValueError if the game can't be stored (nothing is written
+        then)
+        """
+        if record.result not in (0, 1, 2):
+            raise ValueError(f'Invalid result {record.result}')
+        if len(record.moves) > 0xFFFF:
+            raise ValueError(f'{len(record.moves)} moves, at most 65535 '
+                             'can be stored')
+        move_format = _move_format(record.width, record.player_row_span)
+        n_cells = board_geometry(record.width,
+                                 record.player_row_span).n_cells
+        for move in record.moves:
+            if(move_origin(move) >= n_cells or
+               move_destination(move) >= n_cells):
+                raise ValueError(f'Invalid move {move}')
+        self.file.write(GAME_HEADER.pack(record.width,
+                                         record.player_row_span,
+                                         record.result,
+                                         len(record.moves)))
+        self.file.write(b''.join(
+            move_format.pack(move_origin(move), move_destination(move))
+            for move in record.moves))
+        self.games += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_game_records(path: str) -> Iterator[CCGameRecord]:
+    """
+    Yields the games of a file written by CCGameRecordWriter, one by one
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a game record file')
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise ValueError(f'{path} is truncated')
+            width, player_row_span, result, n_moves = (
+                GAME_HEADER.unpack(header))
+            move_format = _move_format(width, player_row_span)
+            data = f.read(n_moves * move_format.size)
+            if len(data) < n_moves * move_format.size:
+                raise ValueError(f'{path} is truncated')
+            yield CCGameRecord(
+                width,
+                player_row_span,
+                [pack_move(origin, dest)
+                 for origin, dest in move_format.iter_unpack(data)],
+                result)
@@ -9,6 +9,9 @@ class GameVisitor(metaclass=abc.ABCMeta):
 
     @classmethod
     def __subclasshook__(cls, subclass):
+        if cls is not GameVisitor:
+            # don't make every visitor an instance of every subclass
+            return NotImplemented
         return (hasattr(subclass, 'on_move') and
                 callable(subclass.on_move) and
                 hasattr(subclass, 'on_init_game') and
@@ -28,3 +31,10 @@ class GameVisitor(metaclass=abc.ABCMeta):
                 dest_column: int,
                 player: int):
         raise NotImplementedError
+
+    def on_rotate_turn(self, player_turn: int):
+        """
+        Called after the turn has rotated to 'player_turn'. Most visitors
+        don't need to know about it.
+        """
+        pass
@@ -0,0 +1,130 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+from chinese_checkers.movement import CCMovement
+
+"""
+Precomputed board geometry. The shape of the board only depends on its
+dimensions, so the tables below are built once per (width, player_row_span)
+and shared by every game of that size.
+"""
+
+# marker for positions that fall outside of the board
+OFF_BOARD = -1
+
+# CCMovement members in the order used by the direction-indexed tables
+# (CCMovement.X.value - 1 == DIRECTIONS.index(CCMovement.X))
+DIRECTIONS = tuple(CCMovement)
+
+
+def dest_position(row: int,
+                  column: int,
+                  movement: CCMovement,
+                  half_board: int) -> Tuple[int, int]:
+    """
+    Calculates the destination position of a movement from a starting
+    position. Returns a tuple (dest_row, dest_column).
+    The calculated position might be out of bounds.
+    """
+    dest_row = row
+    dest_column = column
+
+    if(movement == CCMovement.LN or
+       movement == CCMovement.RN):
+        dest_row -= 1
+    elif(movement == CCMovement.LS or
+         movement == CCMovement.RS):
+        dest_row += 1
+    elif(movement == CCMovement.L):
+        dest_column -= 1
+    elif(movement == CCMovement.R):
+        dest_column += 1
+
+    if(movement == CCMovement.LN):
+        if(dest_row < half_board):
+            dest_column -= 1
+    elif(movement == CCMovement.RS):
+        if(dest_row <= half_board):
+            dest_column += 1
+    elif(movement == CCMovement.LS):
+        if(dest_row > half_board):
+            dest_column -= 1
+    elif(movement == CCMovement.RN):
+        if(dest_row >= half_board):
+            dest_column += 1
+
+    return (dest_row, dest_column)
+
+
+class CCGeometry:
+    """
+    Flat, cell-indexed lookup tables for a board of a given size.
+
+    Cells are numbered row by row, from the top-left position of the board
+    (cell 0) to the bottom one (cell n_cells - 1). For every cell and every
+    direction (see DIRECTIONS) the tables hold the neighbouring cell, the
+    cell that would be jumped over and the landing cell of the jump, or
+    OFF_BOARD if the movement leaves the board.
+    """
+
+    def __init__(self, width: int, player_row_span: int):
+        self.width = width
+        self.player_row_span = player_row_span
+
+        self.row_lengths = (list(range(1, width + 1)) +
+                            list(reversed(range(1, width))))
+        self.height = len(self.row_lengths)
+        self.half_board = int(self.height / 2)
+
+        self.row_offsets: List[int] = []
+        self.cell_row: List[int] = []
+        self.cell_column: List[int] = []
+        for row, length in enumerate(self.row_lengths):
+            self.row_offsets.append(len(self.cell_row))
+            for column in range(0, length):
+                self.cell_row.append(row)
+                self.cell_column.append(column)
+        self.n_cells = len(self.cell_row)
+
+        # neighbors[cell][direction] is both the destination of a simple
+        # move and the position of the piece being jumped over
+        self.neighbors: List[Tuple[int, ...]] = []
+        self.jumps: List[Tuple[int, ...]] = []
+        for cell in range(0, self.n_cells):
+            self.neighbors.append(tuple(
+                self._neighbor(cell, movement) for movement in DIRECTIONS))
+        for cell in range(0, self.n_cells):
+            self.jumps.append(tuple(
+                OFF_BOARD if over == OFF_BOARD else
+                self.neighbors[over][direction]
+                for direction, over in enumerate(self.neighbors[cell])))
+
+    def within_bounds(self, row: int, column: int) -> bool:
+        return (0 <= row < self.height and
+                0 <= column < self.row_lengths[row])
+
+    def cell(self, row: int, column: int) -> int:
+        """
+        Flat index of a position. Note: doesn't check bounds.
+        """
+        return self.row_offsets[row] + column
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        return (self.cell_row[cell], self.cell_column[cell])
+
+    def _neighbor(self, cell: int, movement: CCMovement) -> int:
+        dest_row, dest_column = dest_position(self.cell_row[cell],
+                                              self.cell_column[cell],
+                                              movement,
+                                              self.half_board)
+        if not self.within_bounds(dest_row, dest_column):
+            return OFF_BOARD
+        return self.cell(dest_row, dest_column)
+
+
+@lru_cache(maxsize=None)
+def board_geometry(width: int, player_row_span: int) -> CCGeometry:
+    """
+    Returns the (shared) geometry tables for a board of the given size.
+    """
+    return CCGeometry(width, player_row_span)
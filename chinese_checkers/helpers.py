@@ -1,31 +1,88 @@
-from copy import deepcopy
 import random
 
 from chinese_checkers.game import CCGame
+from chinese_checkers.game_visitor import GameVisitor
 
 
-class CCZobristHash():
+class CCZobristHash(GameVisitor):
     """
     Stateful Zobrist hasher, used to implement transposition tables.
 
+    The hasher registers itself as a visitor of the game it is created
+    for, and keeps the hash of that game up to date as pieces move and
+    turns rotate, so reading it is O(1). The hash covers the pieces of
+    both players and the player to move. A turn assigned directly (not
+    rotated) is not noticed, see resync.
+
+    Keys are 64 bit and generated from a fixed seed, so the same position
+    always has the same hash (e.g. across processes).
+
     https://en.wikipedia.org/wiki/Zobrist_hashing
     """
 
-    def __init__(self, game: CCGame):
-        self.table_1 = deepcopy(game.board)
-        self.table_2 = deepcopy(game.board)
-        for i in range(0, len(self.table_1)):
-            for j in range(0, len(self.table_1[i])):
-                self.table_1[i][j] = random.getrandbits(128)
-                self.table_2[i][j] = random.getrandbits(128)
+    def __init__(self, game: CCGame, seed: int = 0):
+        self.seed = seed
+        rnd = random.Random(seed)
+        n_cells = game.geometry.n_cells
+        # keys of each player's pieces by cell (index 0 unused)
+        self.keys = [
+            [],
+            [rnd.getrandbits(64) for _ in range(0, n_cells)],
+            [rnd.getrandbits(64) for _ in range(0, n_cells)]
+        ]
+        # xor-ed in when it is player 2's turn
+        self.turn_key = rnd.getrandbits(64)
 
-    def get_hash(self, game: CCGame) -> int:
-        hash_ = 0
-        for i in range(0, len(game.board)):
-            for j in range(0, len(game.board[i])):
-                if game.board[i][j] != 0:
-                    hash_ = hash_ ^ (
-                        self.table_1[i][j] if game.board[i][j] else
-                        self.table_2[i][j]
-                    )
+        self.game = game
+        game.add_visitor(self)
+
+    @classmethod
+    def of(cls, game: CCGame) -> 'CCZobristHash':
+        """
+        Returns the hasher already attached to the game, or attaches a new
+        one
+        """
+        for visitor in game.visitors:
+            if isinstance(visitor, cls):
+                return visitor
+        return cls(game)
+
+    def _full_hash(self, game: CCGame) -> int:
+        hash_ = self.turn_key if game.player_turn == 2 else 0
+        cell = 0
+        for row in game.board:
+            for value in row:
+                if value != 0:
+                    hash_ ^= self.keys[value][cell]
+                cell += 1
         return hash_
+
+    def resync(self):
+        """
+        Computes the hash of the game from scratch. O(cells), strategies
+        do it once at the start of each search.
+        """
+        self.hash = self._full_hash(self.game)
+
+    def on_init_game(self, board: list):
+        self.resync()
+
+    def on_move(self,
+                from_row: int,
+                from_column: int,
+                dest_row: int,
+                dest_column: int,
+                player: int):
+        # (the board is already updated, dest holds the moved piece)
+        offsets = self.game.geometry.row_offsets
+        keys = self.keys[self.game.board[dest_row][dest_column]]
+        self.hash ^= (keys[offsets[from_row] + from_column] ^
+                      keys[offsets[dest_row] + dest_column])
+
+    def on_rotate_turn(self, player_turn: int):
+        self.hash ^= self.turn_key
+
+    def get_hash(self, game: CCGame) -> int:
+        if game is self.game:
+            return self.hash
+        return self._full_hash(game)
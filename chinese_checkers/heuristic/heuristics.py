@@ -3,6 +3,11 @@ from chinese_checkers.game import CCGame
 
 
 class CombinedHeuristic(CCHeuristic):
+    """
+    Weighted sum of InvSquaredSumCenterLine, CombinedVerticalAdvance,
+    InvSquaredSumDestCorner and Clusteredness, with the features of both
+    players computed in a single pass over the board
+    """
 
     def __init__(self, weights: list = [0.01,
                                         0.44,
@@ -10,14 +15,65 @@ class CombinedHeuristic(CCHeuristic):
                                         0.01]):
         self.weights = weights
 
+    def _values(self, game: CCGame) -> list:
+        """
+        Values of both players (index 0 unused). Same arithmetic as the
+        separate heuristics, so that the values match them exactly.
+        """
+        heigth = len(game.board)
+        # per player (index 0 unused)
+        center_sum = [0.0, 0.0, 0.0]
+        combined_va = [0, 0, 0]
+        pieces = [0, 0, 0]
+        dest_sum = [0, 0, 0]
+        min_va = [heigth, heigth, heigth]
+        max_va = [0, 0, 0]
+
+        for row in range(0, heigth):
+            board_row = game.board[row]
+            center = (len(board_row) / 2)
+            for column, player in enumerate(board_row):
+                if player == 0:
+                    continue
+                dist = abs(column - center)
+                center_sum[player] += (dist * dist)
+                pieces[player] += 1
+                if player == 1:
+                    combined_va[1] += row
+                    dist = max(row, column)
+                else:
+                    combined_va[2] += heigth - row - 1
+                    dist = max(heigth - 1 - row, column)
+                dest_sum[player] += (dist * dist)
+                min_va[player] = min(min_va[player], row)
+                max_va[player] = max(max_va[player], row)
+
+        values = [0.0, 0.0, 0.0]
+        for player in [1, 2]:
+            if pieces[player] == 0:
+                continue
+            # rough normalization to combine different heuristics
+            values[player] = (
+                self.weights[0] * (
+                    1.0 if center_sum[player] == 0 else
+                    min(1.0, 1 / center_sum[player])) +
+                self.weights[1] * (
+                    combined_va[player] / (heigth * pieces[player])) +
+                self.weights[2] * (1 - min(1, 1 / dest_sum[player])) +
+                self.weights[3] * (
+                    (1 - max(1, max_va[player] - min_va[player])) / heigth)
+            )
+        return values
+
     def value(self, game: CCGame, player: int):
-        # rough normalization to combine different heuristics
-        return (
-            self.weights[0] * InvSquaredSumCenterLine().value(game, player) +
-            self.weights[1] * CombinedVerticalAdvance().value(game, player) +
-            self.weights[2] * InvSquaredSumDestCorner().value(game, player) +
-            self.weights[3] * Clusteredness().value(game, player)
-        )
+        return self._values(game)[player]
+
+    def differential_value(self, game: CCGame, player: int):
+        """
+        Value of the player minus the value of the other player
+        """
+        values = self._values(game)
+        return values[player] - values[2 if player == 1 else 1]
 
 
 class Clusteredness(CCHeuristic):
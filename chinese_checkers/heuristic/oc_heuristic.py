@@ -1,3 +1,5 @@
+import numpy as np
+
 from chinese_checkers.game_visitor import GameVisitor
 from chinese_checkers.heuristic.heuristic import CCHeuristic
 
@@ -16,43 +18,76 @@ class OptimizedCombinedHeuristic(GameVisitor, CCHeuristic):
                                         0.01]):
         self.weights = weights
 
-    def _values_of(self, row: int, column: int, player: int):
-        # vertical advance
-        va = (row if player == 1 else (self.heigth - row - 1))
-
-        # inverse squared distance to center line
-        center = (len(self.board[row]) / 2)
-        dist_center = abs(column - center)
-        dist_center_sqrd = (dist_center * dist_center)
-
-        # inverse squared distance to destination
-        dest_row = 0
-        if player == 2:
-            dest_row = self.heigth - 1
-        dist_dest = max(abs(dest_row - row), column)
-        dist_dest_sqrd = dist_dest * dist_dest
-
-        return [dist_center_sqrd, va, dist_dest_sqrd]
+    def _build_tables(self, board: list):
+        """
+        Per cell (row, column) values of the features, so that moves only
+        need lookups and additions
+        """
+        heigth = len(board)
+        # squared distance to the center line, the same for both players
+        self.center_table = []
+        # vertical advance, per player and row
+        self.advance_table = [None, [], []]
+        # squared distance to the destination corner, per player
+        self.dest_table = [None, [], []]
+        for row in range(0, heigth):
+            center = (len(board[row]) / 2)
+            self.center_table.append(
+                [(column - center) * (column - center)
+                 for column in range(0, len(board[row]))])
+            for player, dest_row in [(1, 0), (2, heigth - 1)]:
+                self.advance_table[player].append(
+                    row if player == 1 else (heigth - row - 1))
+                self.dest_table[player].append(
+                    [max(abs(dest_row - row), column) ** 2
+                     for column in range(0, len(board[row]))])
+
+        # the same tables indexed by cell (see geometry.CCGeometry), to
+        # evaluate many moves at once
+        self.cell_rows = np.array([row for row in range(0, heigth)
+                                   for _ in board[row]])
+        self.center_cells = np.array(
+            [value for row in self.center_table for value in row])
+        self.advance_cells = [None] + [
+            np.array([self.advance_table[player][row]
+                      for row in range(0, heigth) for _ in board[row]])
+            for player in [1, 2]]
+        self.dest_cells = [None] + [
+            np.array([value for row in self.dest_table[player]
+                      for value in row])
+            for player in [1, 2]]
 
     def on_init_game(self, board: list):
         self.board = board
         self.heigth = len(board)
         self.pieces = 0
-
-        self.value_1 = [0, 0, 0]
-        self.value_2 = [0, 0, 0]
+        self._build_tables(board)
+
+        # sums of the features of the pieces of each player (index 0 is
+        # unused)
+        self.center_sum = [0, 0, 0]
+        self.advance_sum = [0, 0, 0]
+        self.dest_sum = [0, 0, 0]
+        # pieces of each player per row, and first and last rows with any
+        self.row_count = [None,
+                          [0] * self.heigth,
+                          [0] * self.heigth]
+        self.min_row = [None, self.heigth, self.heigth]
+        self.max_row = [None, 0, 0]
 
         for row in range(0, self.heigth):
             for column in range(0, len(board[row])):
-                if board[row][column] == 1:
+                player = board[row][column]
+                if player == 0:
+                    continue
+                if player == 1:
                     self.pieces += 1
-                    plus = self._values_of(row, column, 1)
-                    for i in range(0, 3):
-                        self.value_1[i] = self.value_1[i] + plus[i]
-                elif board[row][column] == 2:
-                    plus = self._values_of(row, column, 2)
-                    for i in range(0, 3):
-                        self.value_2[i] = self.value_2[i] + plus[i]
+                self.center_sum[player] += self.center_table[row][column]
+                self.advance_sum[player] += self.advance_table[player][row]
+                self.dest_sum[player] += self.dest_table[player][row][column]
+                self.row_count[player][row] += 1
+                self.min_row[player] = min(self.min_row[player], row)
+                self.max_row[player] = max(self.max_row[player], row)
 
     def on_move(self,
                 from_row: int,
@@ -64,34 +99,110 @@ class OptimizedCombinedHeuristic(GameVisitor, CCHeuristic):
         Update the heuristic values given that a player has moved a piece
         from point A to point B
         """
-        minus = self._values_of(from_row, from_column, player)
-        plus = self._values_of(dest_row, dest_column, player)
+        center_table = self.center_table
+        self.center_sum[player] += (center_table[dest_row][dest_column] -
+                                    center_table[from_row][from_column])
+        advance_table = self.advance_table[player]
+        self.advance_sum[player] += (advance_table[dest_row] -
+                                     advance_table[from_row])
+        dest_table = self.dest_table[player]
+        self.dest_sum[player] += (dest_table[dest_row][dest_column] -
+                                  dest_table[from_row][from_column])
+
+        if from_row == dest_row:
+            return
+        row_count = self.row_count[player]
+        row_count[from_row] -= 1
+        row_count[dest_row] += 1
+        min_row = self.min_row[player]
+        max_row = self.max_row[player]
+        if dest_row < min_row:
+            min_row = dest_row
+        if dest_row > max_row:
+            max_row = dest_row
+        # the row left may have been the first or last one, moves are short
+        # so the next one with pieces is close
+        while row_count[min_row] == 0:
+            min_row += 1
+        while row_count[max_row] == 0:
+            max_row -= 1
+        self.min_row[player] = min_row
+        self.max_row[player] = max_row
+
+    def _next_row(self, player: int, row: int, step: int) -> int:
+        """
+        Next row with pieces of the player after the given one, going down
+        (step 1) or up (step -1). Off the board if there is none.
+        """
+        row_count = self.row_count[player]
+        row += step
+        while 0 <= row < self.heigth and row_count[row] == 0:
+            row += step
+        return row
+
+    def batch_values(self,
+                     player: int,
+                     origins: np.ndarray,
+                     dests: np.ndarray) -> np.ndarray:
+        """
+        Values, as returned by value, after each of the moves of a piece
+        of the player from the origin to the destination cells, without
+        making them
+        """
+        center_cells = self.center_cells
+        center_sum = self.center_sum[player] + (center_cells[dests] -
+                                                center_cells[origins])
+        advance_cells = self.advance_cells[player]
+        advance_sum = self.advance_sum[player] + (advance_cells[dests] -
+                                                  advance_cells[origins])
+        dest_cells = self.dest_cells[player]
+        dest_sum = self.dest_sum[player] + (dest_cells[dests] -
+                                            dest_cells[origins])
+
+        # first and last rows with pieces once the piece has left the
+        # origin, and then landed on the destination
+        origin_rows = self.cell_rows[origins]
+        dest_rows = self.cell_rows[dests]
+        min_row = self.min_row[player]
+        max_row = self.max_row[player]
+        row_count = self.row_count[player]
+        min_rows = min_row
+        if row_count[min_row] == 1:
+            min_rows = np.where(origin_rows == min_row,
+                                self._next_row(player, min_row, 1),
+                                min_row)
+        max_rows = max_row
+        if row_count[max_row] == 1:
+            max_rows = np.where(origin_rows == max_row,
+                                self._next_row(player, max_row, -1),
+                                max_row)
+        spread = (np.maximum(max_rows, dest_rows) -
+                  np.minimum(min_rows, dest_rows))
+
+        with np.errstate(divide='ignore'):
+            a = self.weights[0] * np.minimum(1, 1 / center_sum)
+            c = self.weights[2] * np.where(dest_sum == 0, 1,
+                                           1 - np.minimum(1, 1 / dest_sum))
+        b = self.weights[1] * (advance_sum / (self.heigth * self.pieces))
+        d = self.weights[3] * ((1 - np.maximum(1, spread)) / self.heigth)
 
-        if player == 1:
-            for i in range(0, 3):
-                self.value_1[i] = self.value_1[i] - minus[i] + plus[i]
-        else:
-            for i in range(0, 3):
-                self.value_2[i] = self.value_2[i] - minus[i] + plus[i]
+        return (a + b + c + d)
 
     def value(self, _, player: int):
         """
         Return the heuristic value between 0 and 1 with respect to the
         given player
         """
-        min_va = self.heigth
-        max_va = 0
-
-        for row in range(0, self.heigth):
-            for column in range(0, len(self.board[row])):
-                if self.board[row][column] == player:
-                    min_va = min(min_va, row)
-                    max_va = max(max_va, row)
-
-        vals = self.value_1 if player == 1 else self.value_2
-        a = self.weights[0] * (1 if vals[0] == 0 else min(1, 1 / vals[0]))
-        b = self.weights[1] * (vals[1] / (self.heigth * self.pieces))
-        c = self.weights[2] * (1 if vals[2] == 0 else 1 - min(1, 1 / vals[2]))
-        d = self.weights[3] * ((1 - max(1, max_va - min_va)) / self.heigth)
+        center_sum = self.center_sum[player]
+        dest_sum = self.dest_sum[player]
+        spread = self.max_row[player] - self.min_row[player]
+
+        a = self.weights[0] * (1 if center_sum == 0 else
+                               min(1, 1 / center_sum))
+        b = self.weights[1] * (self.advance_sum[player] /
+                               (self.heigth * self.pieces))
+        c = self.weights[2] * (1 if dest_sum == 0 else
+                               1 - min(1, 1 / dest_sum))
+        d = self.weights[3] * ((1 - max(1, spread)) / self.heigth)
 
         return (a + b + c + d)
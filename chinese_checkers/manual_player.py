@@ -1,3 +1,4 @@
+import time
 from copy import deepcopy
 
 from chinese_checkers.pygame_gui import PygameGUI
@@ -36,6 +37,8 @@ class ManualPlayer(CCReasoner):
         while not valid_move:
             while not (self.gui.first_click and self.gui.second_click):
                 self.gui.update()
+                # leave some CPU for other threads (e.g. AI pondering)
+                time.sleep(0.01)
             if not self.movement_is_valid(self.gui.first_click[0],
                                           self.gui.first_click[1],
                                           self.gui.second_click[0],
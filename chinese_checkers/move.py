@@ -23,3 +23,25 @@ class CCMove:
 class PrioritizedCCMove:
     priority: int
     move: CCMove = field(compare=False)
+
+
+"""
+Packed moves: a move of the search, encoded as a single int holding the
+origin and the destination cells (see geometry.CCGeometry) of the moving
+piece. The path followed by the piece is not stored, it can be rebuilt
+when needed (see CCReasoner.unpack_move).
+"""
+MOVE_CELL_BITS = 10
+MOVE_CELL_MASK = (1 << MOVE_CELL_BITS) - 1
+
+
+def pack_move(origin: int, dest: int) -> int:
+    return origin | (dest << MOVE_CELL_BITS)
+
+
+def move_origin(move: int) -> int:
+    return move & MOVE_CELL_MASK
+
+
+def move_destination(move: int) -> int:
+    return move >> MOVE_CELL_BITS
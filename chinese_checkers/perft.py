@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Type
+
+from chinese_checkers.bitboard_game import CCBitboardGame
+from chinese_checkers.game import CCGame
+from chinese_checkers.move import move_origin, move_destination
+from chinese_checkers.reasoner import CCReasoner
+
+"""
+Perft (performance test): counts the leaf nodes of the whole game tree
+down to a depth, to measure the speed of move generation and to check that
+a new move generator finds exactly the same moves as the reference one.
+
+A move is a distinct (origin, destination) pair: the different jump paths
+available_moves finds between the same two cells lead to the same position,
+so they are counted once. Games that are already won are not expanded.
+
+The reference counts live in perft.json (next to this file), together with
+the positions they were computed from: the initial boards of a few sizes
+and the boards of tests/constants.py.
+
+python -m chinese_checkers.perft --depth 3
+python -m chinese_checkers.perft --generator packed --bitboard
+python -m chinese_checkers.perft --position initial-5-3 --depth 3 --divide
+python -m chinese_checkers.perft --depth 4 --update
+"""
+
+# bump whenever the rules of the game or the way nodes are counted change,
+# so that stale reference counts are not silently compared against
+PERFT_VERSION = 1
+REFERENCE_FILE = os.path.join(os.path.dirname(__file__), 'perft.json')
+
+# board sizes whose initial position is in the reference file
+INITIAL_SIZES = [(5, 3), (6, 3), (7, 4), (9, 4)]
+
+
+def _available_moves(game: CCGame) -> Iterator[int]:
+    """
+    Reference generator: CCReasoner.available_moves, one move per
+    (origin, destination), applied with apply_move_sequence.
+    Yields the packed moves, while they are applied to the game.
+    """
+    seen = set()
+    for move in CCReasoner.available_moves(game, game.player_turn):
+        packed = CCReasoner.packed_move(game, move)
+        if packed in seen:
+            continue
+        seen.add(packed)
+        game.apply_move_sequence(move)
+        yield packed
+        game.rotate_turn()
+        for _ in range(0, len(move.directions)):
+            game.undo_last_move()
+
+
+def _packed_moves(game: CCGame) -> Iterator[int]:
+    """
+    Search generator: CCReasoner.generate_packed_moves applied with
+    make_move (the way the strategies search)
+    """
+    for packed in list(CCReasoner.generate_packed_moves(game,
+                                                        game.player_turn)):
+        game.make_move(packed)
+        game.rotate_turn()
+        yield packed
+        game.rotate_turn()
+        game.unmake_move()
+
+
+GENERATORS = {
+    'available': _available_moves,
+    'packed': _packed_moves,
+}
+
+
+def perft(game: CCGame, depth: int, generator: str = 'available') -> int:
+    """
+    Number of positions reached after exactly 'depth' moves
+    """
+    if depth == 0:
+        return 1
+    if game.state() != 0:
+        return 0
+    generate = GENERATORS[generator]
+    if depth == 1:
+        return sum(1 for _ in generate(game))
+    return sum(perft(game, depth - 1, generator) for _ in generate(game))
+
+
+def divide(game: CCGame,
+           depth: int,
+           generator: str = 'available') -> Dict[int, int]:
+    """
+    perft of every move of the player to move, by packed move
+    (the counts add up to perft(game, depth))
+    """
+    if game.state() != 0:
+        return {}
+    return {move: perft(game, depth - 1, generator)
+            for move in GENERATORS[generator](game)}
+
+
+def load_reference(path: str = REFERENCE_FILE) -> List[dict]:
+    with open(path) as reference_file:
+        reference = json.load(reference_file)
+    if reference['version'] != PERFT_VERSION:
+        raise ValueError(
+            f'{path} holds perft counts of version {reference["version"]}, '
+            f'expected version {PERFT_VERSION} (rebuild it with --update)')
+    return reference['positions']
+
+
+def save_reference(positions: List[dict], path: str = REFERENCE_FILE):
+    # one position per line, so that changes are easy to diff
+    lines = ',\n  '.join(json.dumps(position) for position in positions)
+    with open(path, 'w') as reference_file:
+        reference_file.write(f'{{"version": {PERFT_VERSION}, "positions": [\n'
+                             f'  {lines}\n]}}\n')
+
+
+def initial_positions() -> List[dict]:
+    positions = []
+    for width, player_row_span in INITIAL_SIZES:
+        game = CCGame(width=width, player_row_span=player_row_span)
+        positions.append({'name': f'initial-{width}-{player_row_span}',
+                          'width': width,
+                          'player_row_span': player_row_span,
+                          'board': game.board,
+                          'player_turn': game.player_turn,
+                          'counts': []})
+    return positions
+
+
+def load_game(position: dict, game_class: Type[CCGame] = CCGame) -> CCGame:
+    game = game_class(width=position['width'],
+                      player_row_span=position['player_row_span'])
+    game.set_board([list(row) for row in position['board']])
+    if position['player_turn'] != game.player_turn:
+        game.rotate_turn()
+    return game
+
+
+def run(positions: List[dict],
+        depth: int,
+        generator: str,
+        game_class: Type[CCGame]) -> bool:
+    """
+    Compares perft counts, up to 'depth', with the reference ones.
+    Returns whether all of them match.
+    """
+    all_match = True
+    total_nodes = 0
+    total_time = 0.0
+    for position in positions:
+        game = load_game(position, game_class)
+        counts = position['counts']
+        for d in range(1, min(depth, len(counts)) + 1):
+            start = time.perf_counter()
+            nodes = perft(game, d, generator)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            match = nodes == counts[d - 1]
+            all_match &= match
+            print(f'{position["name"]:<36} depth {d} {nodes:>10} '
+                  f'{elapsed:>8.2f}s {nodes / max(elapsed, 1e-9):>9.0f} '
+                  f'nodes/s {"ok" if match else f"expected {counts[d - 1]}"}')
+    print(f'{total_nodes} nodes in {total_time:.2f}s, '
+          f'{total_nodes / max(total_time, 1e-9):.0f} nodes/s')
+    return all_match
+
+
+def run_divide(positions: List[dict],
+               depth: int,
+               generator: str,
+               game_class: Type[CCGame]):
+    for position in positions:
+        game = load_game(position, game_class)
+        geometry = game.geometry
+        moves = divide(game, depth, generator)
+        print(f'{position["name"]} depth {depth}')
+        lines = sorted((geometry.position(move_origin(move)),
+                        geometry.position(move_destination(move)),
+                        nodes) for move, nodes in moves.items())
+        for origin, dest, nodes in lines:
+            print(f'  {origin} -> {dest}: {nodes}')
+        print(f'  {len(moves)} moves, {sum(moves.values())} nodes')
+
+
+def update(positions: List[dict], depth: int, generator: str):
+    """
+    Recomputes the reference counts of every position up to 'depth'
+    """
+    for position in positions:
+        game = load_game(position)
+        start = time.perf_counter()
+        position['counts'] = [perft(game, d, generator)
+                              for d in range(1, depth + 1)]
+        print(f'{position["name"]}: {position["counts"]} '
+              f'({time.perf_counter() - start:.1f}s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=3,
+        help="Deepest ply counted.")
+    parser.add_argument(
+        "--position",
+        nargs='+',
+        default=None,
+        help="Names of the reference positions to use (default: all).")
+    parser.add_argument(
+        "--generator",
+        choices=list(GENERATORS),
+        default='available',
+        help="Move generator to count with.")
+    parser.add_argument(
+        "--bitboard",
+        action='store_true',
+        help="Use the bitboard backend (CCBitboardGame).")
+    parser.add_argument(
+        "--divide",
+        action='store_true',
+        help="Print the node count below every move at --depth.")
+    parser.add_argument(
+        "--update",
+        action='store_true',
+        help="Recompute the reference counts up to --depth and save them.")
+    parser.add_argument(
+        "--reference",
+        default=REFERENCE_FILE,
+        help="Reference counts file.")
+    args = parser.parse_args()
+
+    if args.update and not os.path.exists(args.reference):
+        positions = initial_positions()
+    else:
+        positions = load_reference(args.reference)
+    selected = [position for position in positions
+                if args.position is None or position['name'] in args.position]
+    if not selected:
+        raise ValueError(f'No reference position named {args.position}')
+    game_class = CCBitboardGame if args.bitboard else CCGame
+
+    if args.update:
+        update(selected, args.depth, args.generator)
+        save_reference(positions, args.reference)
+    elif args.divide:
+        run_divide(selected, args.depth, args.generator, game_class)
+    elif not run(selected, args.depth, args.generator, game_class):
+        sys.exit(1)
@@ -1,12 +1,14 @@
 import random
 import time
 import argparse
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from scipy import stats
 
 from chinese_checkers.game import CCGame
 from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.ponder import CCPonderer
+from chinese_checkers.strategy.profiler import PROFILE_MODES
 from chinese_checkers.pygame_gui import PygameGUI
 from chinese_checkers.manual_player import ManualPlayer
 from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
@@ -17,7 +19,14 @@ Entry point for playing interactively against the AI
 """
 
 
-def play(board_size: int, player_row_span: int):
+def play(board_size: int,
+         player_row_span: int,
+         time_limit: Optional[float] = None,
+         workers: int = 1,
+         ponder: bool = False,
+         opening_book: Optional[str] = None,
+         tablebase: Optional[str] = None,
+         profile: Optional[str] = None):
     random.seed(1)
 
     # (these weights were found running different experiments with the
@@ -37,9 +46,23 @@ def play(board_size: int, player_row_span: int):
         2: MinMaxStrategy(steps=1,
                           pre_sort_moves=True,
                           transposition_table=True,
-                          heuristic=oc_heuristic)
+                          move_ordering=True,
+                          pvs=True,
+                          batch_leaves=True,
+                          heuristic=oc_heuristic,
+                          time_limit=time_limit,
+                          workers=workers,
+                          opening_book=opening_book,
+                          tablebase=tablebase,
+                          profile=profile)
     }
 
+    # search on the manual player's time
+    ponderers = {
+        player: CCPonderer(strategy)
+        for player, strategy in ai_players.items()
+    } if ponder else {}
+
     start = time.time()
 
     player_turn = 1
@@ -62,16 +85,26 @@ def play(board_size: int, player_row_span: int):
         if player_turn not in manual_players:
             strategy = ai_players[player_turn]
             start = time.time()
-            move = strategy.select_move(game, player_turn)
+            move = None
+            if player_turn in ponderers:
+                move = ponderers[player_turn].result(game)
+            if move is None:
+                move = strategy.select_move(game, player_turn)
             end = time.time()
             ai_players_perf[player_turn].append(end - start)
             print(f'Move sequence: {move}')
             print(f'Turn {turns}')
             print(('Performance: '
                    f'{stats.describe(ai_players_perf[player_turn])}'))
+            print(f'Search: {strategy.search_stats.summary()}')
+            if strategy.tt:
+                print(f'Transposition table: {strategy.tt.stats()}')
             print(f'Heuristic values: {oc_heuristic.value(game, 1)} - '
                   f'{oc_heuristic.value(game, 2)}')
             game.apply_move_sequence(move)
+            if player_turn in ponderers:
+                print(f'Pondering: {ponderers[player_turn].stats()}')
+                ponderers[player_turn].start(game, player_turn)
         else:
             print("It's manual's player turn!")
             manual_player.move(game, player_turn)
@@ -83,6 +116,11 @@ def play(board_size: int, player_row_span: int):
 
         print('..........................')
 
+    for ponderer in ponderers.values():
+        ponderer.stop()
+    for strategy in ai_players.values():
+        strategy.close()
+
     print(f'PLAYER {game.state()} WINS after {turns} turns')
     end = time.time()
     print(end - start)
@@ -102,6 +140,43 @@ if __name__ == "__main__":
         help=("How many rows each player spans. These rows will be filled "
               "with pieces starting from the top or the bottom of th board "
               "e.g. 1 row=1 piece, 2 rows=3 pieces, 3 rows=6 pieces."))
+    parser.add_argument(
+        "--time_limit",
+        type=float,
+        default=None,
+        help=("Seconds the AI can think per move, searching deeper and "
+              "deeper while time allows. By default the AI searches to a "
+              "fixed depth instead."))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=("Processes the AI searches with. Only used when searching to "
+              "a fixed depth."))
+    parser.add_argument(
+        "--ponder",
+        action='store_true',
+        help=("Let the AI keep searching while the manual player thinks, "
+              "on the move it expects from them."))
+    parser.add_argument(
+        "--opening_book",
+        type=str,
+        default=None,
+        help=("Opening book file for the AI, see build_opening_book.py."))
+    parser.add_argument(
+        "--tablebase",
+        type=str,
+        default=None,
+        help=("Endgame tablebase file for the AI, see build_tablebase.py."))
+
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help=("Profile the searches of the AI, see "
+              "strategy/profiler.py (also enabled with CC_PROFILE)."))
 
     args = parser.parse_args()
-    play(args.board_size, args.player_row_span)
+    play(args.board_size, args.player_row_span, args.time_limit,
+         args.workers, args.ponder, args.opening_book, args.tablebase,
+         args.profile)
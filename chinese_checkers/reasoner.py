@@ -1,8 +1,12 @@
-from typing import List
+from typing import Dict, Iterator, List, Tuple
 
+from chinese_checkers.bitboard_game import CCBitboardGame
 from chinese_checkers.game import CCGame
+from chinese_checkers.geometry import DIRECTIONS, OFF_BOARD
 from chinese_checkers.movement import CCMovement
-from chinese_checkers.move import CCMove
+from chinese_checkers.move import (
+    CCMove, pack_move, move_origin, move_destination
+)
 
 
 class CCReasoner():
@@ -36,22 +40,21 @@ class CCReasoner():
         for movement in CCMovement:
             if game.can_move(row, column, movement):
                 turn = game.move(row, column, movement)
-                if (game.moved_to_row[-1],
-                        game.moved_to_column[-1]) in previous_positions:
+                dest = game.geometry.position(
+                    move_destination(game.move_history[-1]))
+                if dest in previous_positions:
                     # we already passed through this state, avoid
                     # infinite recursion
                     undo_movement()
                     continue
-                previous_positions.append((game.moved_to_row[-1],
-                                           game.moved_to_column[-1]))
+                previous_positions.append(dest)
                 previous_moves.append(movement)
                 moves.append(CCMove([*previous_positions], [*previous_moves]))
                 if turn == player:
                     # turn hasn't rotated -> current piece can still jump more
                     moves += (CCReasoner._available_moves(
                         game,
-                        game.moved_to_row[-1],
-                        game.moved_to_column[-1],
+                        *dest,
                         player,
                         previous_moves,
                         previous_positions))
@@ -89,3 +92,155 @@ class CCReasoner():
                                                          [(row, column)])
 
         return moves
+
+    @staticmethod
+    def _jump_closure(game: CCGame,
+                      cells: List[int],
+                      origin: int) -> Dict[int, Tuple[int, int]]:
+        """
+        Breadth-first search of the cells that the piece at 'origin' can
+        reach by jumping, on a flat copy of the board. The origin is
+        considered empty (the moving piece leaves it).
+
+        Returns a dict with the (parent cell, direction) of every reached
+        cell, in the order the cells were reached (origin first).
+        """
+        neighbors = game.geometry.neighbors
+        jumps = game.geometry.jumps
+        player = cells[origin]
+        cells[origin] = 0
+        parents = {origin: (-1, -1)}
+        queue = [origin]
+        for cell in queue:
+            for direction, dest in enumerate(jumps[cell]):
+                if(dest == OFF_BOARD or cells[dest] != 0 or
+                   dest in parents or
+                   cells[neighbors[cell][direction]] == 0):
+                    continue
+                parents[dest] = (cell, direction)
+                queue.append(dest)
+        cells[origin] = player
+        return parents
+
+    @staticmethod
+    def _jump_path(game: CCGame,
+                   parents: Dict[int, Tuple[int, int]],
+                   origin: int,
+                   dest: int) -> CCMove:
+        position = game.geometry.position
+        positions = []
+        directions = []
+        cell = dest
+        while cell != origin:
+            positions.append(position(cell))
+            cell, direction = parents[cell]
+            directions.append(DIRECTIONS[direction])
+        positions.append(position(origin))
+        positions.reverse()
+        directions.reverse()
+        return CCMove(positions, directions)
+
+    @staticmethod
+    def generate_moves(game: CCGame, player: int) -> Iterator[CCMove]:
+        """
+        Yields the moves that the player can make, like available_moves,
+        but only one move per distinct (origin, destination) pair, following
+        the shortest path to the destination.
+
+        Multi-jump destinations are found by a breadth-first search over
+        the jumps allowed by a snapshot of the board, so the game is never
+        modified and its visitors are not notified.
+        """
+        if player != game.player_turn:
+            return
+
+        geometry = game.geometry
+        position = geometry.position
+        can_step = not game.player_can_only_jump
+        # read-only, flat copy of the board
+        cells = [value for row in game.board for value in row]
+
+        for origin in range(0, geometry.n_cells):
+            if cells[origin] != player:
+                continue
+
+            reached = {origin}
+            if can_step:
+                for direction, dest in enumerate(geometry.neighbors[origin]):
+                    if dest != OFF_BOARD and cells[dest] == 0:
+                        reached.add(dest)
+                        yield CCMove([position(origin), position(dest)],
+                                     [DIRECTIONS[direction]])
+
+            parents = CCReasoner._jump_closure(game, cells, origin)
+            for dest in parents:
+                if dest not in reached:
+                    yield CCReasoner._jump_path(game, parents, origin, dest)
+
+    @staticmethod
+    def generate_packed_moves(game: CCGame, player: int) -> Iterator[int]:
+        """
+        Same moves, in the same order, as generate_moves, but packed as
+        integers (see move.pack_move). The path of a packed move can be
+        recovered with unpack_move, as long as the board hasn't changed.
+
+        The moves of a CCBitboardGame are generated by the game itself,
+        with bitwise operations: they are the same, but the destinations
+        of each piece come in cell order.
+        """
+        if player != game.player_turn:
+            return
+        if isinstance(game, CCBitboardGame):
+            yield from game.packed_moves(player)
+            return
+
+        geometry = game.geometry
+        can_step = not game.player_can_only_jump
+        cells = [value for row in game.board for value in row]
+
+        for origin in range(0, geometry.n_cells):
+            if cells[origin] != player:
+                continue
+
+            reached = {origin}
+            if can_step:
+                for dest in geometry.neighbors[origin]:
+                    if dest != OFF_BOARD and cells[dest] == 0:
+                        reached.add(dest)
+                        yield pack_move(origin, dest)
+
+            for dest in CCReasoner._jump_closure(game, cells, origin):
+                if dest not in reached:
+                    yield pack_move(origin, dest)
+
+    @staticmethod
+    def unpack_move(game: CCGame, move: int) -> CCMove:
+        """
+        Rebuilds the full CCMove (the shortest path) of a packed move, for
+        the current board. Raises ValueError if the destination can't be
+        reached.
+        """
+        geometry = game.geometry
+        origin = move_origin(move)
+        dest = move_destination(move)
+        cells = [value for row in game.board for value in row]
+        if dest in geometry.neighbors[origin]:
+            if cells[dest] != 0:
+                raise ValueError(f'Cell {dest} is not empty')
+            return CCMove(
+                [geometry.position(origin), geometry.position(dest)],
+                [DIRECTIONS[geometry.neighbors[origin].index(dest)]])
+
+        parents = CCReasoner._jump_closure(game, cells, origin)
+        if dest not in parents:
+            raise ValueError(f'No path from cell {origin} to cell {dest}')
+        return CCReasoner._jump_path(game, parents, origin, dest)
+
+    @staticmethod
+    def packed_move(game: CCGame, move: CCMove) -> int:
+        """
+        Inverse of unpack_move
+        """
+        geometry = game.geometry
+        return pack_move(geometry.cell(*move.board_positions[0]),
+                         geometry.cell(*move.board_positions[-1]))
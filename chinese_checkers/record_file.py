@@ -0,0 +1,84 @@
+import mmap
+import struct
+from typing import Iterable, Optional, Tuple
+
+"""
+Read-only files of fixed size records sorted by a 64 bit key, looked up
+by binary search on a memory map of the file: opening a file costs no
+load time, and only the pages touched by the searches are ever read.
+
+Layout (little endian):
+    - header: magic, format of the values (struct format, e.g. 'I'), and
+        metadata bytes of the user of the file (e.g. board size)
+    - records: key (unsigned 64 bit) followed by the value, sorted by key
+"""
+
+MAGIC = b'CCREC001'
+HEADER = struct.Struct('<8s8s48s')
+
+
+def write_record_file(path: str,
+                      records: Iterable[Tuple[int, object]],
+                      value_format: str,
+                      metadata: bytes = b''):
+    """
+    Writes the (key, value) records, in any order, to a new file. Keys
+    must be unique.
+    """
+    record = struct.Struct('<Q' + value_format)
+    sorted_records = sorted(records, key=lambda key_value: key_value[0])
+    for i in range(1, len(sorted_records)):
+        if sorted_records[i - 1][0] == sorted_records[i][0]:
+            raise ValueError(f'Duplicated key {sorted_records[i][0]}')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC,
+                            value_format.encode('ascii'),
+                            metadata))
+        for key, value in sorted_records:
+            f.write(record.pack(key, value))
+
+
+class CCRecordFile:
+    """
+    Read-only access to a file written by write_record_file
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, value_format, metadata = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a record file')
+        self.value_format = value_format.rstrip(b'\0').decode('ascii')
+        # padded with zeros
+        self.metadata = metadata
+        self.record = struct.Struct('<Q' + self.value_format)
+        self.n_records = (
+            (len(self.data) - HEADER.size) // self.record.size)
+
+    def __len__(self):
+        return self.n_records
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from(
+            '<Q', self.data, HEADER.size + index * self.record.size)[0]
+
+    def get(self, key: int) -> Optional[tuple]:
+        """
+        Values of the record with the given key, None if there is none
+        """
+        low = 0
+        high = self.n_records
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.n_records and self._key_at(low) == key:
+            return self.record.unpack_from(
+                self.data, HEADER.size + low * self.record.size)[1:]
+        return None
+
+    def close(self):
+        self.data.close()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from chinese_checkers.game_record import CCGameRecord, CCGameRecordWriter
+from chinese_checkers.tournament import play_game, random_opening
+
+"""
+Generates a corpus of games (see game_record.py) of an engine against
+itself, played by a pool of processes. Games start with a few random
+moves (seeded by the index of the game) so that they are all different.
+Games are written as soon as they are played, in order, so the corpus is
+the same whatever the number of processes, and never held in memory.
+
+python -m chinese_checkers.self_play --games 1000 --workers 4 \
+    --engine '{"steps": 1, "pre_sort_moves": true}' --output games.ccg
+"""
+
+DEFAULT_ENGINE = {
+    'steps': 1,
+    'pre_sort_moves': True,
+    'transposition_table': True,
+    'tt_memory_budget': 4 * 1024 * 1024,
+}
+
+
+def self_play_game(index: int,
+                   engine: dict,
+                   width: int,
+                   player_row_span: int,
+                   opening_plies: int,
+                   seed: int) -> CCGameRecord:
+    opening = random_opening(width, player_row_span, opening_plies,
+                             f'{seed}:{index}')
+    game = play_game(index, {'engine': engine}, 'engine', 'engine',
+                     width, player_row_span, opening)
+    return CCGameRecord(width, player_row_span,
+                        game['opening'] + game['moves'], game['result'])
+
+
+def generate(path: str,
+             n_games: int,
+             engine: dict,
+             width: int,
+             player_row_span: int,
+             opening_plies: int = 4,
+             workers: int = 1,
+             seed: int = 1):
+    """
+    Plays n_games games and writes them to a new file
+    """
+    start = time.monotonic()
+    # games being played, oldest first (only a few of them are waited for
+    # at a time, so that the results don't pile up in memory)
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            CCGameRecordWriter(path) as writer:
+        for index in range(0, n_games):
+            pending.append(executor.submit(
+                self_play_game, index, engine, width, player_row_span,
+                opening_plies, seed))
+            if len(pending) >= 4 * workers:
+                writer.write(pending.popleft().result())
+        while pending:
+            writer.write(pending.popleft().result())
+    print(f'{n_games} games written to {path} in '
+          f'{time.monotonic() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--games",
+        type=int,
+        default=100,
+        help="Number of games to play.")
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=5,
+        help="Length of the longest row of the board.")
+    parser.add_argument(
+        "--player_row_span",
+        type=int,
+        default=3,
+        help="How many rows each player spans.")
+    parser.add_argument(
+        "--engine",
+        type=json.loads,
+        default=DEFAULT_ENGINE,
+        help=("MinMaxStrategy arguments (JSON), plus the weights of its "
+              "heuristic, like the engines of tournament.py."))
+    parser.add_argument(
+        "--opening_plies",
+        type=int,
+        default=4,
+        help="Random moves played at the start of each game.")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Seed of the random openings.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes playing games at the same time.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=True,
+        help="File the games are written to.")
+    args = parser.parse_args()
+    generate(args.output, args.games, args.engine, args.board_size,
+             args.player_row_span, args.opening_plies, args.workers,
+             args.seed)
@@ -1,20 +1,79 @@
-from typing import Tuple, Dict, Optional
-from queue import PriorityQueue
+import time
+from typing import Dict, List, Tuple, Optional
 
+import numpy as np
 
 from chinese_checkers.game import CCGame
 from chinese_checkers.strategy.only_max_strategy import OnlyMaxStrategy
 from chinese_checkers.heuristic.heuristic import CCHeuristic
 from chinese_checkers.heuristic.heuristics import CombinedHeuristic
 from chinese_checkers.helpers import CCZobristHash
-from chinese_checkers.move import CCMove, PrioritizedCCMove
+from chinese_checkers.move import (
+    CCMove, move_origin, move_destination, MOVE_CELL_BITS, MOVE_CELL_MASK
+)
+from chinese_checkers.strategy.move_ordering import CCMoveOrdering
+from chinese_checkers.strategy.opening_book import CCOpeningBook
+from chinese_checkers.strategy.parallel_search import CCParallelRootSearch
+from chinese_checkers.strategy.profiler import (
+    PROFILE_MODES, profile_mode, search_profiler
+)
+from chinese_checkers.strategy.search_stats import CCSearchStats
 from chinese_checkers.strategy.strategy import CCStrategy
+from chinese_checkers.strategy.tablebase import CCRaceTablebase
+from chinese_checkers.strategy.transposition_table import (
+    CCTranspositionTable, to_tt_score, from_tt_score, WIN_SCORE_THRESHOLD
+)
+
+# deepest search (in plies) iterative deepening will try
+MAX_SEARCH_DEPTH = 64
+# width of the null windows of principal variation search, scores are
+# floats so the window can't be empty
+PVS_WINDOW = 1e-6
+# races scored with the tablebase are worth RACE_SCORE / (depth + 1), depth
+# being the one of the move that wins the race: above any heuristic score,
+# below any actual win (WIN_SCORE_THRESHOLD). Unlike wins, they can't be
+# told apart from heuristic scores, so they can't be made relative to the
+# node (see to_tt_score): the scores that depend on them are not stored in
+# the transposition table
+RACE_SCORE = 500
 
 
 class MinMaxStrategy(CCStrategy):
     """
     Choose the best movement based on building a Min/Max tree
     Optionally apply alpha-beta pruning and/or transposition table lookup
+    With alpha-beta pruning, moves can be ordered by vertical advance
+    (pre_sort_moves) and/or by the transposition table, killer moves and
+    history heuristic (move_ordering), see CCMoveOrdering.
+    With principal variation search (pvs), only the first move of each
+    node is searched with the full alpha-beta window: the rest are just
+    tested to be worse with a null window, and searched again only if
+    they are not.
+
+    Fixed depth searches can be spread over several processes (workers),
+    each of them searching some of the moves of the root of the tree. The
+    processes are kept until close() is called.
+
+    With batch_leaves, the moves of the nodes right above the leaves are
+    not made one by one: the scores of all of them are computed at once
+    with NumPy by the heuristic (see
+    OptimizedCombinedHeuristic.batch_values).
+
+    If an opening book (file path) is given, positions found in it are
+    not searched, the move of the book is played instead.
+    Likewise, if a race tablebase (file path) is given, the race at the
+    end of the game is played by the tablebase, and the nodes of the tree
+    in which both players are racing are scored by it (see
+    _tablebase_score).
+
+    By default the tree is searched up to a fixed depth (steps). If a
+    time limit (in seconds) is given, the tree is searched by iterative
+    deepening instead, one ply deeper each time, until the time is over.
+
+    The counters of the last search are kept in search_stats (see
+    CCSearchStats). Searches can also be profiled ('sample' or 'cprofile',
+    by default the mode of the CC_PROFILE environment variable, see
+    profiler.py).
     """
 
     def __init__(self, steps: int = 1,
@@ -22,18 +81,80 @@ class MinMaxStrategy(CCStrategy):
                  pre_sort_moves: bool = False,
                  extra_prunning: bool = False,
                  transposition_table: bool = False,
-                 heuristic: CCHeuristic = CombinedHeuristic()):
+                 heuristic: CCHeuristic = CombinedHeuristic(),
+                 tt_memory_budget: int = 32 * 1024 * 1024,
+                 time_limit: Optional[float] = None,
+                 move_ordering: bool = False,
+                 pvs: bool = False,
+                 workers: int = 1,
+                 opening_book: Optional[str] = None,
+                 tablebase: Optional[str] = None,
+                 batch_leaves: bool = False,
+                 profile: Optional[str] = None):
         self.steps = steps
         self.alpha_beta_pruning = alpha_beta_pruning
         self.pre_sort_moves = pre_sort_moves
         if self.pre_sort_moves and not self.alpha_beta_pruning:
             raise ValueError("""
                 Invalid config: pre-sort moves without alpha beta pruning""")
+        self.move_ordering = move_ordering
+        if self.move_ordering and not self.alpha_beta_pruning:
+            raise ValueError("""
+                Invalid config: move ordering without alpha beta pruning""")
+        # created on first use and kept for the whole game
+        self.ordering: Optional[CCMoveOrdering] = None
+        self.pvs = pvs
+        if self.pvs and not self.alpha_beta_pruning:
+            raise ValueError("""
+                Invalid config: principal variation search without alpha
+                beta pruning""")
         self.heuristic = heuristic
+        self.batch_leaves = batch_leaves
+        if self.batch_leaves and not hasattr(heuristic, 'batch_values'):
+            raise ValueError("""
+                Invalid config: batch leaves with a heuristic that can't
+                evaluate moves in batches""")
+        # goal cells of each player of the last board size searched, for
+        # batch_leaves
+        self._goal_cells: Optional[list] = None
         # TODO must be better named and/or documented
         self.extra_prunning = extra_prunning
         self.transposition_table = transposition_table
+        self.tt_memory_budget = tt_memory_budget
         self.hasher: Optional[CCZobristHash] = None
+        # created on first use and kept for the whole game
+        self.tt: Optional[CCTranspositionTable] = None
+        self.only_max_tt: Optional[CCTranspositionTable] = None
+        self.time_limit = time_limit
+        self.workers = workers
+        self._parallel_search: Optional[CCParallelRootSearch] = None
+        self.opening_book = (
+            CCOpeningBook(opening_book) if opening_book else None)
+        self.tablebase_path = tablebase
+        self.tablebase = CCRaceTablebase(tablebase) if tablebase else None
+        # races scored so far, see RACE_SCORE
+        self._race_scores = 0
+        self.profile = profile_mode() if profile is None else profile
+        if self.profile and self.profile not in PROFILE_MODES:
+            raise ValueError(f"""
+                Invalid config: profile mode '{self.profile}', must be one
+                of {PROFILE_MODES}""")
+
+        # depth of the deepest nodes to be expanded
+        self.max_depth = self.steps * 2
+        # iterative deepening business logic
+        self._deadline: Optional[float] = None
+        self._aborted = False
+        # set (from another thread) to interrupt the search, see stop()
+        self._stopped = False
+        # depth (in plies) of the last search that could be completed
+        self.searched_depth = 0
+        # principal variation (best line) of the last search, and of the
+        # subtree being searched at each depth
+        self.principal_variation: List[int] = []
+        self._pv_table: Dict[int, List[int]] = {}
+        self._follow_pv = False
+        self.search_stats = CCSearchStats()
 
     def _use_only_max(self, game: CCGame):
         """Returns True if the strategy can avoid running a MinMax and
@@ -62,50 +183,39 @@ class MinMaxStrategy(CCStrategy):
             return True
         return False
 
-    def _select_move(self,
-                     game: CCGame,
-                     player: int,
-                     depth: int,
-                     alpha: float,
-                     beta: float) -> Tuple[CCMove, float]:
+    def _ordered_moves(self,
+                       game: CCGame,
+                       player: int,
+                       depth: int,
+                       tt_move: Optional[int] = None) -> List[int]:
         """
-        Returns: tuple
-            - position 0: best movem that can be done by the player
-                at this level.
-            - position 1: best heuristic value that can be achieved at this
-                level if following best move.
-                Heuristic is negative for player 2 and position for player 1.
+        Available (packed) moves of the player, in the order they should
+        be searched in
         """
-        if self.hasher:
-            # transposition table business logic
-            position_hash = self.hasher.get_hash(game)
-            tt = (
-                self.transposition_table_1 if player == 1 else
-                self.transposition_table_2
-            )
-            best_move, best_score, cached_depth = (
-                tt.get(position_hash, (None, -100000.0, -1))
-            )
-            if best_move and cached_depth == depth:
-                return (best_move, best_score)
-
-        moves = self.available_moves(game, player)
-        if game.player_turn != player:
-            raise AssertionError("""
-                Player turn hasn't been rotated properly - this is likely
-                a software bug
-            """)
+        ordering = self.ordering
+        ordered_moves = []
+        cell_row = game.geometry.cell_row
+        moves = self.generate_packed_moves(game, player)
 
-        moves_queue = PriorityQueue()  # type: ignore
+        pv_move = None
+        if self._follow_pv:
+            # try first the move of the previous iteration's best line
+            if depth < len(self.principal_variation):
+                pv_move = self.principal_variation[depth]
+            self._follow_pv = False
 
         for move in moves:
             priority = 1
-            positions = move.board_positions
+            if move == pv_move:
+                self._follow_pv = True
+                continue
             if self.pre_sort_moves:
                 advance = (
-                    positions[-1][0] - positions[0][0] if player == 1 else
-                    positions[0][0] - positions[-1][0]
+                    cell_row[move_destination(move)] -
+                    cell_row[move_origin(move)]
                 )
+                if player == 2:
+                    advance = -advance
 
                 if(self.extra_prunning
                    and advance <= 0
@@ -117,61 +227,298 @@ class MinMaxStrategy(CCStrategy):
                 # otherwise sort movements by vertical advance to maximize
                 # alpha-beta pruning
                 priority = -advance
-            moves_queue.put(PrioritizedCCMove(priority, move))
+            if ordering:
+                # vertical advance only breaks ties
+                priority = (ordering.priority(move, depth, tt_move),
+                            priority)
+            ordered_moves.append((priority, move))
+        ordered_moves.sort()
+        if self._follow_pv:
+            ordered_moves.insert(0, (None, pv_move))
+        return [move for _, move in ordered_moves]
+
+    def _end_score(self,
+                   game: CCGame,
+                   player: int,
+                   depth: int) -> Optional[float]:
+        """
+        Score of the game if it has ended with the last move, done by the
+        player at the given depth. None if the game goes on.
+        """
+        state = game.state()
+        if state == 0:
+            return None
+        if state == player:
+            # prefer winning in as few steps as possible
+            score = 100000 / (depth + 1)
+        else:
+            score = -100000
+        if depth % 2 == 1:
+            # minimizing
+            score = -score
+        return score
+
+    def _leaf_score(self,
+                    game: CCGame,
+                    player: int,
+                    depth: int) -> float:
+        """
+        Approximate the score of the game after the last move, done by the
+        player at the given depth, by subtracting heuristics
+        """
+        if hasattr(self.heuristic, 'differential_value'):
+            # both values at once
+            score = self.heuristic.differential_value(game, player)
+        else:
+            score = (
+                self.heuristic.value(game, player) -
+                self.heuristic.value(game, 2 if player == 1 else 1)
+            )
+        if depth % 2 == 1:
+            # minimizing
+            score = -score
+        return score
+
+    def _tablebase_score(self,
+                         game: CCGame,
+                         player: int,
+                         depth: int) -> Optional[float]:
+        """
+        Score of the node, where the player moves at the given depth, if
+        both players are racing and are in the tablebase. The player wins
+        the race if it needs no more moves than the other one.
+        The distances of the tablebase assume that the players don't get
+        in each other's way any more, which isn't proven by just being
+        separated, so races are not scored as wins (see RACE_SCORE).
+        """
+        distances = self.tablebase.race_distances(game)
+        if distances is None:
+            return None
+        own = distances[player - 1]
+        other = distances[2 - player]
+        if own <= other:
+            # the player wins with its own move number own
+            win_depth = depth + 2 * own - 2
+            player_wins = True
+        else:
+            win_depth = depth + 2 * other - 1
+            player_wins = False
+        score = RACE_SCORE / (win_depth + 1)
+        if player_wins != (depth % 2 == 0):
+            # won by the minimizing player
+            score = -score
+        return score
+
+    def _batch_leaf_scores(self,
+                           game: CCGame,
+                           player: int,
+                           depth: int,
+                           moves: List[int]) -> List[float]:
+        """
+        Scores of the game after each of the moves, done by the player at
+        the given depth, computed all at once. Same as _end_score, or
+        _leaf_score if the game goes on, after making each move.
+        """
+        geometry = game.geometry
+        if(self._goal_cells is None or
+           len(self._goal_cells[1]) != geometry.n_cells):
+            cell_row = np.array(geometry.cell_row)
+            span = geometry.player_row_span
+            self._goal_cells = [
+                None,
+                (cell_row >= geometry.height - span).astype(np.int64),
+                (cell_row < span).astype(np.int64)
+            ]
+        goal_cells = self._goal_cells[player]
+
+        # goal positions the player has still to fill
+        span = geometry.player_row_span
+        goal_rows = (range(geometry.height - span, geometry.height)
+                     if player == 1 else range(0, span))
+        missing = 0
+        for row in goal_rows:
+            missing += len(game.board[row]) - game.board[row].count(player)
+
+        moves = np.array(moves)
+        origins = moves & MOVE_CELL_MASK
+        dests = moves >> MOVE_CELL_BITS
+        # the other player's pieces don't move, neither does its value
+        scores = (
+            self.heuristic.batch_values(player, origins, dests) -
+            self.heuristic.value(game, 2 if player == 1 else 1)
+        )
+        wins = missing - goal_cells[dests] + goal_cells[origins] == 0
+        scores = np.where(wins, 100000 / (depth + 1), scores)
+        if depth % 2 == 1:
+            # minimizing
+            scores = -scores
+        return scores.tolist()
+
+    def _select_move(self,
+                     game: CCGame,
+                     player: int,
+                     depth: int,
+                     alpha: float,
+                     beta: float) -> Tuple[int, float]:
+        """
+        Returns: tuple
+            - position 0: best move (packed, see move.pack_move) that can be
+                done by the player at this level.
+            - position 1: best heuristic value that can be achieved at this
+                level if following best move.
+                Heuristic is negative for player 2 and position for player 1.
+        """
+        if(self._deadline is not None and
+           (self._stopped or time.monotonic() >= self._deadline)):
+            # out of time, unwind the search
+            self._aborted = True
+            return (None, 0.0)
 
-        best_move = None
         maximizing = depth % 2 == 0
+        # remaining depth below this node
+        draft = self.max_depth - depth
+        alpha_orig = alpha
+        beta_orig = beta
+        self._pv_table[depth] = []
+
+        if self.tablebase and depth > 0:
+            score = self._tablebase_score(game, player, depth)
+            if score is not None:
+                self._race_scores += 1
+                return (None, score)
+
+        tt = self.tt
+        tt_move = None
+        if tt:
+            # transposition table business logic
+            position_hash = self.hasher.get_hash(game)
+            entry = tt.probe(position_hash)
+            if entry:
+                # even if not searched deep enough, the best move is
+                # likely to be good here too
+                tt_move = entry[0]
+            if entry and entry[2] >= draft:
+                _, tt_score, _, tt_flag = entry
+                tt_score = from_tt_score(tt_score, depth)
+                if not maximizing:
+                    # scores are stored from the point of view of the
+                    # player to move, and here they are from the point of
+                    # view of the player at the root
+                    tt_score = -tt_score
+                    if tt_flag != tt.EXACT:
+                        tt_flag = (tt.LOWER_BOUND
+                                   if tt_flag == tt.UPPER_BOUND else
+                                   tt.UPPER_BOUND)
+                if(tt_flag == tt.EXACT or
+                   (tt_flag == tt.LOWER_BOUND and tt_score >= beta) or
+                   (tt_flag == tt.UPPER_BOUND and tt_score <= alpha)):
+                    tt.cutoffs += 1
+                    return (tt_move, tt_score)
+
+        if game.player_turn != player:
+            raise AssertionError("""
+                Player turn hasn't been rotated properly - this is likely
+                a software bug
+            """)
+
+        stats = self.search_stats
+        perf_counter = time.perf_counter
+        # to tell whether any score of the subtree is a race
+        race_scores = self._race_scores
+        start = perf_counter()
+        ordered_moves = self._ordered_moves(game, player, depth, tt_move)
+        stats.generation_time += perf_counter() - start
+        stats.moves_generated += len(ordered_moves)
+        ordering = self.ordering
+
+        best_move = None
         best_score = -100000.0 if maximizing else 100000.0
 
-        while not moves_queue.empty():
-            move = moves_queue.get().move
-            if not best_move:
-                best_move = move
+        leaf_scores = None
+        if(self.batch_leaves and depth == self.max_depth and
+           ordered_moves):
+            start = perf_counter()
+            leaf_scores = self._batch_leaf_scores(game, player, depth,
+                                                  ordered_moves)
+            stats.evaluation_time += perf_counter() - start
+            stats.leaves += len(leaf_scores)
 
-            game.apply_move_sequence(move)
+        for index, move in enumerate(ordered_moves):
+            first_move = best_move is None
+            if first_move:
+                best_move = move
+                self._pv_table[depth] = [move]
+            child_line = []
 
-            # check if game has already ended
-            if game.state() == 1:
-                # player 1 wins
-                # prefer winning in as few steps as possible
-                curr_score = (
-                    100000 / (depth + 1) if player == 1 else -100000
-                )
-                if not maximizing:
-                    curr_score = -curr_score
-            elif game.state() == 2:
-                # player 2 wins
-                # prefer winning in as few steps as possible
-                curr_score = (
-                    -100000 if player == 1 else 100000 / (depth + 1)
-                )
-                if not maximizing:
-                    curr_score = -curr_score
+            if leaf_scores is not None:
+                # already evaluated
+                stats.depth_nodes[depth] += 1
+                curr_score = leaf_scores[index]
             else:
-                if depth == self.steps * 2:  # maximizing
-                    # approximate the score of the game by
-                    # subtracting heuristics
-                    curr_score = (
-                        self.heuristic.value(game, player) -
-                        self.heuristic.value(game, 2 if player == 1 else 1)
-                    )
-                else:
-                    curr_score = self._select_move(game,
-                                                   2 if player == 1 else 1,
-                                                   depth + 1,
-                                                   alpha, beta)[1]
+                start = perf_counter()
+                game.make_move(move)
+                game.rotate_turn()
+                stats.make_time += perf_counter() - start
+                stats.depth_nodes[depth] += 1
+
+                # check if game has already ended
+                curr_score = self._end_score(game, player, depth)
+                if curr_score is None:
+                    if depth == self.max_depth:
+                        start = perf_counter()
+                        curr_score = self._leaf_score(game, player, depth)
+                        stats.evaluation_time += perf_counter() - start
+                        stats.leaves += 1
+                    else:
+                        other_player = 2 if player == 1 else 1
+                        if self.pvs and not first_move:
+                            # null window search, just to prove that the move
+                            # is not better than the best one so far
+                            if maximizing:
+                                window = (alpha, alpha + PVS_WINDOW)
+                            else:
+                                window = (beta - PVS_WINDOW, beta)
+                            curr_score = self._select_move(game,
+                                                           other_player,
+                                                           depth + 1,
+                                                           *window)[1]
+                            if(alpha < curr_score < beta and
+                               not self._aborted):
+                                # it is better, find out its exact score (the
+                                # null window score is already a bound of it)
+                                stats.researches += 1
+                                if maximizing:
+                                    window = (curr_score, beta)
+                                else:
+                                    window = (alpha, curr_score)
+                                curr_score = self._select_move(game,
+                                                               other_player,
+                                                               depth + 1,
+                                                               *window)[1]
+                        else:
+                            curr_score = self._select_move(game,
+                                                           other_player,
+                                                           depth + 1,
+                                                           alpha, beta)[1]
+                        child_line = self._pv_table[depth + 1]
+
+                # undo movement
+                start = perf_counter()
+                game.rotate_turn()
+                game.unmake_move()
+                stats.make_time += perf_counter() - start
+            # only the first move can follow the previous best line
+            self._follow_pv = False
+
+            if self._aborted:
+                break
 
             # keep the best move that can be done at this level
             if((maximizing and curr_score > best_score) or
                (not maximizing and curr_score < best_score)):
                 best_score = curr_score
                 best_move = move
-
-            # undo movement
-            if game.player_turn != player:
-                game.rotate_turn()
-            for _ in range(0, len(move.directions)):
-                game.undo_last_move()
+                self._pv_table[depth] = [move] + child_line
 
             # perform alpha-beta pruning
             if self.alpha_beta_pruning:
@@ -181,37 +528,259 @@ class MinMaxStrategy(CCStrategy):
                     beta = min(beta, best_score)
                 if beta <= alpha:
                     # alpha/beta pruning
+                    stats.cutoffs += 1
+                    stats.cutoff_indexes[index] += 1
+                    if ordering:
+                        ordering.on_cutoff(move, depth, draft)
                     break
 
-        if best_move:
-            if self.hasher:
-                # save into transposition table
-                tt[position_hash] = (best_move, best_score, depth)
+        if self._aborted:
+            return (best_move, best_score)
+
+        if best_move is not None:
+            if tt and self._race_scores == race_scores:
+                # save into transposition table (scores of races are
+                # relative to the root, see RACE_SCORE)
+                if best_score <= alpha_orig:
+                    flag = tt.UPPER_BOUND
+                elif best_score >= beta_orig:
+                    flag = tt.LOWER_BOUND
+                else:
+                    flag = tt.EXACT
+                tt_score = best_score
+                if not maximizing:
+                    tt_score = -tt_score
+                    if flag != tt.EXACT:
+                        flag = (tt.LOWER_BOUND
+                                if flag == tt.UPPER_BOUND else
+                                tt.UPPER_BOUND)
+                tt.store(position_hash,
+                         best_move,
+                         to_tt_score(tt_score, depth),
+                         draft,
+                         flag)
             return (best_move, best_score)
         else:
             raise AssertionError("""
                 No possible movements available, this must be a software bug
             """)
 
-    def select_move(self, game: CCGame, player: int) -> CCMove:
+    def _iterative_deepening(self,
+                             game: CCGame,
+                             player: int,
+                             time_limit: float,
+                             depth_limit: int = MAX_SEARCH_DEPTH) -> int:
+        """
+        Searches one ply deeper at a time until time_limit seconds have
+        passed (or the search is stopped, or depth_limit plies have been
+        searched), and returns the best move of the deepest search that
+        could be completed (the first, one ply search, always completes).
+        Each search tries first the best line found by the previous one.
+        """
+        deadline = time.monotonic() + time_limit
+        best_move = None
+        self.principal_variation = []
+        self.searched_depth = 0
+        try:
+            for max_depth in range(0, depth_limit + 1):
+                self.max_depth = max_depth
+                self._aborted = False
+                self._follow_pv = True
+                move, score = self._select_move(game, player, 0,
+                                                -100000.0, 100000.0)
+                if self._aborted:
+                    break
+                best_move = move
+                self.principal_variation = self._pv_table[0]
+                self.searched_depth = max_depth
+                # from now on searches can be interrupted
+                self._deadline = deadline
+                if(abs(score) > WIN_SCORE_THRESHOLD or
+                   self._stopped or
+                   time.monotonic() >= deadline):
+                    # the outcome of the game is already known, or there
+                    # is no time for a deeper search
+                    break
+        finally:
+            self._deadline = None
+            self._aborted = False
+            self._follow_pv = False
+            self.max_depth = self.steps * 2
+        return best_move
+
+    def _search_root_move(self,
+                          game: CCGame,
+                          player: int,
+                          move: int,
+                          alpha: float,
+                          beta: float) -> Tuple[float, List[int]]:
+        """
+        Searches a single move of the root of the tree.
+
+        Returns: tuple
+            - position 0: score of the move, see _select_move
+            - position 1: best line (packed moves) starting with the move
+        """
+        stats = self.search_stats
+        start = time.perf_counter()
+        game.make_move(move)
+        game.rotate_turn()
+        stats.make_time += time.perf_counter() - start
+        stats.depth_nodes[0] += 1
+
+        line = [move]
+        score = self._end_score(game, player, 0)
+        if score is None:
+            if self.max_depth == 0:
+                start = time.perf_counter()
+                score = self._leaf_score(game, player, 0)
+                stats.evaluation_time += time.perf_counter() - start
+                stats.leaves += 1
+            else:
+                score = self._select_move(game,
+                                          2 if player == 1 else 1,
+                                          1, alpha, beta)[1]
+                line += self._pv_table[1]
+
+        start = time.perf_counter()
+        game.rotate_turn()
+        game.unmake_move()
+        stats.make_time += time.perf_counter() - start
+        return (score, line)
+
+    def _worker_config(self) -> dict:
+        """
+        Constructor arguments of the strategies of the worker processes
+        """
+        return {
+            'steps': self.steps,
+            'alpha_beta_pruning': self.alpha_beta_pruning,
+            'pre_sort_moves': self.pre_sort_moves,
+            'extra_prunning': self.extra_prunning,
+            'transposition_table': self.transposition_table,
+            'heuristic': self.heuristic,
+            # the memory budget is for all the processes
+            'tt_memory_budget': self.tt_memory_budget // self.workers,
+            'move_ordering': self.move_ordering,
+            'pvs': self.pvs,
+            'tablebase': self.tablebase_path,
+            'batch_leaves': self.batch_leaves,
+        }
+
+    def stop(self):
+        """
+        Interrupts the (iterative deepening) search being run by another
+        thread, which returns the best move found so far
+        """
+        self._stopped = True
+
+    def close(self):
+        """
+        Stops the worker processes, if any
+        """
+        if self._parallel_search:
+            self._parallel_search.close()
+            self._parallel_search = None
+
+    def _prepare_search(self, game: CCGame, new_search: bool = True):
+        """
+        Gets the hasher and tables ready to search the game. Tables are
+        aged only if it is a new search (e.g. a new turn), and not another
+        part of the same one.
+        """
         if self.transposition_table:
-            # initialize transposition tables on every turn
-            self.transposition_table_1: Dict[int, Tuple[CCMove, float, int]] =\
-                {}
-            self.transposition_table_2: Dict[int, Tuple[CCMove, float, int]] =\
-                {}
-            if not self.hasher:
-                # initialize hasher (only once for each game instance)
-                self.hasher = CCZobristHash(game)
-        if self._use_only_max(game):
+            if not self.hasher or self.hasher.game is not game:
+                # attach the hasher (only once for each game instance)
+                self.hasher = CCZobristHash.of(game)
+            else:
+                # the turn may have been assigned since the last search
+                self.hasher.resync()
+            if not self.tt:
+                # tables are kept across turns
+                self.tt = CCTranspositionTable(self.tt_memory_budget)
+                self.only_max_tt = CCTranspositionTable(
+                    self.tt_memory_budget // 4)
+            if new_search:
+                self.tt.new_search()
+        if self.move_ordering:
+            if(not self.ordering or
+               self.ordering.n_cells != game.geometry.n_cells):
+                self.ordering = CCMoveOrdering(game.geometry.n_cells)
+            if new_search:
+                self.ordering.new_search()
+        self.search_stats = CCSearchStats()
+        self.search_stats.watch(self.tt)
+        self._stopped = False
+
+    def select_move(self,
+                    game: CCGame,
+                    player: int,
+                    time_limit: Optional[float] = None) -> CCMove:
+        """
+        time_limit: seconds to search for, overrides the time limit of the
+            strategy. If None (and the strategy has no time limit either),
+            search up to the fixed depth given by steps.
+        """
+        # the search undoes all its moves, other visitors of the game (e.g.
+        # the heuristic of the other player) can miss them
+        self.search_stats = CCSearchStats()
+        with game.only_visitors([self.heuristic, self.hasher]):
+            if self.profile:
+                move = search_profiler(self.profile).run(
+                    self._choose_move, game, player, time_limit)
+            else:
+                move = self._choose_move(game, player, time_limit)
+        self.search_stats.finish()
+        return move
+
+    def _choose_move(self,
+                     game: CCGame,
+                     player: int,
+                     time_limit: Optional[float]) -> CCMove:
+        if time_limit is None:
+            time_limit = self.time_limit
+        if self.opening_book and game.player_turn == player:
+            move = self.opening_book.probe(game)
+            if move is not None:
+                self.principal_variation = []
+                self.search_stats.source = 'opening_book'
+                return move
+        if self.tablebase and game.player_turn == player:
+            move = self.tablebase.best_move(game, player)
+            if move is not None:
+                self.principal_variation = []
+                self.search_stats.source = 'tablebase'
+                return self.unpack_move(game, move)
+        self._prepare_search(game)
+        self.search_stats.only_max = self._use_only_max(game)
+        if self.search_stats.only_max:
             only_max = OnlyMaxStrategy(
                 player,
                 self.steps,
                 transposition_table=self.transposition_table,
-                heuristic=self.heuristic)
-            # reuse hasher instance
+                heuristic=self.heuristic,
+                profile=self.profile)
+            # reuse hasher and table instances
             only_max.hasher = self.hasher
+            only_max.tt = self.only_max_tt
+            self.principal_variation = []
             move = only_max.select_move(game, player)
+            only_max.search_stats.source = 'only_max'
+            only_max.search_stats.only_max = True
+            self.search_stats = only_max.search_stats
+            return move
+        if time_limit is None and self.workers > 1:
+            if not self._parallel_search:
+                self._parallel_search = CCParallelRootSearch(
+                    type(self), self._worker_config(), self.workers)
+            move, self.principal_variation = self._parallel_search.search(
+                self, game, player)
+            self.searched_depth = self.max_depth
+        elif time_limit is None:
+            move, _ = self._select_move(game, player, 0,
+                                        -100000.0, 100000.0)
+            self.principal_variation = self._pv_table[0]
+            self.searched_depth = self.max_depth
         else:
-            move, _ = self._select_move(game, player, 0, -100000.0, 100000.0)
-        return move
+            move = self._iterative_deepening(game, player, time_limit)
+        return self.unpack_move(game, move)
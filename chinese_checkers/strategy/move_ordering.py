@@ -0,0 +1,73 @@
+from typing import List, Optional
+
+from chinese_checkers.move import move_origin, move_destination
+
+
+class CCMoveOrdering:
+    """
+    Move ordering for alpha-beta search, meant to live for a whole game.
+
+    Moves are tried in this order:
+        - the best move stored in the transposition table for the position
+        - killer moves: moves that caused a cutoff at the same depth of the
+            tree, in a sibling position
+        - the rest, by history score: how much (and how deep) moving from
+            the origin to the destination cell caused cutoffs so far
+    """
+
+    # killer moves kept per depth, most recent first
+    KILLER_SLOTS = 2
+
+    # rank of each kind of move, lower ranks are tried first
+    TT_MOVE = 0
+    KILLER_MOVE = 1
+    OTHER_MOVE = 1 + KILLER_SLOTS
+
+    def __init__(self, n_cells: int):
+        self.n_cells = n_cells
+        # history score of every (origin, destination) pair of cells
+        self.history = [0] * (n_cells * n_cells)
+        self.killers: List[List[int]] = []
+
+    def new_search(self):
+        """
+        Must be called before every new search (e.g. every turn). Killer
+        moves are forgotten, and history scores are aged so that recent
+        cutoffs weight more than the ones of past turns.
+        """
+        self.killers = []
+        self.history = [score >> 1 for score in self.history]
+
+    def priority(self,
+                 move: int,
+                 depth: int,
+                 tt_move: Optional[int] = None) -> tuple:
+        """
+        Sorting key of a (packed) move, lower keys are tried first
+        """
+        if move == tt_move:
+            return (self.TT_MOVE, 0)
+        if depth < len(self.killers):
+            killers = self.killers[depth]
+            if move in killers:
+                return (self.KILLER_MOVE + killers.index(move), 0)
+        return (self.OTHER_MOVE,
+                -self.history[move_origin(move) * self.n_cells +
+                              move_destination(move)])
+
+    def on_cutoff(self, move: int, depth: int, draft: int):
+        """
+        Records a move that caused an alpha-beta cutoff. draft is the
+        remaining depth below the node, cutoffs close to the root prune
+        bigger subtrees and are rewarded more.
+        """
+        while len(self.killers) <= depth:
+            self.killers.append([])
+        killers = self.killers[depth]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.KILLER_SLOTS:]
+
+        self.history[move_origin(move) * self.n_cells +
+                     move_destination(move)] += (draft + 1) * (draft + 1)
@@ -1,11 +1,19 @@
-from typing import Optional, Dict, Tuple
+import time
+from typing import Optional, Tuple
 
 from chinese_checkers.game import CCGame
 from chinese_checkers.heuristic.heuristic import CCHeuristic
 from chinese_checkers.heuristic.heuristics import CombinedHeuristic
 from chinese_checkers.helpers import CCZobristHash
 from chinese_checkers.move import CCMove
+from chinese_checkers.strategy.profiler import (
+    PROFILE_MODES, profile_mode, search_profiler
+)
+from chinese_checkers.strategy.search_stats import CCSearchStats
 from chinese_checkers.strategy.strategy import CCStrategy
+from chinese_checkers.strategy.transposition_table import (
+    CCTranspositionTable, to_tt_score, from_tt_score
+)
 
 
 class OnlyMaxStrategy(CCStrategy):
@@ -14,41 +22,63 @@ class OnlyMaxStrategy(CCStrategy):
     is to move. This strategy can be used in situations where the movements of
     the opponent do not influence the current choice. Therefore it is used
     internally by MinMaxStrategy
+
+    The counters of the last search are kept in search_stats (see
+    CCSearchStats). Searches can be profiled like the ones of
+    MinMaxStrategy.
     """
 
     def __init__(self,
                  player: int,
                  steps: int = 1,
                  transposition_table: bool = False,
-                 heuristic: CCHeuristic = CombinedHeuristic()):
+                 heuristic: CCHeuristic = CombinedHeuristic(),
+                 tt_memory_budget: int = 8 * 1024 * 1024,
+                 profile: Optional[str] = None):
         self.player = player
         self.steps = steps
         self.heuristic = heuristic
         self.use_transposition_table = transposition_table
+        self.tt_memory_budget = tt_memory_budget
         self.hasher: Optional[CCZobristHash] = None
+        # created on first use and kept for the whole game
+        self.tt: Optional[CCTranspositionTable] = None
+        self.search_stats = CCSearchStats()
+        self.profile = profile_mode() if profile is None else profile
+        if self.profile and self.profile not in PROFILE_MODES:
+            raise ValueError(f"""
+                Invalid config: profile mode '{self.profile}', must be one
+                of {PROFILE_MODES}""")
 
     def _select_move(self,
                      game: CCGame,
-                     depth: int) -> Tuple[CCMove, float]:
+                     depth: int) -> Tuple[int, float]:
         """
         Returns: tuple
-            - position 0: best movet that can be done by the player
-                at this level.
+            - position 0: best move (packed, see move.pack_move) that can be
+                done by the player at this level.
             - position 1: best heuristic value that can be achieved at this
                 level if following best move.
         """
         best_move, best_score = (None, -100000.0)
-        if self.use_transposition_table and self.hasher:
-            # transposition table business logic
+        # remaining depth below this node
+        draft = self.steps - depth
+        tt = self.tt
+        if tt:
+            # transposition table business logic (no pruning happens here,
+            # so all the scores are exact)
             position_hash = self.hasher.get_hash(game)
-            best_move, best_score, cached_depth = self.transposition_table.get(
-                position_hash,
-                (None, -100000.0, -1))
-
-            if best_move and cached_depth == depth:
-                return (best_move, best_score)
+            entry = tt.probe(position_hash)
+            if entry and entry[2] >= draft:
+                tt.cutoffs += 1
+                return (entry[0], from_tt_score(entry[1], depth))
 
-        moves = self.available_moves(game, self.player)
+        stats = self.search_stats
+        perf_counter = time.perf_counter
+        start = perf_counter()
+        moves = list(self.generate_packed_moves(game, self.player))
+        stats.generation_time += perf_counter() - start
+        stats.moves_generated += len(moves)
         if game.player_turn != self.player:
             raise AssertionError("""
                 Player turn hasn't been rotated properly - this is likely
@@ -56,21 +86,24 @@ class OnlyMaxStrategy(CCStrategy):
             """)
 
         for move in moves:
-            if not best_move:
+            if best_move is None:
                 best_move = move
 
-            game.apply_move_sequence(move)
-            # doesn't matter what the other does
-            game.rotate_turn()
+            start = perf_counter()
+            game.make_move(move)
+            stats.make_time += perf_counter() - start
+            stats.depth_nodes[depth] += 1
+            # doesn't matter what the other does (no turn rotation)
 
             # check if game has already ended
-            if game.state() == 1:
+            state = game.state()
+            if state == 1:
                 # player 1 wins
                 # prefer winning in as few steps as possible
                 curr_score = (
                     100000 / (depth + 1) if self.player == 1 else -100000
                 )
-            elif game.state() == 2:
+            elif state == 2:
                 # player 2 wins
                 # prefer winning in as few steps as possible
                 curr_score = (
@@ -78,7 +111,10 @@ class OnlyMaxStrategy(CCStrategy):
                 )
             else:
                 if depth == self.steps:
+                    start = perf_counter()
                     curr_score = self.heuristic.value(game, self.player)
+                    stats.evaluation_time += perf_counter() - start
+                    stats.leaves += 1
                 else:
                     curr_score = self._select_move(game,
                                                    depth + 1)[1]
@@ -89,15 +125,18 @@ class OnlyMaxStrategy(CCStrategy):
                 best_move = move
 
             # undo movement
-            for _ in range(0, len(move.directions)):
-                game.undo_last_move()
+            start = perf_counter()
+            game.unmake_move()
+            stats.make_time += perf_counter() - start
 
-        if best_move:
-            if self.hasher:
+        if best_move is not None:
+            if tt:
                 # save into transposition table
-                self.transposition_table[position_hash] = (
-                    best_move, best_score, depth
-                )
+                tt.store(position_hash,
+                         best_move,
+                         to_tt_score(best_score, depth),
+                         draft,
+                         tt.EXACT)
             return (best_move, best_score)
         else:
             raise AssertionError("""
@@ -105,10 +144,26 @@ class OnlyMaxStrategy(CCStrategy):
             """)
 
     def select_move(self, game: CCGame, _: int) -> CCMove:
+        self.search_stats = CCSearchStats()
         if self.use_transposition_table:
-            self.transposition_table: Dict[int, Tuple[CCMove, float, int]] = {}
-            if not self.hasher:
-                # initialize hasher (only once for each game instance)
-                self.hasher = CCZobristHash(game)
-        move, __ = self._select_move(game, 0)
-        return move
+            if not self.hasher or self.hasher.game is not game:
+                # attach the hasher (only once for each game instance)
+                self.hasher = CCZobristHash.of(game)
+            else:
+                # the turn may have been assigned since the last search
+                self.hasher.resync()
+            if not self.tt:
+                # table is kept across turns
+                self.tt = CCTranspositionTable(self.tt_memory_budget)
+            self.tt.new_search()
+        self.search_stats.watch(self.tt)
+        # the search undoes all its moves, other visitors of the game can
+        # miss them
+        with game.only_visitors([self.heuristic, self.hasher]):
+            if self.profile:
+                move, __ = search_profiler(self.profile).run(
+                    self._select_move, game, 0)
+            else:
+                move, __ = self._select_move(game, 0)
+        self.search_stats.finish()
+        return self.unpack_move(game, move)
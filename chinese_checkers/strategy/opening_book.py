@@ -0,0 +1,61 @@
+import struct
+from typing import Optional
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.helpers import CCZobristHash
+from chinese_checkers.move import CCMove
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.record_file import CCRecordFile
+
+# metadata of the book files: board width, player row span and seed of the
+# Zobrist keys of the positions
+BOOK_METADATA = struct.Struct('<BBQ')
+# value of the records: best move (packed, see move.pack_move)
+BOOK_VALUE_FORMAT = 'I'
+
+
+class CCOpeningBook:
+    """
+    Best moves of the positions of the opening, as found by deep searches
+    (see build_opening_book.py). Positions are keyed by their Zobrist
+    hash, which includes the player to move.
+
+    The book file is memory mapped, so opening it costs no load time, and
+    it is binary searched on every lookup.
+    """
+
+    def __init__(self, path: str):
+        self.records = CCRecordFile(path)
+        self.width, self.player_row_span, self.seed = (
+            BOOK_METADATA.unpack_from(self.records.metadata))
+        # keys of the positions, computed from scratch for each probe (a
+        # hasher attached to the game would follow all its moves)
+        self.hasher = CCZobristHash(
+            CCGame(self.width, self.player_row_span), self.seed)
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, game: CCGame) -> Optional[CCMove]:
+        """
+        Returns the book move of the player to move, None if the position
+        is not in the book
+        """
+        if(game.width != self.width or
+           game.player_row_spawn != self.player_row_span):
+            return None
+        self.probes += 1
+        value = self.records.get(self.hasher.get_hash(game))
+        if value is None:
+            return None
+        if value[0] not in CCReasoner.generate_packed_moves(
+                game, game.player_turn):
+            # hash collision with a position of the book
+            return None
+        self.hits += 1
+        return CCReasoner.unpack_move(game, value[0])
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        self.records.close()
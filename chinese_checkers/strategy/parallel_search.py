@@ -0,0 +1,149 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Type
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.game_visitor import GameVisitor
+from chinese_checkers.strategy.search_stats import CCSearchStats
+
+"""
+Parallel search of the root of a min/max tree (see MinMaxStrategy).
+
+The moves of the root are spread over a pool of worker processes. Each
+worker has its own strategy, built once with the configuration of the
+searching strategy, and keeps its tables warm across turns. Positions are
+sent to the workers serialized (see CCGame.serialize) and set on a game
+that each worker keeps too. The best score found so far for the root is
+shared between all the processes so that moves searched later can be
+pruned with it.
+
+Workers finish in any order, so moves are searched with a window a little
+below the shared score: a move as good as the best one so far gets its
+exact score, and ties are broken by the order of the moves (the first one
+wins) like in a sequential search, whichever process finishes first.
+"""
+
+# how far below the shared best score moves are searched from, so that
+# the moves that tie with it are not just bounded by it
+TIE_MARGIN = 1e-6
+
+# state of each worker process
+_strategy = None
+# game searched by the worker, kept so that the hasher attached to it by
+# the strategy is reused (see MinMaxStrategy._prepare_search)
+_game: Optional[CCGame] = None
+_best_score = None
+_search_id: Optional[int] = None
+
+
+def _init_worker(strategy_class: Type, config: dict, best_score):
+    global _strategy, _best_score, _game
+    _strategy = strategy_class(**config)
+    _best_score = best_score
+    _game = None
+
+
+def _search_root_move(game_class: Type[CCGame],
+                      position: bytes,
+                      player: int,
+                      move: int,
+                      search_id: int
+                      ) -> Tuple[float, float, List[int], CCSearchStats]:
+    """
+    Searches a move of the root in a worker process.
+
+    Returns: tuple
+        - position 0: score of the move
+        - position 1: alpha the move has been searched with, the score is
+            just an upper bound if it is not above it
+        - position 2: best line starting with the move
+        - position 3: counters of the search (CCSearchStats)
+    """
+    global _search_id, _game
+    strategy = _strategy
+    game = _game
+    if(type(game) is game_class and game.width == position[0] and
+       game.player_row_spawn == position[1]):
+        game.set_position(position)
+    else:
+        visitors = ([strategy.heuristic]
+                    if isinstance(strategy.heuristic, GameVisitor) else [])
+        game = game_class.deserialize(position, visitors)
+        _game = game
+    strategy._prepare_search(game, new_search=search_id != _search_id)
+    _search_id = search_id
+
+    alpha = _best_score.value - TIE_MARGIN
+    score, line = strategy._search_root_move(game, player, move,
+                                             alpha, 100000.0)
+    if score > alpha:
+        with _best_score.get_lock():
+            if score > _best_score.value:
+                _best_score.value = score
+    strategy.search_stats.finish()
+    return (score, alpha, line, strategy.search_stats)
+
+
+class CCParallelRootSearch:
+    """
+    Pool of processes searching the moves of the root of min/max trees.
+
+    The most promising move of the root is searched first by the calling
+    process on its own, so that the rest of them start with a good bound
+    instead of a full window.
+    """
+
+    def __init__(self, strategy_class: Type, config: dict, workers: int):
+        context = multiprocessing.get_context()
+        # best score of the root found so far, shared by all the processes
+        self.best_score = context.Value('d', -100000.0)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(strategy_class, config, self.best_score))
+        self.search_id = 0
+
+    def search(self, strategy, game: CCGame, player: int):
+        """
+        Returns: tuple
+            - position 0: best (packed) move of the player
+            - position 1: best line starting with it
+        """
+        self.search_id += 1
+
+        tt_move = None
+        if strategy.tt:
+            entry = strategy.tt.probe(strategy.hasher.get_hash(game))
+            if entry:
+                tt_move = entry[0]
+        moves = strategy._ordered_moves(game, player, 0, tt_move)
+        if not moves:
+            raise AssertionError("""
+                No possible movements available, this must be a software bug
+            """)
+
+        best_score, best_line = strategy._search_root_move(
+            game, player, moves[0], -100000.0, 100000.0)
+        with self.best_score.get_lock():
+            self.best_score.value = best_score
+
+        position = game.serialize()
+        futures = [
+            self.executor.submit(_search_root_move, type(game), position,
+                                 player, move, self.search_id)
+            for move in moves[1:]
+        ]
+        # results are checked in order, so that ties are broken like in a
+        # sequential search (moves that tie with the best one have exact
+        # scores, see TIE_MARGIN)
+        for future in futures:
+            score, alpha, line, stats = future.result()
+            strategy.search_stats.merge(stats)
+            if score > alpha and score > best_score:
+                best_score = score
+                best_line = line
+        return (best_line[0], best_line)
+
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,133 @@
+import threading
+from copy import deepcopy
+from typing import Optional
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.game_visitor import GameVisitor
+from chinese_checkers.move import CCMove
+from chinese_checkers.strategy.min_max_strategy import (
+    MinMaxStrategy, MAX_SEARCH_DEPTH
+)
+
+
+class CCPonderer:
+    """
+    Searches on the opponent's time (pondering) for a MinMaxStrategy.
+
+    Once the strategy has moved, the reply it expects from the opponent
+    (second move of its principal variation) is assumed to be played, and
+    the resulting position is searched by iterative deepening in a
+    background thread. The search runs on a copy of the game, with a copy
+    of the strategy sharing its transposition table and move ordering.
+
+    When the opponent moves, on a ponder hit (the expected reply was
+    played) the move found in the background can be played right away.
+    On a miss the strategy searches as usual, helped by the positions
+    already stored in the table.
+    """
+
+    def __init__(self, strategy: MinMaxStrategy):
+        self.strategy = strategy
+        config = strategy._worker_config()
+        # the heuristic may be a visitor of the game, the copy of the game
+        # needs its own one
+        config['heuristic'] = deepcopy(strategy.heuristic)
+        self.ponder_strategy = type(strategy)(**config)
+
+        self.thread: Optional[threading.Thread] = None
+        # position being pondered and best move found for it
+        self.position: Optional[bytes] = None
+        self.move: Optional[int] = None
+
+        self.ponders = 0
+        self.hits = 0
+
+    def start(self, game: CCGame, player: int):
+        """
+        Starts pondering, right after the player of the strategy has moved
+        """
+        self.stop()
+        self.position = None
+        self.move = None
+
+        line = self.strategy.principal_variation
+        if len(line) < 2:
+            # no idea of what the opponent will do
+            return
+        heuristic = self.ponder_strategy.heuristic
+        ponder_game = type(game).deserialize(
+            game.serialize(),
+            [heuristic] if isinstance(heuristic, GameVisitor) else [])
+        ponder_game.make_move(line[1])
+        ponder_game.rotate_turn()
+        if(ponder_game.state() != 0 or
+           self.strategy._use_only_max(ponder_game)):
+            return
+
+        strategy = self.ponder_strategy
+        strategy.tt = self.strategy.tt
+        strategy.only_max_tt = self.strategy.only_max_tt
+        strategy.ordering = self.strategy.ordering
+        strategy._prepare_search(ponder_game)
+
+        self.position = ponder_game.serialize()
+        self.ponders += 1
+        if self.strategy.time_limit is None:
+            # as deep as the strategy would search
+            depth_limit = self.strategy.max_depth
+        else:
+            depth_limit = MAX_SEARCH_DEPTH
+        self.thread = threading.Thread(
+            target=self._ponder,
+            args=(ponder_game, player, depth_limit),
+            daemon=True)
+        self.thread.start()
+
+    def _ponder(self, game: CCGame, player: int, depth_limit: int):
+        self.move = self.ponder_strategy._iterative_deepening(
+            game, player, float('inf'), depth_limit)
+        self.ponder_strategy.search_stats.finish()
+
+    def stop(self):
+        """
+        Stops pondering, if running
+        """
+        if self.thread:
+            self.ponder_strategy.stop()
+            self.thread.join()
+            self.thread = None
+
+    def result(self, game: CCGame) -> Optional[CCMove]:
+        """
+        Stops pondering, once the opponent has moved. Returns the move to
+        play on a ponder hit, if the background search went as deep as the
+        strategy would (the counters of that search become the search_stats
+        of the strategy). None otherwise.
+        """
+        self.stop()
+        if self.position is None:
+            return None
+        hit = game.serialize() == self.position
+        self.position = None
+        if not hit:
+            return None
+        self.hits += 1
+
+        ponder_strategy = self.ponder_strategy
+        if(self.move is None or
+           ponder_strategy.searched_depth < self.strategy.max_depth):
+            return None
+        self.strategy.principal_variation = (
+            ponder_strategy.principal_variation)
+        # the move comes from the search of the ponderer, not from one of
+        # the strategy
+        ponder_strategy.search_stats.source = 'ponder'
+        self.strategy.search_stats = ponder_strategy.search_stats
+        return self.strategy.unpack_move(game, self.move)
+
+    def stats(self) -> dict:
+        return {
+            'ponders': self.ponders,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.ponders if self.ponders else 0.0,
+        }
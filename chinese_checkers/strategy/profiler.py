@@ -0,0 +1,204 @@
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+"""
+Opt-in profiling of the searches of the strategies: only their select_move
+calls are profiled (not the GUI or the game loop around them), and the
+profile is aggregated across turns and games until the process exits.
+
+Enabled with the profile argument of the strategies, or for every strategy
+with environment variables:
+
+CC_PROFILE=sample python -m chinese_checkers.play
+
+- CC_PROFILE: 'sample' takes a sample of the stack of the searching
+    thread every CC_PROFILE_INTERVAL seconds (0.001 by default), and
+    writes them in collapsed stack format (<prefix>.collapsed, one
+    "frame;frame;...;frame count" line per stack, as expected by
+    flamegraph.pl, speedscope, inferno...). 'cprofile' records every
+    call with cProfile instead, and writes <prefix>.prof (pstats).
+- CC_PROFILE_OUTPUT: prefix of the files written, cc_profile by default.
+- CC_PROFILE_TOP: number of functions of the summary of the hottest
+    functions (printed, and written to <prefix>.txt), 25 by default.
+"""
+
+PROFILE_MODES = ['sample', 'cprofile']
+
+
+class CCSearchProfiler:
+    """
+    Profile of every call run through it, see run. Nested calls (e.g.
+    MinMaxStrategy handing the search to OnlyMaxStrategy) are part of the
+    outermost one.
+    """
+
+    def __init__(self,
+                 mode: str,
+                 interval: float = 0.001,
+                 output: str = 'cc_profile',
+                 top: int = 25):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"""
+                Invalid config: profile mode '{mode}', must be one of
+                {PROFILE_MODES}""")
+        self.mode = mode
+        self.interval = interval
+        self.output = output
+        self.top = top
+        self._depth = 0
+        self._names: Dict[object, str] = {}
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        # samples of each stack (tuple of frame names, outermost first)
+        self.stacks: Counter = Counter()
+        self._profile = (cProfile.Profile() if self.mode == 'cprofile'
+                         else None)
+
+    def run(self, function: Callable, *args):
+        """
+        Returns function(*args), profiling it
+        """
+        if self._depth > 0:
+            return function(*args)
+        self._depth += 1
+        self.calls += 1
+        try:
+            if self._profile:
+                return self._profile.runcall(function, *args)
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), sys._getframe(), stop),
+                daemon=True)
+            # let the sampler take the GIL as often as it samples
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(switch_interval, self.interval))
+            sampler.start()
+            try:
+                return function(*args)
+            finally:
+                stop.set()
+                sampler.join()
+                sys.setswitchinterval(switch_interval)
+        finally:
+            self._depth -= 1
+
+    def _frame_name(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            name = (f'{code.co_name} '
+                    f'({os.path.basename(code.co_filename)}:'
+                    f'{code.co_firstlineno})')
+            self._names[code] = name
+        return name
+
+    def _sample(self, thread_id: int, entry_frame, stop: threading.Event):
+        """
+        Samples the stack of the thread below entry_frame until stopped
+        """
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and frame is not entry_frame:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            if frame is None or not stack or stop.is_set():
+                # not in the profiled call (yet, or anymore)
+                continue
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+
+    def hot_functions(self) -> Tuple[int, list]:
+        """
+        Returns: tuple
+            - position 0: samples taken
+            - position 1: (function, samples in the function itself,
+                samples in the function or below it) of the sampled
+                functions, hottest first
+        """
+        own: Counter = Counter()
+        below: Counter = Counter()
+        for stack, samples in self.stacks.items():
+            own[stack[-1]] += samples
+            for name in set(stack):
+                below[name] += samples
+        functions = sorted(below, key=lambda name: (-own[name],
+                                                    -below[name]))
+        return (sum(self.stacks.values()),
+                [(name, own[name], below[name]) for name in functions])
+
+    def summary(self) -> str:
+        if self._profile:
+            text = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=text)
+            stats.sort_stats('tottime').print_stats(self.top)
+            return text.getvalue()
+        samples, functions = self.hot_functions()
+        if samples == 0:
+            return f'{self.calls} searches, no samples\n'
+        lines = [f'{self.calls} searches, {samples} samples every '
+                 f'{self.interval}s',
+                 f'{"own":>7}{"total":>8}  function']
+        for name, own, below in functions[:self.top]:
+            lines.append(f'{own / samples:>7.1%}{below / samples:>8.1%}  '
+                         f'{name}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """
+        Writes the profile (if anything has been profiled) and its summary
+        """
+        if self.calls == 0:
+            return
+        if self._profile:
+            self._profile.dump_stats(f'{self.output}.prof')
+        else:
+            with open(f'{self.output}.collapsed', 'w') as collapsed:
+                for stack, samples in self.stacks.items():
+                    collapsed.write(f'{";".join(stack)} {samples}\n')
+        summary = self.summary()
+        with open(f'{self.output}.txt', 'w') as summary_file:
+            summary_file.write(summary)
+        print(summary)
+
+
+# profilers of the process, by mode, written when it exits
+_profilers: Dict[str, CCSearchProfiler] = {}
+
+
+def profile_mode() -> str:
+    """
+    Profile mode enabled by the environment, '' if none
+    """
+    return os.environ.get('CC_PROFILE', '')
+
+
+def search_profiler(mode: str) -> CCSearchProfiler:
+    """
+    The profiler of the process for the mode, shared by all the strategies
+    """
+    profiler = _profilers.get(mode)
+    if profiler is None:
+        profiler = CCSearchProfiler(
+            mode,
+            interval=float(os.environ.get('CC_PROFILE_INTERVAL', 0.001)),
+            output=os.environ.get('CC_PROFILE_OUTPUT', 'cc_profile'),
+            top=int(os.environ.get('CC_PROFILE_TOP', 25)))
+        if not _profilers:
+            atexit.register(_write_profiles)
+        _profilers[mode] = profiler
+    return profiler
+
+
+def _write_profiles():
+    for profiler in _profilers.values():
+        profiler.write()
@@ -0,0 +1,141 @@
+import time
+from collections import Counter
+from typing import Optional
+
+from chinese_checkers.strategy.transposition_table import (
+    CCTranspositionTable
+)
+
+# longer than any line a strategy searches (see MAX_SEARCH_DEPTH)
+MAX_STATS_DEPTH = 128
+
+
+class CCSearchStats:
+    """
+    Counters of a single search (select_move call) of a strategy, cheap
+    enough to be always on: plain attribute increments, and a pair of
+    perf_counter calls around move generation, make/unmake and evaluation.
+
+    - source: where the move came from, 'search', 'only_max' (see
+        MinMaxStrategy._use_only_max), 'opening_book', 'tablebase' or
+        'ponder' (see CCPonderer)
+    - only_max: the _use_only_max decision, None if it wasn't taken
+    - depth_nodes: moves made at each depth (depth 0 being the moves of
+        the root), i.e. positions visited one ply below it
+    - leaves: positions scored by the heuristic
+    - moves_generated: moves generated at the nodes that were expanded
+    - cutoffs: alpha-beta cutoffs, and cutoff_indexes how many of them
+        happened at each index of the ordered moves (0 is the first move)
+    - researches: moves searched again after a null window search (pvs)
+    - tt_*: activity of the transposition table during the search
+    - generation_time, make_time, evaluation_time: seconds spent
+        generating and ordering moves, making and unmaking them, and
+        scoring leaves. Summed over processes for parallel searches.
+    - time: wall time of the search
+    """
+
+    def __init__(self):
+        self.source = 'search'
+        self.only_max: Optional[bool] = None
+        self.depth_nodes = [0] * MAX_STATS_DEPTH
+        self.leaves = 0
+        self.moves_generated = 0
+        self.cutoffs = 0
+        self.cutoff_indexes: Counter = Counter()
+        self.researches = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.tt_stores = 0
+        self.generation_time = 0.0
+        self.make_time = 0.0
+        self.evaluation_time = 0.0
+        self.time = 0.0
+        self._start = time.perf_counter()
+        self._tt: Optional[CCTranspositionTable] = None
+        self._tt_start: Optional[tuple] = None
+
+    @staticmethod
+    def _tt_counters(tt: CCTranspositionTable) -> tuple:
+        return (tt.probes, tt.hits, tt.cutoffs, tt.stores)
+
+    def watch(self, tt: Optional[CCTranspositionTable]):
+        """
+        Counts the activity of the table from now on (its own counters
+        last for the whole game)
+        """
+        if tt:
+            self._tt = tt
+            self._tt_start = self._tt_counters(tt)
+
+    def finish(self):
+        """
+        Must be called once the search is over
+        """
+        self.time = time.perf_counter() - self._start
+        if self._tt:
+            (self.tt_probes,
+             self.tt_hits,
+             self.tt_cutoffs,
+             self.tt_stores) = (
+                 end - start for end, start in
+                 zip(self._tt_counters(self._tt), self._tt_start))
+            # don't keep (or send to other processes) the table
+            self._tt = None
+
+    def merge(self, other: 'CCSearchStats'):
+        """
+        Adds the counters of another search, or of a part of the same
+        search done by another process (finish sets the wall time of the
+        whole search afterwards)
+        """
+        for depth, nodes in enumerate(other.depth_nodes):
+            self.depth_nodes[depth] += nodes
+        self.leaves += other.leaves
+        self.moves_generated += other.moves_generated
+        self.cutoffs += other.cutoffs
+        self.cutoff_indexes.update(other.cutoff_indexes)
+        self.researches += other.researches
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.tt_cutoffs += other.tt_cutoffs
+        self.tt_stores += other.tt_stores
+        self.generation_time += other.generation_time
+        self.make_time += other.make_time
+        self.evaluation_time += other.evaluation_time
+        self.time += other.time
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.depth_nodes)
+
+    def summary(self) -> dict:
+        depth_nodes = self.depth_nodes
+        deepest = max((depth for depth, nodes in enumerate(depth_nodes)
+                       if nodes), default=-1)
+        depth_nodes = depth_nodes[:deepest + 1]
+        nodes = self.nodes
+        return {
+            'source': self.source,
+            'only_max': self.only_max,
+            'nodes': nodes,
+            'nodes_per_second': nodes / self.time if self.time else 0.0,
+            'depth_nodes': depth_nodes,
+            'leaves': self.leaves,
+            'moves_generated': self.moves_generated,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoff_rate': (
+                self.cutoff_indexes[0] / self.cutoffs
+                if self.cutoffs else 0.0),
+            'cutoff_indexes': dict(sorted(self.cutoff_indexes.items())),
+            'researches': self.researches,
+            'tt_probes': self.tt_probes,
+            'tt_hit_rate': (self.tt_hits / self.tt_probes
+                            if self.tt_probes else 0.0),
+            'tt_cutoffs': self.tt_cutoffs,
+            'tt_stores': self.tt_stores,
+            'generation_time': self.generation_time,
+            'make_time': self.make_time,
+            'evaluation_time': self.evaluation_time,
+            'time': self.time,
+        }
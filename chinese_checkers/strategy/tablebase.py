@@ -0,0 +1,231 @@
+import struct
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.geometry import CCGeometry, OFF_BOARD, board_geometry
+from chinese_checkers.move import pack_move, move_origin, move_destination
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.record_file import CCRecordFile
+
+"""
+Endgame tablebase of the race: once all the pieces of player 1 are below
+all the pieces of player 2, the players usually don't block or jump over
+each other any more, and each of them just needs to fill its goal in as
+few moves as possible. Only usually: a piece can still go back to jump
+over a piece of the other player (e.g. in the next row), so the distances
+are exact for each player on its own, but the race they predict is not
+proven.
+
+The tablebase stores the exact number of moves (distance) a player needs
+to fill its goal from every placement of its pieces up to a maximum
+distance, computed by retrograde analysis (see build_tablebase.py).
+Placements are bitmasks of the cells (see geometry.CCGeometry) of the
+pieces of player 1; the ones of player 2 are mirrored vertically.
+"""
+
+# metadata of the tablebase files: board width, player row span and
+# maximum distance stored
+TABLEBASE_METADATA = struct.Struct('<BBB')
+# value of the records: distance to fill the goal
+TABLEBASE_VALUE_FORMAT = 'B'
+# placements are the keys of the records, 64 bit (see record_file.py)
+TABLEBASE_MAX_CELLS = 64
+
+
+class CCRaceGeometry:
+    """
+    Lookup tables of the race of a board size
+    """
+
+    def __init__(self, geometry: CCGeometry):
+        self.geometry = geometry
+        # cell at the same column of the vertically opposite row
+        self.mirror = [
+            geometry.cell(geometry.height - 1 - geometry.cell_row[cell],
+                          geometry.cell_column[cell])
+            for cell in range(0, geometry.n_cells)]
+        # goal of player 1 (bottom of the board)
+        self.goal = 0
+        for cell in range(0, geometry.n_cells):
+            if(geometry.cell_row[cell] >=
+               geometry.height - geometry.player_row_span):
+                self.goal |= 1 << cell
+
+    def mirror_mask(self, mask: int) -> int:
+        mirrored = 0
+        while mask:
+            lowest = mask & -mask
+            mirrored |= 1 << self.mirror[lowest.bit_length() - 1]
+            mask ^= lowest
+        return mirrored
+
+    def successors(self, mask: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields (packed move, resulting mask) of every move of the pieces
+        in the mask, on a board without other pieces
+        """
+        neighbors = self.geometry.neighbors
+        jumps = self.geometry.jumps
+        pieces = mask
+        while pieces:
+            lowest = pieces & -pieces
+            origin = lowest.bit_length() - 1
+            pieces ^= lowest
+            others = mask ^ lowest
+
+            # steps
+            reached = []
+            for dest in neighbors[origin]:
+                if dest != OFF_BOARD and not others >> dest & 1:
+                    reached.append(dest)
+            # jumps, the origin is considered empty
+            jumped = {origin}
+            frontier = [origin]
+            while frontier:
+                cell = frontier.pop()
+                for direction in range(0, 6):
+                    over = neighbors[cell][direction]
+                    dest = jumps[cell][direction]
+                    if(dest != OFF_BOARD and dest not in jumped and
+                       others >> over & 1 and not others >> dest & 1):
+                        jumped.add(dest)
+                        frontier.append(dest)
+                        if dest not in reached:
+                            reached.append(dest)
+            for dest in reached:
+                yield (pack_move(origin, dest), others | 1 << dest)
+
+
+@lru_cache(maxsize=None)
+def race_geometry(width: int, player_row_span: int) -> CCRaceGeometry:
+    return CCRaceGeometry(board_geometry(width, player_row_span))
+
+
+def check_board_size(width: int, player_row_span: int):
+    """
+    Raises ValueError if the placements of the board don't fit the keys of
+    a tablebase file
+    """
+    n_cells = race_geometry(width, player_row_span).geometry.n_cells
+    if n_cells > TABLEBASE_MAX_CELLS:
+        raise ValueError(f"""
+            Invalid config: the board has {n_cells} cells, tablebases only
+            support boards of up to {TABLEBASE_MAX_CELLS}""")
+
+
+class CCRaceTablebase:
+    """
+    Read-only tablebase file, memory mapped
+    """
+
+    def __init__(self, path: str):
+        self.records = CCRecordFile(path)
+        self.width, self.player_row_span, self.max_distance = (
+            TABLEBASE_METADATA.unpack_from(self.records.metadata))
+        try:
+            check_board_size(self.width, self.player_row_span)
+        except ValueError:
+            self.records.close()
+            raise
+        self.race = race_geometry(self.width, self.player_row_span)
+        self.probes = 0
+        self.hits = 0
+
+    def distance(self, mask: int) -> Optional[int]:
+        """
+        Moves needed by player 1 to fill its goal from the mask, None if
+        more than the maximum distance of the tablebase
+        """
+        value = self.records.get(mask)
+        return value[0] if value else None
+
+    def _masks(self, game: CCGame) -> Optional[List[int]]:
+        """
+        Masks of the pieces of both players (index 0 unused, the one of
+        player 2 mirrored), if they are racing on the board of the
+        tablebase
+        """
+        if(game.width != self.width or
+           game.player_row_spawn != self.player_row_span):
+            return None
+        board = game.board
+        # first row with pieces of player 1 (rows are searched by list, so
+        # that positions that are not races are rejected quickly)
+        p1_min = 0
+        while 1 not in board[p1_min]:
+            p1_min += 1
+        for row in range(p1_min, len(board)):
+            if 2 in board[row]:
+                # not separated yet
+                return None
+        masks = [0, 0, 0]
+        offsets = game.geometry.row_offsets
+        for row in range(0, len(board)):
+            cell = offsets[row]
+            for value in board[row]:
+                if value:
+                    masks[value] |= 1 << cell
+                cell += 1
+        masks[2] = self.race.mirror_mask(masks[2])
+        return masks
+
+    def race_distances(self, game: CCGame) -> Optional[Tuple[int, int]]:
+        """
+        Moves needed by player 1 and player 2 to win, if they are racing
+        and both are in the tablebase
+        """
+        masks = self._masks(game)
+        if masks is None:
+            return None
+        self.probes += 1
+        distance_1 = self.distance(masks[1])
+        if distance_1 is None:
+            return None
+        distance_2 = self.distance(masks[2])
+        if distance_2 is None:
+            return None
+        self.hits += 1
+        return (distance_1, distance_2)
+
+    def best_move(self, game: CCGame, player: int) -> Optional[int]:
+        """
+        A (packed) move of the player that gets it one move closer to
+        winning the race, None if not racing or not in the tablebase.
+        Moves that would get in the way of the other player (e.g. going
+        back to jump further) are skipped.
+        """
+        masks = self._masks(game)
+        if masks is None:
+            return None
+        self.probes += 1
+        distance = self.distance(masks[player])
+        if not distance:
+            return None
+        # pieces of the other player, from the point of view of the player
+        other = self.race.mirror_mask(masks[2 if player == 1 else 1])
+        cell_row = self.race.geometry.cell_row
+        other_max_row = cell_row[other.bit_length() - 1]
+        mirror = self.race.mirror
+        for move, successor in self.race.successors(masks[player]):
+            if self.distance(successor) != distance - 1:
+                continue
+            lowest = successor & -successor
+            if cell_row[lowest.bit_length() - 1] <= other_max_row:
+                # not separated any more
+                continue
+            if player == 2:
+                # back from the mirrored board
+                move = pack_move(mirror[move_origin(move)],
+                                 mirror[move_destination(move)])
+            try:
+                CCReasoner.unpack_move(game, move)
+            except ValueError:
+                # the jumps need cells taken by the other player
+                continue
+            self.hits += 1
+            return move
+        return None
+
+    def close(self):
+        self.records.close()
@@ -0,0 +1,127 @@
+import math
+from array import array
+from typing import Optional, Tuple
+
+# scores above this (in absolute value) mean that a player wins
+WIN_SCORE_THRESHOLD = 1000
+
+
+def to_tt_score(score: float, depth: int) -> float:
+    """
+    Wins found during search are worth 100000 / (depth + 1), depth being
+    the one of the winning move, counted from the root of the search.
+    Before storing, make them relative to the current depth instead, so
+    they can be reused at any depth and from any root.
+    """
+    if abs(score) > WIN_SCORE_THRESHOLD:
+        win_depth = round(100000 / abs(score)) - 1
+        if win_depth >= depth:
+            score = math.copysign(100000 / (win_depth - depth + 1), score)
+    return score
+
+
+def from_tt_score(score: float, depth: int) -> float:
+    """
+    Inverse of to_tt_score
+    """
+    if abs(score) > WIN_SCORE_THRESHOLD:
+        win_depth = round(100000 / abs(score)) - 1 + depth
+        score = math.copysign(100000 / (win_depth + 1), score)
+    return score
+
+
+class CCTranspositionTable:
+    """
+    Fixed size transposition table, meant to live for a whole game.
+
+    Entries are stored in unboxed arrays, so the memory budget is honored
+    regardless of how many positions are searched. Each bucket has two
+    slots: a depth-preferred one, only replaced by searches at least as
+    deep (or by anything once the entry is from an older search), and an
+    always-replace one for everything else.
+
+    Every entry records the best move (packed, see move.pack_move), the
+    score, the remaining depth (draft) the score was searched with, and
+    whether the score is exact or just a lower/upper bound (alpha-beta
+    cutoffs). Scores are stored from the point of view of the player to
+    move at that position.
+    """
+
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    # bytes per slot: key, move, score, draft, flag and age
+    SLOT_SIZE = 8 + 4 + 8 + 1 + 1 + 2
+
+    def __init__(self, memory_budget: int = 32 * 1024 * 1024):
+        self.n_buckets = max(1, memory_budget // (2 * self.SLOT_SIZE))
+        n_slots = 2 * self.n_buckets
+
+        self.keys = array('Q', bytes(8 * n_slots))
+        self.moves = array('i', bytes(4 * n_slots))
+        self.scores = array('d', bytes(8 * n_slots))
+        # draft of -1 marks an empty slot
+        self.drafts = array('b', [-1]) * n_slots
+        self.flags = array('b', bytes(n_slots))
+        self.ages = array('H', bytes(2 * n_slots))
+
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+
+    def new_search(self):
+        """
+        Must be called before every new search (e.g. every turn), so that
+        entries from older searches are replaced first
+        """
+        self.age = (self.age + 1) & 0xFFFF
+
+    def probe(self, key: int) -> Optional[Tuple[int, float, int, int]]:
+        """
+        Returns the (move, score, draft, flag) stored for the position, or
+        None if the position is not in the table
+        """
+        self.probes += 1
+        slot = 2 * (key % self.n_buckets)
+        if self.keys[slot] != key or self.drafts[slot] < 0:
+            slot += 1
+            if self.keys[slot] != key or self.drafts[slot] < 0:
+                return None
+        self.hits += 1
+        return (self.moves[slot], self.scores[slot],
+                self.drafts[slot], self.flags[slot])
+
+    def store(self,
+              key: int,
+              move: int,
+              score: float,
+              draft: int,
+              flag: int):
+        self.stores += 1
+        slot = 2 * (key % self.n_buckets)
+        if not(self.keys[slot] == key or
+               self.ages[slot] != self.age or
+               draft >= self.drafts[slot]):
+            # keep the deeper entry, use the always-replace slot
+            slot += 1
+        self.keys[slot] = key
+        self.moves[slot] = move
+        self.scores[slot] = score
+        self.drafts[slot] = draft
+        self.flags[slot] = flag
+        self.ages[slot] = self.age
+
+    def stats(self) -> dict:
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'cutoffs': self.cutoffs,
+            'stores': self.stores,
+        }
@@ -0,0 +1,384 @@
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+"""
+Headless tournament between MinMaxStrategy configurations (engines), to
+measure how strong and how fast each of them is.
+
+Engines are read from a JSON file of name -> MinMaxStrategy arguments,
+plus the weights of its OptimizedCombinedHeuristic (optional):
+
+{"steps_1": {"steps": 1, "pre_sort_moves": true},
+ "steps_2_tt": {"steps": 2, "pre_sort_moves": true,
+                "transposition_table": true,
+                "weights": [0.13, 0.53, 0.29, 0.05]}}
+
+Every pairing (all pairs for a round robin, the first engine against the
+rest for a gauntlet) plays 'rounds' pairs of games on every board size.
+Both games of a pair start with the same random opening moves, with
+colors swapped. Games run in parallel, and one JSON line is written per
+game as soon as it ends. At the end, Elo ratings are estimated from all
+the games (see elo_ratings).
+
+python -m chinese_checkers.tournament --engines engines.json \
+    --boards 5:3 7:3 --rounds 4 --workers 4 --output games.jsonl
+python -m chinese_checkers.tournament --engines engines.json \
+    --results games.jsonl
+"""
+
+# plies after which a game is a draw
+MAX_PLIES = 300
+# times a position has to be repeated for the game to be a draw
+REPETITIONS = 3
+# moves played at random before the engines take over
+OPENING_PLIES = 2
+
+
+def load_engines(path: str) -> Dict[str, dict]:
+    with open(path) as engines_file:
+        engines = json.load(engines_file)
+    if len(engines) < 2:
+        raise ValueError(f'{path} must have at least two engines')
+    for config in engines.values():
+        # fail now rather than in the middle of the tournament
+        make_strategy(config)
+    return engines
+
+
+def make_strategy(config: dict) -> MinMaxStrategy:
+    config = dict(config)
+    weights = config.pop('weights', None)
+    heuristic = (OptimizedCombinedHeuristic(weights) if weights
+                 else OptimizedCombinedHeuristic())
+    return MinMaxStrategy(heuristic=heuristic, **config)
+
+
+def pairings(names: List[str], gauntlet: bool) -> List[Tuple[str, str]]:
+    if gauntlet:
+        return [(names[0], name) for name in names[1:]]
+    return list(itertools.combinations(names, 2))
+
+
+def random_opening(width: int,
+                   player_row_span: int,
+                   plies: int,
+                   seed: str) -> List[int]:
+    rnd = random.Random(seed)
+    game = CCGame(width=width, player_row_span=player_row_span)
+    opening = []
+    for _ in range(0, plies):
+        move = rnd.choice(list(CCReasoner.generate_packed_moves(
+            game, game.player_turn)))
+        opening.append(move)
+        game.make_move(move)
+        game.rotate_turn()
+    return opening
+
+
+def play_game(game_id: int,
+              engines: Dict[str, dict],
+              player_1: str,
+              player_2: str,
+              width: int,
+              player_row_span: int,
+              opening: List[int]) -> dict:
+    """
+    Plays a game (in a worker process) and returns its record
+    """
+    strategies = {1: make_strategy(engines[player_1]),
+                  2: make_strategy(engines[player_2])}
+    game = CCGame(width=width,
+                  player_row_span=player_row_span,
+                  visitors=[strategies[1].heuristic,
+                            strategies[2].heuristic])
+    for move in opening:
+        game.apply_move_sequence(CCReasoner.unpack_move(game, move))
+
+    moves = []
+    move_stats = []
+    positions: Counter = Counter()
+    reason = 'max_plies'
+    try:
+        while(game.state() == 0 and
+              len(opening) + len(moves) < MAX_PLIES):
+            player = game.player_turn
+            strategy = strategies[player]
+            start = time.perf_counter()
+            move = strategy.select_move(game, player)
+            elapsed = time.perf_counter() - start
+            stats = strategy.search_stats
+            moves.append(CCReasoner.packed_move(game, move))
+            move_stats.append({
+                'player': player,
+                'time': elapsed,
+                'nodes': stats.nodes,
+                # plies searched (min/max searches only)
+                'depth': (strategy.searched_depth
+                          if stats.source == 'search' else None),
+                'source': stats.source})
+            game.apply_move_sequence(move)
+            position = game.serialize()
+            positions[position] += 1
+            if positions[position] == REPETITIONS:
+                reason = 'repetition'
+                break
+    finally:
+        for strategy in strategies.values():
+            strategy.close()
+
+    return {
+        'game': game_id,
+        'width': width,
+        'player_row_span': player_row_span,
+        'player_1': player_1,
+        'player_2': player_2,
+        'opening': opening,
+        'moves': moves,
+        # winning player, 0 for a draw
+        'result': game.state(),
+        'reason': 'win' if game.state() != 0 else reason,
+        'move_stats': move_stats,
+    }
+
+
+def schedule(names: List[str],
+             gauntlet: bool,
+             boards: List[Tuple[int, int]],
+             rounds: int,
+             opening_plies: int,
+             seed: int) -> List[tuple]:
+    """
+    Returns the (player 1, player 2, width, player row span, opening) of
+    every game of the tournament
+    """
+    games = []
+    for width, player_row_span in boards:
+        for pair_index, (name_a, name_b) in enumerate(
+                pairings(names, gauntlet)):
+            for round_index in range(0, rounds):
+                opening = random_opening(
+                    width, player_row_span, opening_plies,
+                    f'{seed}:{width}:{player_row_span}:{pair_index}:'
+                    f'{round_index}')
+                games.append((name_a, name_b, width, player_row_span,
+                              opening))
+                games.append((name_b, name_a, width, player_row_span,
+                              opening))
+    return games
+
+
+def run(engines: Dict[str, dict],
+        gauntlet: bool,
+        boards: List[Tuple[int, int]],
+        rounds: int,
+        workers: int,
+        output,
+        opening_plies: int = OPENING_PLIES,
+        seed: int = 1) -> List[dict]:
+    """
+    Plays the tournament, writing a JSON line per game to output as soon
+    as it ends. Returns the records of the games, in schedule order.
+    """
+    games = schedule(list(engines), gauntlet, boards, rounds,
+                     opening_plies, seed)
+    records: List[Optional[dict]] = [None] * len(games)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, game_id, engines, *game)
+                   for game_id, game in enumerate(games)]
+        for future in as_completed(futures):
+            record = future.result()
+            records[record['game']] = record
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+    return records
+
+
+def _bradley_terry(n_players: int,
+                   results: np.ndarray,
+                   iterations: int = 1000) -> np.ndarray:
+    """
+    Maximum likelihood ratings (Elo scale, mean 0) for results, an array
+    of (player a, player b, score of a) rows. One virtual draw is added
+    between every pair of players that met, so that ratings stay finite
+    when a player wins (or loses) all its games.
+    """
+    games = np.zeros((n_players, n_players))
+    np.add.at(games, (results[:, 0].astype(int), results[:, 1].astype(int)),
+              1)
+    games = games + games.T
+    scores = np.zeros(n_players)
+    np.add.at(scores, results[:, 0].astype(int), results[:, 2])
+    np.add.at(scores, results[:, 1].astype(int), 1 - results[:, 2])
+    # prior
+    met = games > 0
+    games = games + met
+    scores = scores + 0.5 * met.sum(axis=1)
+
+    # minorization-maximization (Hunter, 2004)
+    strength = np.ones(n_players)
+    for _ in range(0, iterations):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(
+            axis=1)
+        new_strength = np.where(denominator > 0,
+                                scores / np.maximum(denominator, 1e-300),
+                                strength)
+        new_strength /= np.exp(np.mean(np.log(new_strength)))
+        if np.allclose(new_strength, strength, rtol=1e-9, atol=0):
+            strength = new_strength
+            break
+        strength = new_strength
+    ratings = 400 * np.log10(strength)
+    return ratings - ratings.mean()
+
+
+def elo_ratings(names: List[str],
+                records: List[dict],
+                samples: int = 500,
+                confidence: float = 0.95,
+                seed: int = 1) -> Dict[str, Tuple[float, float, float]]:
+    """
+    Elo rating of every engine, with the bounds of its confidence interval
+    (percentiles of the ratings of games resampled with replacement).
+    Colors and board sizes are not taken into account.
+
+    Returns: dict of engine name to (rating, lower bound, upper bound)
+    """
+    index = {name: i for i, name in enumerate(names)}
+    results = np.array([
+        (index[record['player_1']],
+         index[record['player_2']],
+         {1: 1.0, 2: 0.0, 0: 0.5}[record['result']])
+        for record in records], dtype=float).reshape(-1, 3)
+    ratings = _bradley_terry(len(names), results)
+
+    rnd = np.random.default_rng(seed)
+    resampled = np.array([
+        _bradley_terry(len(names),
+                       results[rnd.integers(0, len(results), len(results))])
+        for _ in range(0, samples)]).reshape(-1, len(names))
+    tail = 100 * (1 - confidence) / 2
+    lower = np.percentile(resampled, tail, axis=0)
+    upper = np.percentile(resampled, 100 - tail, axis=0)
+    return {name: (float(ratings[i]), float(lower[i]), float(upper[i]))
+            for name, i in index.items()}
+
+
+def report(names: List[str], records: List[dict]):
+    ratings = elo_ratings(names, records)
+    print(f'{len(records)} games')
+    print(f'{"engine":<24}{"games":>7}{"score":>8}{"elo":>8}'
+          f'{"95% interval":>18}{"ms/move":>10}{"nodes/s":>10}')
+    for name in sorted(names, key=lambda name: -ratings[name][0]):
+        games = 0
+        score = 0.0
+        elapsed = 0.0
+        nodes = 0
+        moves = 0
+        for record in records:
+            for player in [1, 2]:
+                if record[f'player_{player}'] != name:
+                    continue
+                games += 1
+                score += (0.5 if record['result'] == 0 else
+                          float(record['result'] == player))
+                own_stats = [stats for stats in record['move_stats']
+                             if stats['player'] == player]
+                moves += len(own_stats)
+                elapsed += sum(stats['time'] for stats in own_stats)
+                nodes += sum(stats['nodes'] for stats in own_stats)
+        rating, lower, upper = ratings[name]
+        print(f'{name:<24}{games:>7}{score / max(games, 1):>8.1%}'
+              f'{rating:>8.0f}{f"[{lower:.0f}, {upper:.0f}]":>18}'
+              f'{1000 * elapsed / max(moves, 1):>10.1f}'
+              f'{nodes / elapsed if elapsed else 0.0:>10.0f}')
+
+
+def parse_board(board: str) -> Tuple[int, int]:
+    width, player_row_span = board.split(':')
+    return (int(width), int(player_row_span))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--engines",
+        type=str,
+        required=True,
+        help="JSON file with the configuration of every engine, by name.")
+    parser.add_argument(
+        "--gauntlet",
+        action='store_true',
+        help=("The first engine plays all the others (by default every "
+              "engine plays every other one)."))
+    parser.add_argument(
+        "--boards",
+        type=parse_board,
+        nargs='+',
+        default=[(5, 3)],
+        help="Board sizes, as board_size:player_row_span.")
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=2,
+        help=("Pairs of games (one with each color) of every pairing on "
+              "every board."))
+    parser.add_argument(
+        "--opening_plies",
+        type=int,
+        default=OPENING_PLIES,
+        help="Random moves played at the start of each pair of games.")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Seed of the random openings.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes playing games at the same time.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="File the games are written to (JSON lines), stdout if none.")
+    parser.add_argument(
+        "--results",
+        type=str,
+        default=None,
+        help=("Don't play, just rate the games of this file (written by a "
+              "previous tournament)."))
+    args = parser.parse_args()
+
+    engines = load_engines(args.engines)
+    names = list(engines)
+    if args.results:
+        with open(args.results) as results_file:
+            records = [json.loads(line)
+                       for line in results_file if line.strip()]
+    elif args.output:
+        with open(args.output, 'w') as output:
+            records = run(engines, args.gauntlet, args.boards, args.rounds,
+                          args.workers, output, args.opening_plies,
+                          args.seed)
+    else:
+        records = run(engines, args.gauntlet, args.boards, args.rounds,
+                      args.workers, sys.stdout, args.opening_plies,
+                      args.seed)
+    report(names, [record for record in records
+                   if record['player_1'] in engines and
+                   record['player_2'] in engines])
@@ -1,6 +1,11 @@
+import argparse
 import itertools
+import json
+import os
 import random
-from typing import Set
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
 from copy import deepcopy
 from collections import Counter
 
@@ -10,6 +15,7 @@ from chinese_checkers.game import CCGame
 from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
 from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
 from chinese_checkers.strategy.only_max_strategy import OnlyMaxStrategy
+from chinese_checkers.strategy.search_stats import CCSearchStats
 
 """
 Script for finding optimal weights for the combined heuristic
@@ -18,133 +24,326 @@ Script for finding optimal weights for the combined heuristic
  The ones that win the game in as few movements as possible stay for the
  next generation. New crossed-over weights are generated as well
  (offspring).
+
+The games of each generation are played concurrently by a pool of
+ processes. Everything random is seeded from the seed of the run, the
+ generation and the game, so a run gives the same results with any number
+ of workers. After each generation, the population is saved to a
+ checkpoint file, from which an interrupted run resumes.
+
+python -m chinese_checkers.weight_search --generations 10 --workers 4
 """
+
+N_WEIGHTS = 4
+LOOK_AHEAD = 1
+GENERATION_SIZE = 12
+RANDOM_FILL_SIZE = 4
+SELECT_BEST = 4
+GAME_WIDTH = 7
+# deliberate small number of pieces to avoid high probability of tie
+PLAYER_ROW_SPAN = 3
+MAX_TURNS = 200
+# seconds per move for the AI being trained (searching with iterative
+# deepening), None to always search LOOK_AHEAD steps. Results depend on
+# the speed of the machine if set.
+TIME_LIMIT = None
+# weights of the greedy opponent: vertical advance only
+GREEDY_WEIGHTS = [0.0, 1.0, 0.0, 0.0]
+
+CHECKPOINT_VERSION = 1
+
+
+def random_individual(rnd: np.random.Generator) -> List[float]:
+    """
+    Returns a list of weights between 0 and 1, all weights sum 1
+    """
+    return [float(weight) for weight in rnd.dirichlet(np.ones(N_WEIGHTS))]
+
+
+def print_search_stats(search_stats: CCSearchStats, only_max_moves: int):
+    summary = search_stats.summary()
+    print(f'Search: {summary["nodes"]} nodes, '
+          f'{summary["nodes_per_second"]:.0f} nodes/s, '
+          f'{only_max_moves} only max moves, '
+          f'{summary["leaves"]} leaves, '
+          f'{summary["cutoffs"]} cutoffs '
+          f'({summary["first_move_cutoff_rate"]:.0%} at first move), '
+          f'TT hit rate {summary["tt_hit_rate"]:.0%}, '
+          f'generation {summary["generation_time"]:.1f}s, '
+          f'make/unmake {summary["make_time"]:.1f}s, '
+          f'evaluation {summary["evaluation_time"]:.1f}s')
+
+
+def compete(weights_1: list,
+            weights_2: list,
+            seed: int,
+            width: int = GAME_WIDTH,
+            player_row_span: int = PLAYER_ROW_SPAN
+            ) -> Tuple[int, str, CCSearchStats, int]:
+    """
+    Plays a game between two AIs with different weights and return
+    the result of the game.
+    The second AI is in disadvantage (has a pure greedy lookahead).
+
+    Returns: tuple
+        - position 0: the number of turns it took for player 1 to beat
+            player 2, or MAX_TURNS if player 1 didn't manage to beat
+            player 2.
+        - position 1: how the game ended
+        - position 2: counters of the searches of player 1
+        - position 3: moves of player 1 chosen by only max
+    """
+    # (run by worker processes, the outcome must not depend on which one)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    heuristic_1 = OptimizedCombinedHeuristic(weights_1)
+    heuristic_2 = OptimizedCombinedHeuristic(weights_2)
+
+    game = CCGame(width=width,
+                  player_row_span=player_row_span,
+                  visitors=[heuristic_1, heuristic_2])
+
+    strategy_1 = MinMaxStrategy(
+        steps=LOOK_AHEAD,
+        pre_sort_moves=True,
+        transposition_table=True,
+        heuristic=heuristic_1,
+        time_limit=TIME_LIMIT)
+    strategy_2 = OnlyMaxStrategy(
+        player=2,
+        steps=0,
+        transposition_table=True,
+        heuristic=heuristic_2)
+
+    turns = 0
+
+    last_boards: Set[CCGame] = set()
+    board_repeats = 0
+
+    # searches of the AI being trained, for the whole game
+    search_stats = CCSearchStats()
+    only_max_moves = 0
+
+    while(game.state() == 0 and turns < MAX_TURNS):
+        strategy = (
+            strategy_1 if game.player_turn == 1 else strategy_2
+        )
+        move = strategy.select_move(game, game.player_turn)
+        if strategy is strategy_1:
+            search_stats.merge(strategy_1.search_stats)
+            only_max_moves += bool(strategy_1.search_stats.only_max)
+        game.apply_move_sequence(move)
+        if game in last_boards:
+            board_repeats += 1
+
+        if board_repeats == 3:
+            # infinite loop (tie)
+            return (MAX_TURNS, 'Board repeats - tie', search_stats,
+                    only_max_moves)
+
+        last_boards.add(deepcopy(game))
+        turns += 1
+
+    state = game.state()
+    if state == 1:
+        return (min(MAX_TURNS, turns), f'Won in {turns} turns.',
+                search_stats, only_max_moves)
+    else:
+        return (MAX_TURNS, f'Failed to beat player 2, game state: {state}',
+                search_stats, only_max_moves)
+
+
+def crossover_avg(weights_1: list, weights_2: list):
+    """
+    Return crossed-over weights from the two input weights lists
+    """
+    return [float(np.average([weights_1[i], weights_2[i]]))
+            for i in range(0, len(weights_1))]
+
+
+def game_seed(seed: int, n_generation: int, index: int) -> int:
+    """
+    Seed of a game, only depends on the run, the generation and the game
+    """
+    return seed * 1000003 + n_generation * GENERATION_SIZE + index
+
+
+def play_generation(executor: ProcessPoolExecutor,
+                    generation: List[List[float]],
+                    seed: int,
+                    n_generation: int,
+                    width: int,
+                    player_row_span: int) -> List[int]:
+    """
+    Plays the games of every individual of the generation concurrently,
+    and returns the turns each of them took to win
+    """
+    futures = [
+        executor.submit(compete, weights, GREEDY_WEIGHTS,
+                        game_seed(seed, n_generation, i),
+                        width, player_row_span)
+        for i, weights in enumerate(generation)
+    ]
+    all_turns = []
+    # results are printed in order, whichever game ends first
+    for weights, future in zip(generation, futures):
+        n_turns, outcome, search_stats, only_max_moves = future.result()
+        print('{} versus greedy {}'.format(weights, GREEDY_WEIGHTS))
+        print_search_stats(search_stats, only_max_moves)
+        print(outcome)
+        all_turns.append(n_turns)
+    return all_turns
+
+
+def next_generation(generation: List[List[float]],
+                    all_turns: List[int],
+                    rnd: np.random.Generator) -> List[List[float]]:
+    """
+    Keeps the best individuals of the generation, and fills the next one
+    with their offspring and random individuals
+    """
+    scores: Counter = Counter()
+    for i, n_turns in enumerate(all_turns):
+        scores[i] += MAX_TURNS - n_turns
+
+    # select at most X population for the next generation
+    best = [a[0]
+            for a in scores.most_common(n=SELECT_BEST)]
+
+    print(f'{len(best)} candidates selected for next generation.')
+    new_generation = [generation[b] for b in best]
+
+    # fill with offspring from the best candidates
+    for pair in itertools.combinations(best, 2):
+        new_generation.append(
+            crossover_avg(generation[pair[0]],
+                          generation[pair[1]]))
+        print(f'Offspring generated between: {pair}')
+        if len(new_generation) == GENERATION_SIZE - RANDOM_FILL_SIZE:
+            break
+
+    for i in range(len(new_generation), GENERATION_SIZE):
+        # fill the remaining space for the next generation with
+        # random individuals
+        new_generation.append(random_individual(rnd))
+
+    assert len(new_generation) == GENERATION_SIZE
+    return new_generation
+
+
+def load_checkpoint(path: str) -> dict:
+    with open(path) as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    if checkpoint['version'] != CHECKPOINT_VERSION:
+        raise ValueError(
+            f'{path} is a checkpoint of version {checkpoint["version"]}, '
+            f'expected version {CHECKPOINT_VERSION}')
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # write the whole file first, an interrupted write must not lose the
+    # previous checkpoint
+    with open(f'{path}.tmp', 'w') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file, indent=1)
+    os.replace(f'{path}.tmp', path)
+
+
+def genetic_search(checkpoint_path: str,
+                   generations: Optional[int] = None,
+                   time_budget: Optional[float] = None,
+                   workers: int = 1,
+                   seed: int = 1,
+                   width: int = GAME_WIDTH,
+                   player_row_span: int = PLAYER_ROW_SPAN) -> dict:
+    """
+    Genetic search of optimal weights. Runs until 'generations'
+    generations have been played (counting the ones of the checkpoint,
+    if resuming), or until time_budget seconds have passed (checked after
+    each generation), or forever if neither is given.
+
+    Returns the last checkpoint, with the population of the next
+    generation and the turns taken by every individual of the previous
+    ones ('history').
+    """
+    start = time.monotonic()
+    if os.path.exists(checkpoint_path):
+        checkpoint = load_checkpoint(checkpoint_path)
+        print(f'Resuming from {checkpoint_path}, generation '
+              f'{checkpoint["generation"]}')
+    else:
+        rnd = np.random.default_rng([seed, 0])
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'seed': seed,
+            'width': width,
+            'player_row_span': player_row_span,
+            'generation': 0,
+            'population': [random_individual(rnd)
+                           for _ in range(0, GENERATION_SIZE)],
+            'history': [],
+        }
+    seed = checkpoint['seed']
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while(generations is None or checkpoint['generation'] < generations):
+            n_generation = checkpoint['generation']
+            generation = checkpoint['population']
+            print(f'Generation {n_generation}: {generation}')
+
+            all_turns = play_generation(executor, generation, seed,
+                                        n_generation,
+                                        checkpoint['width'],
+                                        checkpoint['player_row_span'])
+            # random individuals of each generation don't depend on
+            # previous ones, so resuming doesn't need the state of a
+            # generator
+            rnd = np.random.default_rng([seed, n_generation + 1])
+            checkpoint['history'].append({'population': generation,
+                                          'turns': all_turns})
+            checkpoint['population'] = next_generation(generation,
+                                                       all_turns, rnd)
+            checkpoint['generation'] = n_generation + 1
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            if(time_budget is not None and
+               time.monotonic() - start >= time_budget):
+                print(f'Time budget of {time_budget}s spent')
+                break
+    return checkpoint
+
+
 if __name__ == "__main__":
-    random.seed(1)
-    N_WEIGHTS = 4
-    LOOK_AHEAD = 1
-    GENERATION_SIZE = 12
-    RANDOM_FILL_SIZE = 4
-    SELECT_BEST = 4
-    GAME_WIDTH = 7
-    # deliberate small number of pieces to avoid high probability of tie
-    PLAYER_ROW_SPAN = 3
-    MAX_TURNS = 200
-
-    def random_individual():
-        """
-        Returns a list of weights between 0 and 1, all weights sum 1
-        """
-        return list(np.random.dirichlet(np.ones(N_WEIGHTS), size=1)[0])
-
-    def compete(weights_1: list, weights_2: list):
-        """
-        Plays a game between two AIs with different weights and return
-        the result of the game.
-        The second AI is in disadvantage (has a pure greedy lookahead).
-
-        Return the number of turns it took for player 1 to beat player 2,
-        or MAX_TURNS if player 1 didn't manage to beat player 2.
-        """
-        print('{} versus greedy {}'.format(weights_1, weights_2))
-
-        heuristic_1 = OptimizedCombinedHeuristic(weights_1)
-        heuristic_2 = OptimizedCombinedHeuristic(weights_2)
-
-        game = CCGame(width=GAME_WIDTH,
-                      player_row_span=PLAYER_ROW_SPAN,
-                      visitors=[heuristic_1, heuristic_2])
-
-        strategy_1 = MinMaxStrategy(
-            steps=LOOK_AHEAD,
-            pre_sort_moves=True,
-            transposition_table=True,
-            heuristic=heuristic_1)
-        strategy_2 = OnlyMaxStrategy(
-            player=2,
-            steps=0,
-            transposition_table=True,
-            heuristic=heuristic_2)
-
-        turns = 0
-
-        last_boards: Set[CCGame] = set()
-        board_repeats = 0
-
-        while(game.state() == 0 and turns < MAX_TURNS):
-            strategy = (
-                strategy_1 if game.player_turn == 1 else strategy_2
-            )
-            move = strategy.select_move(game, game.player_turn)
-            game.apply_move_sequence(move)
-            if game in last_boards:
-                board_repeats += 1
-
-            if board_repeats == 3:
-                # infinite loop (tie)
-                print('Board repeats - tie')
-                return MAX_TURNS
-
-            last_boards.add(deepcopy(game))
-            turns += 1
-
-        state = game.state()
-        if state == 1:
-            print(f'Won in {turns} turns.')
-            return min(MAX_TURNS, turns)
-        else:
-            print(f'Failed to beat player 2, game state: {state}')
-            return MAX_TURNS
-
-    def crossover_avg(weights_1: list, weights_2: list):
-        """
-        Return crossed-over weights from the two input weights lists
-        """
-        return [np.average([weights_1[i],
-                            weights_2[i]]) for i in range(0, len(weights_1))]
-
-    def genetic_search():
-        """
-        Genetic search of optimal weights, right now implemented as an
-        infinite loop (results to be gathered via stdout).
-        """
-        n_generations = 0
-
-        generation = [random_individual()
-                      for i in range(0, GENERATION_SIZE)]
-
-        while True:
-            print(f'Generation {n_generations}: {generation}')
-
-            scores = Counter()
-
-            for i in range(0, GENERATION_SIZE):
-                n_turns = compete(generation[i], [0.0, 1.0, 0.0, 0.0])
-                scores[i] += MAX_TURNS - n_turns
-
-            # select at most X population for the next generation
-            best = [a[0]
-                    for a in scores.most_common(n=SELECT_BEST)]
-
-            print(f'{len(best)} candidates selected for next generation.')
-            next_generation = [generation[b] for b in best]
-
-            # fill with offspring from the best candidates
-            for pair in itertools.combinations(best, 2):
-                next_generation.append(
-                    crossover_avg(generation[pair[0]],
-                                  generation[pair[1]]))
-                print(f'Offspring generated between: {pair}')
-                if len(next_generation) == GENERATION_SIZE - RANDOM_FILL_SIZE:
-                    break
-
-            for i in range(len(next_generation), GENERATION_SIZE):
-                # fill the remaining space for the next generation with
-                # random individuals
-                next_generation.append(random_individual())
-
-            assert len(generation) == GENERATION_SIZE
-            generation = next_generation
-            n_generations += 1
-
-    genetic_search()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--generations",
+        type=int,
+        default=None,
+        help=("Generations to play in total (resumed runs count the ones "
+              "already played). By default, no limit."))
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        default=None,
+        help=("Seconds after which no new generation is started. By "
+              "default, no limit."))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Processes playing the games of each generation.")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Seed of a new run (resumed runs keep their own).")
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default='weight_search.json',
+        help=("File where the population is saved after each generation. "
+              "If it exists, the run is resumed from it."))
+    args = parser.parse_args()
+    genetic_search(args.checkpoint, args.generations, args.time_budget,
+                   args.workers, args.seed)
@@ -177,3 +177,14 @@ TEST_BOARD_END_GAME = \
      [1, 0, 0],
      [1, 0],
      [1]]
+
+TEST_BOARD_RACE = \
+    [[0],
+     [0, 0],
+     [2, 2, 0],
+     [2, 2, 2, 2],
+     [1, 1, 1, 0, 0],
+     [0, 1, 1, 1],
+     [0, 0, 0],
+     [0, 0],
+     [0]]
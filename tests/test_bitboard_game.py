@@ -0,0 +1,107 @@
+import random
+import unittest
+from copy import deepcopy
+
+from chinese_checkers.bitboard_game import CCBitboardGame
+from chinese_checkers.game import CCGame
+from chinese_checkers.geometry import DIRECTIONS
+from chinese_checkers.movement import CCMovement
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+
+from constants import (
+    TEST_BOARD_PLAYER_1_WINS, TEST_BOARD_PLAYER_2_WINS,
+    TEST_BOARD_PLAYER_1_DOES_NOT_WIN, TEST_BOARD_VA_1_1
+)
+
+
+class TestCCBitboardGame(unittest.TestCase):
+
+    def test_shifts_match_geometry(self):
+        game = CCBitboardGame(width=7, player_row_span=3)
+        geometry = game.geometry
+        cell_bit = game.tables.cell_bit
+        for cell in range(0, geometry.n_cells):
+            for direction, movement in enumerate(DIRECTIONS):
+                neighbor = geometry.neighbors[cell][direction]
+                expected = 0 if neighbor < 0 else 1 << cell_bit[neighbor]
+                self.assertEqual(expected,
+                                 game.shift(1 << cell_bit[cell], movement))
+
+    def test_state(self):
+        game = CCBitboardGame(width=5)
+        self.assertEqual(0, game.state())
+        game.set_board(deepcopy(TEST_BOARD_PLAYER_1_WINS))
+        self.assertEqual(1, game.state())
+        game.set_board(deepcopy(TEST_BOARD_PLAYER_1_DOES_NOT_WIN))
+        self.assertEqual(0, game.state())
+        game.set_board(deepcopy(TEST_BOARD_PLAYER_2_WINS))
+        self.assertEqual(2, game.state())
+
+    def test_available_moves(self):
+        game = CCGame(width=5)
+        bitboard_game = CCBitboardGame(width=5)
+        for g in [game, bitboard_game]:
+            g.move(2, 0, CCMovement.RS)
+            g.rotate_turn()
+        self.assertEqual(CCReasoner.available_moves(game, 1),
+                         CCReasoner.available_moves(bitboard_game, 1))
+
+    def test_destinations(self):
+        game = CCBitboardGame(width=5)
+        game.set_board(deepcopy(TEST_BOARD_VA_1_1))
+        moves = CCReasoner.available_moves(game, 1)
+        for row, column in game.positions(game.pieces[1]):
+            self.assertEqual(
+                set(move.board_positions[-1] for move in moves
+                    if move.board_positions[0] == (row, column)),
+                set(game.positions(game.destinations(row, column))))
+
+    def test_packed_moves(self):
+        """the bitwise move generation finds the same moves as the one of
+        CCGame, through random games"""
+        rnd = random.Random(0)
+        game = CCGame(width=7, player_row_span=3)
+        bitboard_game = CCBitboardGame(width=7, player_row_span=3)
+        for _ in range(0, 40):
+            moves = list(CCReasoner.generate_packed_moves(
+                game, game.player_turn))
+            self.assertEqual(sorted(moves),
+                             sorted(CCReasoner.generate_packed_moves(
+                                 bitboard_game, bitboard_game.player_turn)))
+            move = CCReasoner.unpack_move(game, rnd.choice(moves))
+            game.apply_move_sequence(move)
+            bitboard_game.apply_move_sequence(move)
+
+    def test_undo_restores_pieces(self):
+        game = CCBitboardGame(width=5)
+        pieces = list(game.pieces)
+        game.move(1, 0, CCMovement.LS)
+        self.assertNotEqual(pieces, game.pieces)
+        game.undo_last_move()
+        self.assertEqual(pieces, game.pieces)
+
+    def test_make_move(self):
+        game = CCBitboardGame(width=5)
+        game.set_board(deepcopy(TEST_BOARD_VA_1_1))
+        pieces = list(game.pieces)
+        for move in CCReasoner.generate_packed_moves(game, 1):
+            game.make_move(move)
+            made = list(game.pieces)
+            # same bitsets as building them from the board
+            game.set_board(game.board)
+            self.assertEqual(game.pieces, made)
+            game.unmake_move()
+            self.assertEqual(pieces, game.pieces)
+
+    def test_strategy(self):
+        game = CCGame(width=5)
+        bitboard_game = CCBitboardGame(width=5)
+        strategy = MinMaxStrategy(steps=0)
+        for _ in range(0, 4):
+            move = strategy.select_move(game, game.player_turn)
+            self.assertEqual(move, strategy.select_move(
+                bitboard_game, bitboard_game.player_turn))
+            game.apply_move_sequence(move)
+            bitboard_game.apply_move_sequence(move)
+        self.assertEqual(game.board, bitboard_game.board)
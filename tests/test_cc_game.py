@@ -1,7 +1,10 @@
+import random
 import unittest
 
 from chinese_checkers.movement import CCMovement
 from chinese_checkers.game import CCGame
+from chinese_checkers.game_visitor import GameVisitor
+from chinese_checkers.reasoner import CCReasoner
 
 from constants import (
     TEST_BOARD, TEST_BOARD_PLAYER_1_WINS, TEST_BOARD_PLAYER_2_WINS,
@@ -37,19 +40,19 @@ class TestCCGame(unittest.TestCase):
 
         def test_state_player_1_wins(self):
             game = CCGame(width=5)
-            game.board = TEST_BOARD_PLAYER_1_WINS
+            game.set_board(TEST_BOARD_PLAYER_1_WINS)
             self.assertEqual(1,
                              game.state())
 
         def test_state_player_1_does_not_win(self):
             game = CCGame(width=5)
-            game.board = TEST_BOARD_PLAYER_1_DOES_NOT_WIN
+            game.set_board(TEST_BOARD_PLAYER_1_DOES_NOT_WIN)
             self.assertEqual(0,
                              game.state())
 
         def test_state_player_2_wins(self):
             game = CCGame(width=5)
-            game.board = TEST_BOARD_PLAYER_2_WINS
+            game.set_board(TEST_BOARD_PLAYER_2_WINS)
             self.assertEqual(2,
                              game.state())
 
@@ -143,3 +146,122 @@ class TestCCGame(unittest.TestCase):
         def test_jump_invalid(self):
             game = CCGame(width=5)
             game.move(0, 0, CCMovement.LS)
+
+        def test_serialize(self):
+            game = CCGame(width=5)
+            game.set_board(TEST_BOARD_PLAYER_1_DOES_NOT_WIN)
+            game.rotate_turn()
+            data = game.serialize()
+            self.assertEqual(3 + 25, len(data))
+            self.assertEqual(game, CCGame.deserialize(data))
+
+        def test_set_position(self):
+            game = CCGame(width=5)
+            game.set_board(TEST_BOARD_PLAYER_1_DOES_NOT_WIN)
+            game.rotate_turn()
+            other_game = CCGame(width=5)
+            other_game.set_position(game.serialize())
+            self.assertEqual(game, other_game)
+            self.assertEqual(game.goal_pieces, other_game.goal_pieces)
+            with self.assertRaises(ValueError):
+                CCGame(width=7).set_position(game.serialize())
+
+        def test_goal_pieces(self):
+            """the goal counts kept on every move must match the board,
+            through a whole game and its undoing"""
+            rnd = random.Random(0)
+            game = CCGame(width=5)
+            hops = []
+            while len(hops) < 80 and game.state() == 0:
+                move = rnd.choice(
+                    CCReasoner.available_moves(game, game.player_turn))
+                game.apply_move_sequence(move)
+                hops.append(len(move.directions))
+                goal_pieces = game.goal_pieces
+                game.set_board(game.board)
+                self.assertEqual(goal_pieces, game.goal_pieces)
+            while hops:
+                game.rotate_turn()
+                for _ in range(0, hops.pop()):
+                    game.undo_last_move()
+            self.assertEqual([0, 0, 0], game.goal_pieces)
+
+        def test_make_move(self):
+            """make_move must leave the game as the checked moves do, and
+            unmake_move must restore it"""
+            game = CCGame(width=5)
+            game.move(2, 0, CCMovement.RS)
+            game.rotate_turn()
+            board = [list(row) for row in game.board]
+            for move in CCReasoner.available_moves(game, 1):
+                checked_game = CCGame(width=5)
+                checked_game.set_board([list(row) for row in board])
+                checked_game.apply_move_sequence(move)
+
+                game.make_move(CCReasoner.packed_move(game, move))
+                self.assertEqual(checked_game.board, game.board)
+                self.assertEqual(checked_game.goal_pieces, game.goal_pieces)
+                game.unmake_move()
+                self.assertEqual(board, game.board)
+            self.assertEqual(1, len(game.move_history))
+
+        def test_visitors_notified_once_per_move(self):
+            visitor = RecordingVisitor()
+            game = CCGame(width=5, visitors=[visitor])
+            rnd = random.Random(0)
+            # play until a move with several jumps comes up
+            while True:
+                moves = CCReasoner.available_moves(game, game.player_turn)
+                jumps = [move for move in moves if len(move.directions) > 1]
+                if jumps:
+                    break
+                game.apply_move_sequence(rnd.choice(moves))
+            visitor.moves = []
+            move = jumps[0]
+            game.apply_move_sequence(move)
+            self.assertEqual([(*move.board_positions[0],
+                               *move.board_positions[-1],
+                               2 if game.player_turn == 1 else 1)],
+                             visitor.moves)
+
+        def test_only_visitors(self):
+            kept = RecordingVisitor()
+            muted = RecordingVisitor()
+            game = CCGame(width=5, visitors=[kept, muted])
+            with game.only_visitors([kept]):
+                for move in CCReasoner.generate_packed_moves(game, 1):
+                    game.make_move(move)
+                    game.unmake_move()
+            self.assertTrue(len(kept.moves) > 0)
+            self.assertEqual([], muted.moves)
+            game.move(2, 0, CCMovement.RS)
+            self.assertEqual([(2, 0, 3, 1, 1)], muted.moves)
+
+        def test_set_board(self):
+            """set_board counts the goals again and initializes the
+            visitors, also after modifying the board in place"""
+            visitor = RecordingVisitor()
+            game = CCGame(width=5, visitors=[visitor])
+            game.move(2, 0, CCMovement.RS)
+            game.set_board([list(row) for row in TEST_BOARD_PLAYER_2_WINS])
+            self.assertEqual([], visitor.moves)
+            self.assertEqual(2, game.state())
+            game.board[0][0] = 0
+            self.assertEqual(2, game.state())
+            game.set_board(game.board)
+            self.assertEqual(0, game.state())
+
+
+class RecordingVisitor(GameVisitor):
+
+    def on_init_game(self, board: list):
+        self.moves = []
+
+    def on_move(self,
+                from_row: int,
+                from_column: int,
+                dest_row: int,
+                dest_column: int,
+                player: int):
+        self.moves.append((from_row, from_column, dest_row, dest_column,
+                           player))
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from chinese_checkers.game import CCGame
@@ -9,8 +10,10 @@ from constants import (
     TEST_BOARD_CENTER_LINE
 )
 from chinese_checkers.movement import CCMovement
+from chinese_checkers.reasoner import CCReasoner
 from chinese_checkers.heuristic.heuristics import CombinedVerticalAdvance,\
-    InvSquaredSumCenterLine, InvSquaredSumDestCorner, CombinedHeuristic
+    InvSquaredSumCenterLine, InvSquaredSumDestCorner, CombinedHeuristic, \
+    Clusteredness
 from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
 
 
@@ -25,8 +28,8 @@ class TestCCHeuristics(unittest.TestCase):
     def test_combined_vertical_advance_player_1(self):
         game_1 = CCGame(width=5)
         game_2 = CCGame(width=5)
-        game_1.board = TEST_BOARD_VA_1_1
-        game_2.board = TEST_BOARD_VA_1_2
+        game_1.set_board(TEST_BOARD_VA_1_1)
+        game_2.set_board(TEST_BOARD_VA_1_2)
         heuristic = CombinedVerticalAdvance()
         self.assertTrue(heuristic.value(game_1, 1) <
                         heuristic.value(game_2, 1))
@@ -34,29 +37,29 @@ class TestCCHeuristics(unittest.TestCase):
     def test_combined_vertical_advance_player_2(self):
         game_1 = CCGame(width=5)
         game_2 = CCGame(width=5)
-        game_1.board = TEST_BOARD_VA_2_1
-        game_2.board = TEST_BOARD_VA_2_2
+        game_1.set_board(TEST_BOARD_VA_2_1)
+        game_2.set_board(TEST_BOARD_VA_2_2)
         heuristic = CombinedVerticalAdvance()
         self.assertTrue(heuristic.value(game_1, 2) <
                         heuristic.value(game_2, 2))
 
     def test_inv_squared_sum_dest_corner(self):
         game = CCGame(width=5)
-        game.board = TEST_BOARD_SQUARED_SUM
+        game.set_board(TEST_BOARD_SQUARED_SUM)
         heuristic = InvSquaredSumDestCorner()
         self.assertTrue(heuristic.value(game, 1) <
                         heuristic.value(game, 2))
 
     def inv_squared_sum_dest_corner_zero(self):
         game = CCGame(width=5)
-        game.board = TEST_BOARD_SQUARED_SUM_ZERO
+        game.set_board(TEST_BOARD_SQUARED_SUM_ZERO)
         heuristic = InvSquaredSumDestCorner()
         self.assertEqual(heuristic.value(game, 1), 0)
         self.assertEqual(heuristic.value(game, 2), 0)
 
     def test_inv_squared_sum_center_line(self):
         game = CCGame(width=5)
-        game.board = TEST_BOARD_CENTER_LINE
+        game.set_board(TEST_BOARD_CENTER_LINE)
         heuristic = InvSquaredSumCenterLine()
         self.assertTrue(heuristic.value(game, 2) <
                         heuristic.value(game, 1))
@@ -64,8 +67,8 @@ class TestCCHeuristics(unittest.TestCase):
     def test_combined_heuristic(self):
         game_1 = CCGame(width=5)
         game_2 = CCGame(width=5)
-        game_1.board = TEST_BOARD_VA_2_1
-        game_2.board = TEST_BOARD_VA_2_2
+        game_1.set_board(TEST_BOARD_VA_2_1)
+        game_2.set_board(TEST_BOARD_VA_2_2)
         heuristic = CombinedVerticalAdvance()
         self.assertTrue(heuristic.value(game_1, 2) <
                         heuristic.value(game_2, 2))
@@ -97,3 +100,60 @@ class TestCCHeuristics(unittest.TestCase):
 
         game_1.undo_last_move()
         heuristics_agree()
+
+    def test_optimized_combined_heuristic_random_game(self):
+        """test that the incremental tables of the optimized heuristic stay
+        in sync with the board through a whole game and its undoing"""
+        random.seed(0)
+        heuristic = CombinedHeuristic(weights=[0.25, 0.25, 0.25, 0.25])
+        optimized_heuristic = OptimizedCombinedHeuristic(
+            weights=[0.25, 0.25, 0.25, 0.25])
+        game = CCGame(width=5, visitors=[optimized_heuristic])
+
+        def heuristics_agree():
+            for player in [1, 2]:
+                self.assertAlmostEqual(heuristic.value(game, player),
+                                       optimized_heuristic.value(game,
+                                                                 player))
+
+        # number of single steps/jumps of each move
+        hops = []
+        while len(hops) < 60 and game.state() == 0:
+            move = random.choice(
+                CCReasoner.available_moves(game, game.player_turn))
+            game.apply_move_sequence(move)
+            hops.append(len(move.directions))
+            heuristics_agree()
+        while hops:
+            game.rotate_turn()
+            for _ in range(0, hops.pop()):
+                game.undo_last_move()
+            heuristics_agree()
+
+    def test_combined_heuristic_single_pass(self):
+        """test that the single pass combined heuristic gives exactly the
+        weighted sum of the separate heuristics"""
+        heuristic = CombinedHeuristic()
+        weights = heuristic.weights
+        for board in [TEST_BOARD_VA_1_1, TEST_BOARD_VA_1_2,
+                      TEST_BOARD_VA_2_1, TEST_BOARD_VA_2_2,
+                      TEST_BOARD_CENTER_LINE]:
+            game = CCGame(width=5)
+            game.set_board(board)
+            values = {}
+            for player in [1, 2]:
+                values[player] = (
+                    weights[0] * InvSquaredSumCenterLine().value(game,
+                                                                 player) +
+                    weights[1] * CombinedVerticalAdvance().value(game,
+                                                                 player) +
+                    weights[2] * InvSquaredSumDestCorner().value(game,
+                                                                 player) +
+                    weights[3] * Clusteredness().value(game, player)
+                )
+                self.assertEqual(values[player],
+                                 heuristic.value(game, player))
+            self.assertEqual(values[1] - values[2],
+                             heuristic.differential_value(game, 1))
+            self.assertEqual(values[2] - values[1],
+                             heuristic.differential_value(game, 2))
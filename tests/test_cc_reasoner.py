@@ -2,7 +2,7 @@ import unittest
 from chinese_checkers.game import CCGame
 from chinese_checkers.reasoner import CCReasoner
 from chinese_checkers.movement import CCMovement
-from chinese_checkers.move import CCMove
+from chinese_checkers.move import CCMove, pack_move
 
 
 class TestCCReasoner(unittest.TestCase):
@@ -40,3 +40,54 @@ class TestCCReasoner(unittest.TestCase):
                                [CCMovement.RS, CCMovement.L]) in moves)
         self.assertTrue(CCMove([(2, 2), (2, 0), (4, 2)],
                                [CCMovement.L, CCMovement.RS]) in moves)
+
+    def test_generate_moves(self):
+        game = CCGame(width=5)
+        game.move(2, 0, CCMovement.RS)
+        game.rotate_turn()
+        moves = list(CCReasoner.generate_moves(game, 1))
+        ends = [(move.board_positions[0], move.board_positions[-1])
+                for move in moves]
+        # one move per destination, same destinations as available_moves
+        self.assertEqual(len(ends), len(set(ends)))
+        self.assertEqual(set(ends),
+                         set((move.board_positions[0],
+                              move.board_positions[-1])
+                             for move in CCReasoner.available_moves(game,
+                                                                    1)))
+        # shortest path: (2, 2) -> (4, 2) by two jumps
+        self.assertTrue(CCMove([(2, 2), (2, 0), (4, 2)],
+                               [CCMovement.L, CCMovement.RS]) in moves)
+
+    def test_generate_moves_does_not_modify_game(self):
+        game = CCGame(width=5)
+        game.move(2, 0, CCMovement.RS)
+        game.rotate_turn()
+        board = [list(row) for row in game.board]
+        moves = list(CCReasoner.generate_moves(game, 1))
+        self.assertTrue(len(moves) > 0)
+        self.assertEqual(board, game.board)
+        self.assertEqual(1, len(game.move_history))
+        self.assertEqual([], list(CCReasoner.generate_moves(game, 2)))
+
+    def test_packed_moves(self):
+        game = CCGame(width=5)
+        game.move(2, 0, CCMovement.RS)
+        game.rotate_turn()
+        moves = list(CCReasoner.generate_moves(game, 1))
+        packed_moves = list(CCReasoner.generate_packed_moves(game, 1))
+        self.assertEqual(moves,
+                         [CCReasoner.unpack_move(game, move)
+                          for move in packed_moves])
+
+    def test_unpack_invalid_move(self):
+        game = CCGame(width=5)
+        geometry = game.geometry
+        # step onto a piece
+        with self.assertRaises(ValueError):
+            CCReasoner.unpack_move(
+                game, pack_move(geometry.cell(0, 0), geometry.cell(1, 0)))
+        # no jump path
+        with self.assertRaises(ValueError):
+            CCReasoner.unpack_move(
+                game, pack_move(geometry.cell(0, 0), geometry.cell(4, 4)))
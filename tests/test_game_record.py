@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.game_record import (
+    CCGameRecord, CCGameRecordWriter, read_game_records
+)
+from chinese_checkers.move import pack_move
+from chinese_checkers.reasoner import CCReasoner
+from chinese_checkers.self_play import generate
+from chinese_checkers.tournament import random_opening
+
+
+class TestGameRecord(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        records = [
+            CCGameRecord(5, 3, random_opening(5, 3, 20, 'a'), 0),
+            CCGameRecord(7, 3),
+            # more than 256 cells
+            CCGameRecord(9, 4, random_opening(9, 4, 20, 'b'), 2),
+        ]
+        with CCGameRecordWriter(self.path) as writer:
+            for record in records:
+                writer.write(record)
+            self.assertEqual(3, writer.games)
+        self.assertEqual(records, list(read_game_records(self.path)))
+
+    def test_replay(self):
+        moves = random_opening(7, 3, 10, 'c')
+        record = CCGameRecord(7, 3, moves)
+        game = CCGame(width=7, player_row_span=3)
+        for (replayed, move), expected in zip(record.replay(), moves):
+            self.assertEqual(expected, move)
+            self.assertEqual(game, replayed)
+            game.apply_move_sequence(CCReasoner.unpack_move(game, move))
+        self.assertEqual(game, record.final_game())
+
+    def test_invalid_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'CCGAME00')
+        with self.assertRaises(ValueError):
+            list(read_game_records(self.path))
+
+        with CCGameRecordWriter(self.path) as writer:
+            writer.write(CCGameRecord(5, 3, random_opening(5, 3, 10, 'd')))
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            list(read_game_records(self.path))
+
+    def test_invalid_moves(self):
+        # from an empty cell, onto a piece, and an impossible jump
+        for move in [pack_move(10, 11), pack_move(1, 2), pack_move(0, 24)]:
+            record = CCGameRecord(5, 3, [move])
+            with self.assertRaises(ValueError):
+                record.final_game()
+            with self.assertRaises(ValueError):
+                list(record.replay())
+
+    def test_invalid_records(self):
+        with CCGameRecordWriter(self.path) as writer:
+            for record in [CCGameRecord(5, 3, [], 3),
+                           CCGameRecord(5, 3, [pack_move(0, 1)] * 65536),
+                           CCGameRecord(5, 3, [pack_move(0, 121)])]:
+                with self.assertRaises(ValueError):
+                    writer.write(record)
+            self.assertEqual(0, writer.games)
+        self.assertEqual([], list(read_game_records(self.path)))
+
+    def test_self_play(self):
+        engine = {'steps': 0}
+        generate(self.path, 6, engine, 5, 1, opening_plies=2, workers=2)
+        with open(self.path, 'rb') as f:
+            parallel = f.read()
+        generate(self.path, 6, engine, 5, 1, opening_plies=2, workers=1)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(parallel, f.read())
+
+        records = list(read_game_records(self.path))
+        self.assertEqual(6, len(records))
+        for record in records:
+            self.assertEqual(record.result, record.final_game().state())
+
+
+if __name__ == '__main__':
+    unittest.main()
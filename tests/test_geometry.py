@@ -0,0 +1,51 @@
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.geometry import OFF_BOARD, DIRECTIONS, board_geometry
+from chinese_checkers.movement import CCMovement
+
+
+class TestCCGeometry(unittest.TestCase):
+
+    def test_geometry_is_shared(self):
+        game_1 = CCGame(width=7)
+        game_2 = CCGame(width=7)
+        self.assertIs(game_1.geometry, game_2.geometry)
+        self.assertIsNot(game_1.geometry, CCGame(width=5).geometry)
+
+    def test_cells_match_board(self):
+        game = CCGame(width=5)
+        geometry = game.geometry
+        self.assertEqual(geometry.n_cells,
+                         sum(len(row) for row in game.board))
+        for cell in range(0, geometry.n_cells):
+            row, column = geometry.position(cell)
+            self.assertEqual(cell, geometry.cell(row, column))
+
+    def test_neighbors_match_dest_position(self):
+        game = CCGame(width=7, player_row_span=3)
+        geometry = game.geometry
+        for cell in range(0, geometry.n_cells):
+            row, column = geometry.position(cell)
+            for direction, movement in enumerate(DIRECTIONS):
+                dest_row, dest_column = game._dest_position(row, column,
+                                                            movement)
+                expected = (
+                    geometry.cell(dest_row, dest_column)
+                    if game.within_bounds(dest_row, dest_column)
+                    else OFF_BOARD)
+                self.assertEqual(expected,
+                                 geometry.neighbors[cell][direction])
+
+    def test_jumps(self):
+        geometry = board_geometry(5, 3)
+        # (1, 0) jumps over (2, 0) into (3, 0)
+        cell = geometry.cell(1, 0)
+        direction = CCMovement.LS.value - 1
+        self.assertEqual(geometry.cell(2, 0),
+                         geometry.neighbors[cell][direction])
+        self.assertEqual(geometry.cell(3, 0),
+                         geometry.jumps[cell][direction])
+        # top of the board
+        self.assertEqual(OFF_BOARD,
+                         geometry.jumps[0][CCMovement.RN.value - 1])
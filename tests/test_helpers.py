@@ -20,3 +20,35 @@ class TestCCGame(unittest.TestCase):
 
         self.assertFalse(hasher.get_hash(game) ==
                          hasher.get_hash(game_2))
+
+    def test_zobrist_hashing_incremental(self):
+        game = CCGame(width=5)
+        hasher = CCZobristHash(game)
+        self.assertIs(hasher, CCZobristHash.of(game))
+
+        game.move(2, 0, CCMovement.LS)
+        game.move(6, 0, CCMovement.LN)
+        self.assertEqual(hasher._full_hash(game), hasher.get_hash(game))
+
+        game.undo_last_move()
+        game.undo_last_move()
+        self.assertEqual(hasher.get_hash(CCGame(width=5)),
+                         hasher.get_hash(game))
+
+    def test_zobrist_hashing_side_to_move(self):
+        game = CCGame(width=5)
+        hasher = CCZobristHash(game)
+        hash_ = hasher.get_hash(game)
+        game.rotate_turn()
+        self.assertNotEqual(hash_, hasher.get_hash(game))
+        game.rotate_turn()
+        self.assertEqual(hash_, hasher.get_hash(game))
+
+    def test_zobrist_hashing_players(self):
+        game_1 = CCGame(width=5)
+        game_2 = CCGame(width=5)
+        game_1.board[3][0] = 1
+        game_2.board[3][0] = 2
+        hasher = CCZobristHash(CCGame(width=5))
+        self.assertNotEqual(hasher.get_hash(game_1),
+                            hasher.get_hash(game_2))
@@ -1,5 +1,8 @@
+import multiprocessing
 import unittest
 from chinese_checkers.game import CCGame
+from chinese_checkers.heuristic.oc_heuristic import OptimizedCombinedHeuristic
+from chinese_checkers.strategy import parallel_search
 from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
 
 from constants import (
@@ -16,46 +19,46 @@ class TestMinMaxStrategy(unittest.TestCase):
 
     def test_player_1_wins(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO)
         strategy = MinMaxStrategy(alpha_beta_pruning=False)
 
         move, score = strategy._select_move(game, 1, 0, -100000, 100000)
         self.assertTrue(score > 1000)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
 
         game.rotate_turn()
 
         move, score = strategy._select_move(game, 1, 0, -100000, 100000)
         self.assertEqual(100000, score)
 
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         self.assertEqual(1, game.state())
 
     def test_player_1_wins_in_one(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_ONE
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_ONE)
         strategy = MinMaxStrategy(steps=0)
 
         move, score = strategy._select_move(game, 1, 0, -100000, 100000)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         self.assertEqual(100000, score)
         self.assertEqual(1, game.state())
 
     def test_player_2_wins_in_one(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_ONE
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_ONE)
         strategy = MinMaxStrategy(steps=0)
 
         game.rotate_turn()
 
         move, score = strategy._select_move(game, 2, 0, -100000, 100000)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         self.assertEqual(100000, score)
         self.assertEqual(2, game.state())
 
     def test_player_2_wins(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_TWO
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_TWO)
         strategy = MinMaxStrategy(steps=1, alpha_beta_pruning=False)
         strategy_0 = MinMaxStrategy(steps=0, alpha_beta_pruning=False)
 
@@ -63,31 +66,31 @@ class TestMinMaxStrategy(unittest.TestCase):
 
         move, score = strategy._select_move(game, 2, 0, -100000, 100000)
         self.assertTrue(score > 1000)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
 
         game.rotate_turn()
 
         move, score = strategy_0._select_move(game, 2, 0, -100000, 100000)
         self.assertTrue(score > 1000)
 
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         self.assertEqual(2, game.state())
 
     def test_use_only_max_beginning_game(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_VA_2_2
+        game.set_board(TEST_BOARD_VA_2_2)
         strat = MinMaxStrategy(steps=0, alpha_beta_pruning=False)
         self.assertTrue(strat._use_only_max(game))
 
     def test_use_only_max_end_game(self):
         game = CCGame(width=5, player_row_span=2)
-        game.board = TEST_BOARD_END_GAME
+        game.set_board(TEST_BOARD_END_GAME)
         strat = MinMaxStrategy(steps=0, alpha_beta_pruning=False)
         self.assertTrue(strat._use_only_max(game))
 
     def test_use_only_max_false(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_VA_1_1
+        game.set_board(TEST_BOARD_VA_1_1)
         strat = MinMaxStrategy(steps=0, alpha_beta_pruning=False)
         self.assertFalse(strat._use_only_max(game))
 
@@ -129,3 +132,249 @@ class TestMinMaxStrategy(unittest.TestCase):
             self.assertAlmostEqual(h_tt, h_no_tt, 2)
 
             game.apply_move_sequence(m_tt)
+
+    def test_time_limit(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_VA_1_1)
+        board = [list(row) for row in game.board]
+        strategy = MinMaxStrategy(steps=1, pre_sort_moves=True,
+                                  transposition_table=True)
+        move = strategy.select_move(game, 1, time_limit=0.5)
+        self.assertEqual(board, game.board)
+        self.assertIn(move, strategy.available_moves(game, 1))
+        # search depth is restored
+        self.assertEqual(2, strategy.max_depth)
+
+    def test_time_limit_player_1_wins(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO)
+        strategy = MinMaxStrategy(steps=0, time_limit=5)
+        for _ in range(0, 2):
+            game.apply_move_sequence(strategy.select_move(game, 1))
+            game.rotate_turn()
+        self.assertEqual(1, game.state())
+
+    def test_pvs_player_1_wins(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO)
+        strategy = MinMaxStrategy(steps=2, pvs=True, pre_sort_moves=True)
+        for _ in range(0, 2):
+            game.apply_move_sequence(strategy.select_move(game, 1))
+            game.rotate_turn()
+        self.assertEqual(1, game.state())
+
+    def test_pvs_scores(self):
+        """null window searches must not change the score of the search,
+        while visiting less positions"""
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_END_GAME)
+        strategy = MinMaxStrategy(steps=2, pre_sort_moves=True)
+        strategy_pvs = MinMaxStrategy(steps=2, pre_sort_moves=True,
+                                      pvs=True)
+        _, score = strategy._select_move(game, 1, 0, -100000, 100000)
+        _, score_pvs = strategy_pvs._select_move(game, 1, 0,
+                                                 -100000, 100000)
+        self.assertAlmostEqual(score, score_pvs)
+        self.assertTrue(strategy_pvs.search_stats.nodes <
+                        strategy.search_stats.nodes)
+
+    def test_parallel_search(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_VA_2_2)
+        strategy = MinMaxStrategy(steps=1, pre_sort_moves=True)
+        strategy_parallel = MinMaxStrategy(steps=1, pre_sort_moves=True,
+                                           transposition_table=True,
+                                           workers=2)
+        try:
+            move = strategy.select_move(game, 1)
+            move_parallel = strategy_parallel.select_move(game, 1)
+            # keep the game as it was
+            self.assertEqual(TEST_BOARD_VA_2_2, game.board)
+            self.assertEqual(move, move_parallel)
+            self.assertEqual(strategy.principal_variation,
+                             strategy_parallel.principal_variation)
+            # counters of the worker processes are added up
+            stats = strategy_parallel.search_stats
+            self.assertEqual(
+                len(strategy.search_stats.summary()['depth_nodes']),
+                len(stats.summary()['depth_nodes']))
+            self.assertEqual(strategy.search_stats.depth_nodes[0],
+                             stats.depth_nodes[0])
+        finally:
+            strategy_parallel.close()
+
+    def test_parallel_search_ties(self):
+        """a move that ties with the best score published by other workers
+        gets its exact score, so that ties are broken by move order"""
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board([list(row) for row in TEST_BOARD_VA_2_2])
+        strategy = MinMaxStrategy(steps=1, pre_sort_moves=True)
+        strategy._prepare_search(game)
+        move = strategy._ordered_moves(game, 1, 0)[0]
+        score = strategy._search_root_move(game, 1, move,
+                                           -100000.0, 100000.0)[0]
+
+        parallel_search._init_worker(MinMaxStrategy,
+                                     strategy._worker_config(),
+                                     multiprocessing.Value('d', score))
+        try:
+            worker_score, alpha, _, _ = parallel_search._search_root_move(
+                CCGame, game.serialize(), 1, move, 1)
+        finally:
+            parallel_search._init_worker(type(None), {}, None)
+        self.assertTrue(worker_score > alpha)
+        self.assertAlmostEqual(score, worker_score)
+
+    def test_parallel_search_worker_game(self):
+        """workers keep their game, and the hasher attached to it, from
+        one root move to the next"""
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board([list(row) for row in TEST_BOARD_VA_2_2])
+        strategy = MinMaxStrategy(steps=1, pre_sort_moves=True,
+                                  transposition_table=True)
+        parallel_search._init_worker(MinMaxStrategy,
+                                     strategy._worker_config(),
+                                     multiprocessing.Value('d', -100000.0))
+        try:
+            worker_games = set()
+            for search_id, board in enumerate([TEST_BOARD_VA_2_2,
+                                               TEST_BOARD_VA_1_1]):
+                game.set_board([list(row) for row in board])
+                strategy._prepare_search(game)
+                for move in strategy._ordered_moves(game, 1, 0)[:2]:
+                    parallel_search._best_score.value = -100000.0
+                    worker_score = parallel_search._search_root_move(
+                        CCGame, game.serialize(), 1, move, search_id)[0]
+                    self.assertAlmostEqual(
+                        strategy._search_root_move(game, 1, move, -100000.0,
+                                                   100000.0)[0],
+                        worker_score)
+                    worker_games.add(id(parallel_search._game))
+                    self.assertIs(parallel_search._game,
+                                  parallel_search._strategy.hasher.game)
+            self.assertEqual(1, len(worker_games))
+        finally:
+            parallel_search._init_worker(type(None), {}, None)
+
+    def test_parallel_search_no_moves(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board([[0 if value == 1 else value for value in row]
+                        for row in TEST_BOARD_VA_2_2])
+        strategy = MinMaxStrategy(steps=1)
+        strategy._prepare_search(game)
+        search = parallel_search.CCParallelRootSearch(
+            MinMaxStrategy, strategy._worker_config(), 2)
+        try:
+            with self.assertRaises(AssertionError):
+                search.search(strategy, game, 1)
+        finally:
+            search.close()
+
+    def test_hash_after_new_board(self):
+        """the transposition table must not be fooled by boards or turns
+        assigned between searches"""
+        game = CCGame(width=5, player_row_span=3)
+        strategy = MinMaxStrategy(steps=1, transposition_table=True)
+        strategy.select_move(game, 1)
+        game.set_board([list(row) for row in TEST_BOARD_VA_1_1])
+        game.player_turn = 2
+        move = strategy.select_move(game, 2)
+        self.assertEqual(strategy.hasher._full_hash(game),
+                         strategy.hasher.get_hash(game))
+
+        fresh_game = CCGame(width=5, player_row_span=3)
+        fresh_game.set_board([list(row) for row in TEST_BOARD_VA_1_1])
+        fresh_game.player_turn = 2
+        self.assertEqual(
+            MinMaxStrategy(steps=1, transposition_table=True).select_move(
+                fresh_game, 2),
+            move)
+
+    def test_search_stats(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board([list(row) for row in TEST_BOARD_VA_1_1])
+        strategy = MinMaxStrategy(steps=1, pre_sort_moves=True,
+                                  transposition_table=True)
+        strategy.select_move(game, 1)
+        stats = strategy.search_stats
+        summary = stats.summary()
+        self.assertEqual('search', summary['source'])
+        self.assertFalse(summary['only_max'])
+        # own move, reply and own move again
+        self.assertEqual(3, len(summary['depth_nodes']))
+        # every move of the last ply is a leaf (or ends the game)
+        self.assertTrue(0 < summary['leaves'] <= summary['depth_nodes'][2])
+        self.assertTrue(summary['nodes'] <= summary['moves_generated'])
+        self.assertEqual(stats.cutoffs, sum(stats.cutoff_indexes.values()))
+        self.assertTrue(stats.cutoffs > 0)
+        self.assertEqual(strategy.tt.probes, summary['tt_probes'])
+        self.assertEqual(strategy.tt.stores, summary['tt_stores'])
+        self.assertTrue(summary['time'] >= (summary['generation_time'] +
+                                            summary['make_time'] +
+                                            summary['evaluation_time']))
+
+        # a new search, new counters
+        strategy.select_move(game, 1)
+        self.assertEqual(strategy.tt.probes - summary['tt_probes'],
+                         strategy.search_stats.tt_probes)
+
+    def test_search_stats_only_max(self):
+        game = CCGame(width=7, player_row_span=3)
+        strategy = MinMaxStrategy(steps=1)
+        strategy.select_move(game, 1)
+        summary = strategy.search_stats.summary()
+        self.assertEqual('only_max', summary['source'])
+        self.assertTrue(summary['only_max'])
+        self.assertEqual(summary['moves_generated'], summary['nodes'])
+        self.assertEqual(0, summary['cutoffs'])
+
+    def test_batch_leaves(self):
+        """evaluating the leaves in batches must not change the search"""
+        for board in [TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO,
+                      TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_TWO,
+                      TEST_BOARD_VA_1_1,
+                      TEST_BOARD_VA_2_2]:
+            for player in [1, 2]:
+                game = CCGame(width=5, player_row_span=3)
+                game.set_board([list(row) for row in board])
+                game.player_turn = player
+                heuristic = OptimizedCombinedHeuristic()
+                game.add_visitor(heuristic)
+                strategy = MinMaxStrategy(steps=1, pre_sort_moves=True,
+                                          heuristic=heuristic)
+                strategy_batch = MinMaxStrategy(steps=1,
+                                                pre_sort_moves=True,
+                                                heuristic=heuristic,
+                                                batch_leaves=True)
+                move, score = strategy._select_move(game, player, 0,
+                                                    -100000, 100000)
+                move_batch, score_batch = strategy_batch._select_move(
+                    game, player, 0, -100000, 100000)
+                self.assertEqual(move, move_batch)
+                self.assertAlmostEqual(score, score_batch)
+                self.assertEqual(board, game.board)
+
+    def test_batch_leaves_heuristic(self):
+        with self.assertRaises(ValueError):
+            MinMaxStrategy(batch_leaves=True)
+
+    def test_other_visitors_muted(self):
+        """visitors the strategy doesn't use are not notified during the
+        search"""
+        heuristic = OptimizedCombinedHeuristic()
+        other_heuristic = OptimizedCombinedHeuristic()
+        calls = []
+        original_on_move = other_heuristic.on_move
+
+        def on_move(*args):
+            calls.append(args)
+            original_on_move(*args)
+        other_heuristic.on_move = on_move
+        game = CCGame(width=5, player_row_span=3,
+                      visitors=[heuristic, other_heuristic])
+
+        strategy = MinMaxStrategy(steps=1, heuristic=heuristic,
+                                  transposition_table=True)
+        game.apply_move_sequence(strategy.select_move(game, 1))
+        # only the move played
+        self.assertEqual(1, len(calls))
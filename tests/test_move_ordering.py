@@ -0,0 +1,68 @@
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.move import pack_move
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.move_ordering import CCMoveOrdering
+
+from constants import TEST_BOARD_VA_1_1
+
+
+class TestCCMoveOrdering(unittest.TestCase):
+
+    def test_order(self):
+        ordering = CCMoveOrdering(n_cells=41)
+        ordering.new_search()
+        moves = [pack_move(origin, origin + 5) for origin in range(0, 6)]
+        ordering.on_cutoff(moves[4], 2, 1)
+        ordering.on_cutoff(moves[3], 2, 1)
+        ordering.on_cutoff(moves[2], 3, 2)
+        ordering.on_cutoff(moves[2], 4, 2)
+
+        ordered = sorted(moves,
+                         key=lambda move: ordering.priority(move, 2,
+                                                            moves[5]))
+        # tt move, killers (most recent first), then history
+        self.assertEqual([moves[5], moves[3], moves[4], moves[2]],
+                         ordered[:4])
+
+    def test_killer_slots(self):
+        ordering = CCMoveOrdering(n_cells=41)
+        for move in [1, 2, 3, 3]:
+            ordering.on_cutoff(move, 0, 0)
+        self.assertEqual([3, 2], ordering.killers[0])
+        ordering.new_search()
+        self.assertEqual([], ordering.killers)
+
+    def test_history_aging(self):
+        ordering = CCMoveOrdering(n_cells=41)
+        move = pack_move(1, 3)
+        ordering.on_cutoff(move, 0, 3)
+        self.assertEqual(16, ordering.history[1 * 41 + 3])
+        ordering.new_search()
+        self.assertEqual(8, ordering.history[1 * 41 + 3])
+
+    def test_strategy_scores(self):
+        """move ordering must visit less positions without changing the
+        score of the search"""
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_VA_1_1)
+        strategy = MinMaxStrategy(steps=2)
+        strategy_ordering = MinMaxStrategy(steps=2,
+                                           move_ordering=True,
+                                           transposition_table=True)
+        strategy.select_move(game, 1)
+        strategy_ordering.select_move(game, 1)
+        self.assertTrue(strategy_ordering.search_stats.nodes <
+                        strategy.search_stats.nodes)
+
+        _, score = strategy._select_move(game, 1, 0, -100000, 100000)
+        strategy_ordering.tt.new_search()
+        strategy_ordering.ordering.new_search()
+        _, score_ordering = strategy_ordering._select_move(
+            game, 1, 0, -100000, 100000)
+        self.assertEqual(score, score_ordering)
+
+    def test_requires_alpha_beta(self):
+        with self.assertRaises(ValueError):
+            MinMaxStrategy(alpha_beta_pruning=False, move_ordering=True)
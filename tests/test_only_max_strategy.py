@@ -13,25 +13,25 @@ class TestOnlyMaxStrategy(unittest.TestCase):
 
     def test_player_1_wins(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_1_WINS_IN_TWO)
         strategy = OnlyMaxStrategy(steps=1, player=1,
                                    heuristic=CombinedVerticalAdvance())
 
         move, score = strategy._select_move(game, 0)
         self.assertEqual(50000, score)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         game.rotate_turn()
 
         move, score = strategy._select_move(game, 0)
         self.assertEqual(100000, score)
 
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
 
         self.assertEqual(1, game.state())
 
     def test_player_2_wins(self):
         game = CCGame(width=5, player_row_span=3)
-        game.board = TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_TWO
+        game.set_board(TEST_BOARD_STRATEGY_PLAYER_2_WINS_IN_TWO)
         strategy = OnlyMaxStrategy(steps=1, player=2,
                                    heuristic=CombinedVerticalAdvance())
 
@@ -39,12 +39,26 @@ class TestOnlyMaxStrategy(unittest.TestCase):
 
         move, score = strategy._select_move(game, 0)
         self.assertEqual(50000, score)
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
 
         game.rotate_turn()
 
         move, score = strategy._select_move(game, 0)
         self.assertEqual(100000, score)
 
-        game.apply_move_sequence(move)
+        game.apply_move_sequence(strategy.unpack_move(game, move))
         self.assertEqual(2, game.state())
+
+    def test_search_stats(self):
+        game = CCGame(width=5, player_row_span=3)
+        strategy = OnlyMaxStrategy(steps=1, player=1,
+                                   transposition_table=True,
+                                   heuristic=CombinedVerticalAdvance())
+        strategy.select_move(game, 1)
+        stats = strategy.search_stats
+        # all the moves of the first ply are expanded
+        self.assertEqual(stats.moves_generated - stats.depth_nodes[0],
+                         stats.depth_nodes[1])
+        self.assertEqual(stats.depth_nodes[1], stats.leaves)
+        self.assertEqual(stats.depth_nodes[0] + 1, stats.tt_probes)
+        self.assertEqual(0, stats.tt_hits)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from chinese_checkers.build_opening_book import build
+from chinese_checkers.game import CCGame
+from chinese_checkers.helpers import CCZobristHash
+from chinese_checkers.move import pack_move
+from chinese_checkers.record_file import write_record_file
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.opening_book import (
+    BOOK_METADATA, BOOK_VALUE_FORMAT, CCOpeningBook
+)
+
+
+class TestCCOpeningBook(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        book = build(width=5, player_row_span=3, plies=2, steps=1,
+                     branching=2)
+        write_record_file(self.path, book.items(), BOOK_VALUE_FORMAT,
+                          BOOK_METADATA.pack(5, 3, 0))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_probe(self):
+        book = CCOpeningBook(self.path)
+        # initial position and 2 replies
+        self.assertEqual(3, len(book))
+        game = CCGame(width=5, player_row_span=3)
+        move = book.probe(game)
+        self.assertEqual(MinMaxStrategy(steps=1).select_move(game, 1), move)
+        game.apply_move_sequence(move)
+        self.assertIsNotNone(book.probe(game))
+        # out of the book
+        game.apply_move_sequence(book.probe(game))
+        self.assertIsNone(book.probe(game))
+        # other board sizes are never in the book
+        self.assertIsNone(book.probe(CCGame(width=7, player_row_span=3)))
+        # probing doesn't attach anything to the game
+        self.assertEqual([], game.visitors)
+        book.close()
+
+    def test_collision(self):
+        game = CCGame(width=5, player_row_span=3)
+        key = CCZobristHash(CCGame(width=5, player_row_span=3)).get_hash(
+            game)
+        # a step onto a piece of the player
+        write_record_file(self.path, [(key, pack_move(0, 1))],
+                          BOOK_VALUE_FORMAT, BOOK_METADATA.pack(5, 3, 0))
+        book = CCOpeningBook(self.path)
+        self.assertIsNone(book.probe(game))
+        book.close()
+
+    def test_strategy(self):
+        game = CCGame(width=5, player_row_span=3)
+        strategy = MinMaxStrategy(steps=1, opening_book=self.path)
+        strategy.select_move(game, 1)
+        self.assertEqual(1, strategy.opening_book.hits)
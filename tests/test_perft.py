@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+import constants
+from chinese_checkers.bitboard_game import CCBitboardGame
+from chinese_checkers.perft import (
+    PERFT_VERSION, divide, load_game, load_reference, perft, save_reference
+)
+
+
+class TestPerft(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = {position['name']: position
+                         for position in load_reference()}
+
+    def test_reference_boards(self):
+        # (other tests play on the boards of constants, compare names only)
+        for name in dir(constants):
+            if name.startswith('TEST_BOARD'):
+                self.assertIn(name, self.positions)
+
+    def test_counts(self):
+        for name, position in self.positions.items():
+            for generator in ['available', 'packed']:
+                game = load_game(position)
+                counts = [perft(game, depth, generator)
+                          for depth in range(1, 3)]
+                self.assertEqual(position['counts'][:2], counts,
+                                 f'{name} {generator}')
+
+    def test_counts_bitboard(self):
+        position = self.positions['TEST_BOARD_VA_1_1']
+        game = load_game(position, CCBitboardGame)
+        self.assertEqual(position['counts'][2], perft(game, 3, 'packed'))
+
+    def test_game_restored(self):
+        game = load_game(self.positions['TEST_BOARD_RACE'])
+        board = [list(row) for row in game.board]
+        perft(game, 3)
+        self.assertEqual(board, game.board)
+        self.assertEqual(1, game.player_turn)
+        self.assertEqual([], game.move_history)
+
+    def test_divide(self):
+        position = self.positions['initial-5-3']
+        moves = divide(load_game(position), 3)
+        self.assertEqual(10, len(moves))
+        self.assertEqual(position['counts'][2], sum(moves.values()))
+
+    def test_won_game(self):
+        game = load_game(self.positions['TEST_BOARD_PLAYER_1_WINS'])
+        self.assertEqual(1, perft(game, 0))
+        self.assertEqual(0, perft(game, 1))
+        self.assertEqual({}, divide(game, 2))
+
+    def test_version(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            save_reference(list(self.positions.values()), path)
+            with open(path) as reference_file:
+                self.assertEqual(PERFT_VERSION,
+                                 json.load(reference_file)['version'])
+            self.assertEqual(list(self.positions.values()),
+                             load_reference(path))
+
+            with open(path, 'w') as reference_file:
+                json.dump({'version': PERFT_VERSION + 1, 'positions': []},
+                          reference_file)
+            with self.assertRaises(ValueError):
+                load_reference(path)
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.ponder import CCPonderer
+
+from constants import TEST_BOARD_VA_1_1
+
+
+class TestCCPonderer(unittest.TestCase):
+
+    def _start_pondering(self):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_VA_1_1)
+        strategy = MinMaxStrategy(steps=1,
+                                  pre_sort_moves=True,
+                                  transposition_table=True)
+        ponderer = CCPonderer(strategy)
+        game.apply_move_sequence(strategy.select_move(game, 1))
+        board = [list(row) for row in game.board]
+        ponderer.start(game, 1)
+        # pondering doesn't modify the game
+        self.assertEqual(board, game.board)
+        return game, strategy, ponderer
+
+    def test_ponder_hit(self):
+        game, strategy, ponderer = self._start_pondering()
+        # the opponent takes long enough to complete the search
+        ponderer.thread.join()
+        expected = strategy.unpack_move(game,
+                                        strategy.principal_variation[1])
+        game.apply_move_sequence(expected)
+
+        move = ponderer.result(game)
+        self.assertIn(move, strategy.available_moves(game, 1))
+        self.assertEqual({'ponders': 1, 'hits': 1, 'hit_rate': 1.0},
+                         ponderer.stats())
+        # the counters are the ones of the ponder search
+        self.assertEqual('ponder', strategy.search_stats.source)
+        self.assertTrue(strategy.search_stats.nodes > 0)
+        # the ponder search warmed the table of the strategy
+        self.assertTrue(strategy.tt.stats()['stores'] > 0)
+
+    def test_ponder_miss(self):
+        game, strategy, ponderer = self._start_pondering()
+        expected = strategy.unpack_move(game,
+                                        strategy.principal_variation[1])
+        replies = strategy.available_moves(game, 2)
+        game.apply_move_sequence(
+            next(move for move in replies if move != expected))
+
+        self.assertIsNone(ponderer.result(game))
+        self.assertEqual({'ponders': 1, 'hits': 0, 'hit_rate': 0.0},
+                         ponderer.stats())
@@ -0,0 +1,96 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.only_max_strategy import OnlyMaxStrategy
+from chinese_checkers.strategy.profiler import (
+    CCSearchProfiler, search_profiler
+)
+from constants import TEST_BOARD_VA_1_1
+
+
+class TestCCSearchProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'profile')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def search(self, profiler: CCSearchProfiler, strategy: MinMaxStrategy):
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board([list(row) for row in TEST_BOARD_VA_1_1])
+        return profiler.run(strategy.select_move, game, 1)
+
+    def test_sample(self):
+        profiler = CCSearchProfiler('sample', interval=0.0005,
+                                    output=self.output, top=5)
+        strategy = MinMaxStrategy(steps=1, profile='')
+        self.search(profiler, strategy)
+        self.search(profiler, strategy)
+        self.assertEqual(2, profiler.calls)
+        self.assertTrue(profiler.stacks)
+        # stacks start at the profiled call
+        for stack in profiler.stacks:
+            self.assertTrue(stack[0].startswith('select_move '), stack)
+
+        samples, functions = profiler.hot_functions()
+        self.assertEqual(sum(profiler.stacks.values()), samples)
+        self.assertEqual(samples, sum(own for _, own, _ in functions))
+        self.assertTrue(all(own <= below for _, own, below in functions))
+
+        profiler.write()
+        with open(f'{self.output}.collapsed') as collapsed:
+            lines = collapsed.read().splitlines()
+        self.assertEqual(len(profiler.stacks), len(lines))
+        self.assertEqual(samples,
+                         sum(int(line.rsplit(' ', 1)[1]) for line in lines))
+        with open(f'{self.output}.txt') as summary:
+            self.assertEqual(2 + 5, len(summary.read().splitlines()))
+
+    def test_cprofile(self):
+        profiler = CCSearchProfiler('cprofile', output=self.output)
+        strategy = MinMaxStrategy(steps=1, profile='')
+        self.search(profiler, strategy)
+        self.search(profiler, strategy)
+        profiler.write()
+        stats = pstats.Stats(f'{self.output}.prof')
+        calls = {function[2]: stat[1]
+                 for function, stat in stats.stats.items()}
+        self.assertEqual(2, calls['select_move'])
+        self.assertTrue(calls['_select_move'] > 2)
+
+    def test_nothing_profiled(self):
+        profiler = CCSearchProfiler('sample', output=self.output)
+        profiler.write()
+        self.assertFalse(os.listdir(self.directory.name))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            CCSearchProfiler('trace')
+        with self.assertRaises(ValueError):
+            MinMaxStrategy(profile='trace')
+        with self.assertRaises(ValueError):
+            OnlyMaxStrategy(1, profile='trace')
+
+    def test_strategies(self):
+        """searches of all the strategies go to the same profiler, the
+        search of OnlyMaxStrategy being part of the one of MinMaxStrategy"""
+        profiler = search_profiler('cprofile')
+        try:
+            game = CCGame(width=7, player_row_span=3)
+            MinMaxStrategy(steps=1, profile='cprofile').select_move(game, 1)
+            self.assertEqual(1, profiler.calls)
+            OnlyMaxStrategy(1, profile='cprofile').select_move(game, 1)
+            self.assertEqual(2, profiler.calls)
+        finally:
+            # nothing to write when the tests exit
+            profiler.reset()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from chinese_checkers.record_file import CCRecordFile, write_record_file
+
+
+class TestCCRecordFile(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_get(self):
+        records = [((key * 7919) % 1000, key) for key in range(0, 1000)]
+        write_record_file(self.path, records, 'I', b'meta')
+        records_file = CCRecordFile(self.path)
+        self.assertEqual(1000, len(records_file))
+        self.assertEqual(b'meta', records_file.metadata[:4])
+        for key, value in records:
+            self.assertEqual((value,), records_file.get(key))
+        self.assertIsNone(records_file.get(1000))
+        self.assertIsNone(records_file.get(2 ** 64 - 1))
+        records_file.close()
+
+    def test_empty(self):
+        write_record_file(self.path, [], 'B')
+        records_file = CCRecordFile(self.path)
+        self.assertEqual(0, len(records_file))
+        self.assertIsNone(records_file.get(0))
+        records_file.close()
+
+    def test_duplicated_keys(self):
+        with self.assertRaises(ValueError):
+            write_record_file(self.path, [(1, 1), (2, 2), (1, 3)], 'I')
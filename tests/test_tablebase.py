@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+
+from chinese_checkers.build_tablebase import build
+from chinese_checkers.game import CCGame
+from chinese_checkers.record_file import write_record_file
+from chinese_checkers.strategy.min_max_strategy import (
+    MinMaxStrategy, RACE_SCORE
+)
+from chinese_checkers.strategy.tablebase import (
+    TABLEBASE_METADATA, TABLEBASE_VALUE_FORMAT, CCRaceTablebase,
+    race_geometry
+)
+from chinese_checkers.strategy.transposition_table import (
+    WIN_SCORE_THRESHOLD
+)
+from constants import TEST_BOARD_RACE
+
+
+class TestCCRaceTablebase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp()
+        os.close(handle)
+        distances = build(width=5, player_row_span=3, max_distance=7,
+                          workers=2)
+        write_record_file(cls.path, distances.items(),
+                          TABLEBASE_VALUE_FORMAT,
+                          TABLEBASE_METADATA.pack(5, 3, 7))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def setUp(self):
+        self.tablebase = CCRaceTablebase(self.path)
+        self.game = CCGame(width=5, player_row_span=3)
+        self.game.set_board([list(row) for row in TEST_BOARD_RACE])
+
+    def tearDown(self):
+        self.tablebase.close()
+
+    def test_distance(self):
+        race = race_geometry(5, 3)
+        self.assertEqual(0, self.tablebase.distance(race.goal))
+        # starting positions are further than the maximum distance
+        start = race.mirror_mask(race.goal)
+        self.assertIsNone(self.tablebase.distance(start))
+
+    def test_race_distances(self):
+        self.assertEqual((7, 5), self.tablebase.race_distances(self.game))
+        # players not separated yet
+        game = CCGame(width=5, player_row_span=3)
+        self.assertIsNone(self.tablebase.race_distances(game))
+        # other board sizes are never in the tablebase
+        game = CCGame(width=7, player_row_span=3)
+        self.assertIsNone(self.tablebase.race_distances(game))
+
+    def test_best_move(self):
+        strategy = MinMaxStrategy()
+        for player in [1, 2]:
+            game = CCGame(width=5, player_row_span=3)
+            game.set_board([list(row) for row in TEST_BOARD_RACE])
+            game.player_turn = player
+            distance = self.tablebase.race_distances(game)[player - 1]
+            move = self.tablebase.best_move(game, player)
+            game.apply_move_sequence(strategy.unpack_move(game, move))
+            self.assertEqual(
+                distance - 1,
+                self.tablebase.race_distances(game)[player - 1])
+
+    def test_tablebase_score(self):
+        strategy = MinMaxStrategy(tablebase=self.path)
+        # player 2 wins with its fifth move, at depth 9 when player 1 moves
+        # at the root
+        self.assertEqual(-RACE_SCORE / 10,
+                         strategy._tablebase_score(self.game, 1, 0))
+        self.game.player_turn = 2
+        self.assertEqual(RACE_SCORE / 9,
+                         strategy._tablebase_score(self.game, 2, 0))
+        self.assertEqual(-RACE_SCORE / 10,
+                         strategy._tablebase_score(self.game, 2, 1))
+        # races are not proven wins
+        self.assertTrue(RACE_SCORE / 2 < WIN_SCORE_THRESHOLD)
+        strategy.close()
+
+    def test_tablebase_score_tt(self):
+        """scores of races are relative to the root, so a position
+        searched from another root must not reuse them"""
+        # one move of player 2 away from the race
+        self.game.board[2][1] = 0
+        self.game.board[4][3] = 2
+        self.game.set_board(self.game.board)
+        self.game.player_turn = 2
+        self.assertIsNone(self.tablebase.race_distances(self.game))
+        strategy = MinMaxStrategy(steps=0, transposition_table=True,
+                                  tablebase=self.path)
+        strategy.max_depth = 1
+        strategy._prepare_search(self.game)
+        strategy._select_move(self.game, 2, 0, -100000.0, 100000.0)
+        # the same position, two plies away from another root
+        scores = []
+        for search_strategy in [strategy,
+                                MinMaxStrategy(steps=0,
+                                               transposition_table=True,
+                                               tablebase=self.path)]:
+            search_strategy.max_depth = 3
+            search_strategy._prepare_search(self.game)
+            scores.append(search_strategy._select_move(
+                self.game, 2, 2, -100000.0, 100000.0)[1])
+            search_strategy.close()
+        self.assertEqual(RACE_SCORE / 13, scores[1])
+        self.assertEqual(scores[1], scores[0])
+
+    def test_board_size(self):
+        """placements of boards of more than 64 cells can't be stored"""
+        with self.assertRaises(ValueError):
+            build(width=9, player_row_span=3, max_distance=1)
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        write_record_file(path, [], TABLEBASE_VALUE_FORMAT,
+                          TABLEBASE_METADATA.pack(9, 3, 1))
+        with self.assertRaises(ValueError):
+            CCRaceTablebase(path)
+        os.remove(path)
+
+    def test_strategy_race(self):
+        strategies = {player: MinMaxStrategy(tablebase=self.path)
+                      for player in [1, 2]}
+        turns = 0
+        while self.game.state() == 0:
+            player = self.game.player_turn
+            self.game.apply_move_sequence(
+                strategies[player].select_move(self.game, player))
+            turns += 1
+        self.assertEqual(2, self.game.state())
+        # player 1 moves first
+        self.assertEqual(10, turns)
+        self.assertEqual(10, strategies[1].tablebase.hits +
+                         strategies[2].tablebase.hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
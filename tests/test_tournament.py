@@ -0,0 +1,90 @@
+import io
+import json
+import unittest
+
+from chinese_checkers.tournament import elo_ratings, run, schedule
+
+ENGINES = {
+    'steps_0': {'steps': 0},
+    'steps_1': {'steps': 1, 'pre_sort_moves': True},
+    'steps_1_tt': {'steps': 1, 'pre_sort_moves': True,
+                   'transposition_table': True,
+                   'tt_memory_budget': 64 * 1024,
+                   'weights': [0.13, 0.53, 0.29, 0.05]},
+}
+
+
+def record(player_1: str, player_2: str, result: int) -> dict:
+    return {'player_1': player_1, 'player_2': player_2, 'result': result}
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_schedule(self):
+        names = list(ENGINES)
+        games = schedule(names, False, [(5, 3), (7, 3)], 2, 2, 1)
+        # 3 pairings, 2 boards, 2 rounds, 2 colors
+        self.assertEqual(3 * 2 * 2 * 2, len(games))
+        for game, swapped in zip(games[0::2], games[1::2]):
+            self.assertEqual((game[1], game[0]), swapped[:2])
+            # same board and opening
+            self.assertEqual(game[2:], swapped[2:])
+            self.assertEqual(2, len(game[4]))
+        self.assertNotEqual(games[0][4], games[2][4])
+        self.assertEqual(games, schedule(names, False, [(5, 3), (7, 3)],
+                                         2, 2, 1))
+
+        gauntlet = schedule(names, True, [(5, 3)], 1, 0, 1)
+        self.assertEqual([('steps_0', 'steps_1'), ('steps_1', 'steps_0'),
+                          ('steps_0', 'steps_1_tt'),
+                          ('steps_1_tt', 'steps_0')],
+                         [game[:2] for game in gauntlet])
+
+    def test_elo_ratings(self):
+        names = ['a', 'b', 'c']
+        records = (
+            [record('a', 'b', 1), record('b', 'a', 2)] * 6 +
+            [record('a', 'b', 2)] * 2 +
+            [record('b', 'c', 0), record('c', 'b', 0)] * 4 +
+            [record('a', 'c', 1)] * 4)
+        ratings = elo_ratings(names, records, samples=100)
+        self.assertTrue(ratings['a'][0] > ratings['b'][0] >
+                        ratings['c'][0])
+        self.assertAlmostEqual(0.0, sum(rating for rating, _, _ in
+                                        ratings.values()))
+        for rating, lower, upper in ratings.values():
+            self.assertTrue(lower <= rating <= upper)
+
+        # all draws: same ratings, even with a player that wins or loses
+        # every game (still finite)
+        ratings = elo_ratings(['a', 'b'], [record('a', 'b', 0)] * 4)
+        self.assertAlmostEqual(ratings['a'][0], ratings['b'][0])
+        ratings = elo_ratings(['a', 'b'], [record('a', 'b', 1)] * 4)
+        self.assertTrue(0 < ratings['a'][0] < 1000)
+
+    def test_run(self):
+        """results and moves don't depend on the number of workers"""
+        engines = {name: ENGINES[name] for name in ['steps_0', 'steps_1']}
+        output = io.StringIO()
+        records = run(engines, False, [(5, 1)], 1, 2, output)
+        lines = [json.loads(line)
+                 for line in output.getvalue().splitlines()]
+        self.assertEqual(2, len(records))
+        self.assertEqual(records,
+                         sorted(lines, key=lambda line: line['game']))
+        for game in records:
+            self.assertIn(game['result'], [0, 1, 2])
+            self.assertEqual(len(game['moves']), len(game['move_stats']))
+            players = [stats['player'] for stats in game['move_stats']]
+            # (the opening has an even number of moves)
+            self.assertEqual([1 + i % 2 for i in range(0, len(players))],
+                             players)
+
+        sequential = run(engines, False, [(5, 1)], 1, 1, io.StringIO())
+        for game, game_sequential in zip(records, sequential):
+            self.assertEqual(game['moves'], game_sequential['moves'])
+            self.assertEqual(game['result'], game_sequential['result'])
+
+
+if __name__ == '__main__':
+    unittest.main()
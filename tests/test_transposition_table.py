@@ -0,0 +1,77 @@
+import unittest
+
+from chinese_checkers.game import CCGame
+from chinese_checkers.strategy.min_max_strategy import MinMaxStrategy
+from chinese_checkers.strategy.transposition_table import (
+    CCTranspositionTable, to_tt_score, from_tt_score
+)
+
+from constants import TEST_BOARD_VA_1_1
+
+SLOT_SIZE = CCTranspositionTable.SLOT_SIZE
+
+
+class TestCCTranspositionTable(unittest.TestCase):
+
+    def test_store_probe(self):
+        tt = CCTranspositionTable(1024)
+        self.assertIsNone(tt.probe(1234))
+        tt.store(1234, 42, 0.5, 2, tt.LOWER_BOUND)
+        self.assertEqual((42, 0.5, 2, tt.LOWER_BOUND), tt.probe(1234))
+        self.assertEqual(2, tt.stats()['probes'])
+        self.assertEqual(1, tt.stats()['hits'])
+
+    def test_memory_budget(self):
+        tt = CCTranspositionTable(1024 * SLOT_SIZE)
+        self.assertEqual(512, tt.n_buckets)
+
+    def test_depth_preferred_replacement(self):
+        tt = CCTranspositionTable(2 * SLOT_SIZE)
+        self.assertEqual(1, tt.n_buckets)
+        tt.store(1, 10, 0.1, 4, tt.EXACT)
+        # shallower search for another position goes to the
+        # always-replace slot
+        tt.store(2, 20, 0.2, 1, tt.EXACT)
+        tt.store(3, 30, 0.3, 1, tt.EXACT)
+        self.assertEqual(10, tt.probe(1)[0])
+        self.assertIsNone(tt.probe(2))
+        self.assertEqual(30, tt.probe(3)[0])
+        # deeper searches replace it
+        tt.store(4, 40, 0.4, 5, tt.EXACT)
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual(40, tt.probe(4)[0])
+
+    def test_aging(self):
+        tt = CCTranspositionTable(2 * SLOT_SIZE)
+        tt.store(1, 10, 0.1, 4, tt.EXACT)
+        tt.new_search()
+        tt.store(2, 20, 0.2, 1, tt.EXACT)
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual(20, tt.probe(2)[0])
+
+    def test_win_scores(self):
+        # win at depth 3 from the root, seen from depth 1
+        score = 100000 / (3 + 1)
+        self.assertEqual(100000 / (2 + 1), to_tt_score(score, 1))
+        self.assertEqual(score, from_tt_score(to_tt_score(score, 1), 1))
+        self.assertEqual(-100000 / (5 + 1),
+                         from_tt_score(to_tt_score(-score, 1), 3))
+        self.assertEqual(0.25, to_tt_score(0.25, 3))
+
+    def test_strategy_scores(self):
+        """bounds stored after alpha-beta cutoffs must not change the
+        score of the search"""
+        game = CCGame(width=5, player_row_span=3)
+        game.set_board(TEST_BOARD_VA_1_1)
+        strategy = MinMaxStrategy(steps=2, pre_sort_moves=True)
+        strategy_tt = MinMaxStrategy(steps=2,
+                                     pre_sort_moves=True,
+                                     transposition_table=True)
+        strategy_tt.select_move(game, 1)
+        # fresh search (a new position with the same table)
+        game.rotate_turn()
+        strategy_tt.tt.new_search()
+        _, score = strategy._select_move(game, 2, 0, -100000, 100000)
+        _, score_tt = strategy_tt._select_move(game, 2, 0, -100000, 100000)
+        self.assertEqual(score, score_tt)
+        self.assertTrue(strategy_tt.tt.stats()['cutoffs'] > 0)
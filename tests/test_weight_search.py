@@ -0,0 +1,61 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from chinese_checkers.weight_search import (
+    CHECKPOINT_VERSION, GENERATION_SIZE, genetic_search, load_checkpoint
+)
+
+
+class TestWeightSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def search(self, name: str, **kwargs) -> dict:
+        # (one piece per player, quick games)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return genetic_search(os.path.join(self.directory.name, name),
+                                  width=5, player_row_span=1, **kwargs)
+
+    def test_resume(self):
+        """the results don't depend on the number of workers, nor on
+        being interrupted"""
+        checkpoint = self.search('parallel.json', generations=2, workers=2)
+        self.assertEqual(2, checkpoint['generation'])
+        self.assertEqual(2, len(checkpoint['history']))
+        self.assertEqual(GENERATION_SIZE, len(checkpoint['population']))
+        self.assertEqual(
+            checkpoint,
+            load_checkpoint(os.path.join(self.directory.name,
+                                         'parallel.json')))
+
+        resumed = self.search('resumed.json', generations=1, workers=1)
+        self.assertEqual(1, resumed['generation'])
+        resumed = self.search('resumed.json', generations=2, workers=1)
+        self.assertEqual(checkpoint, resumed)
+
+        # nothing left to play
+        self.assertEqual(checkpoint,
+                         self.search('resumed.json', generations=2))
+
+    def test_time_budget(self):
+        checkpoint = self.search('budget.json', time_budget=0.0)
+        self.assertEqual(1, checkpoint['generation'])
+
+    def test_checkpoint_version(self):
+        path = os.path.join(self.directory.name, 'old.json')
+        with open(path, 'w') as checkpoint_file:
+            json.dump({'version': CHECKPOINT_VERSION + 1}, checkpoint_file)
+        with self.assertRaises(ValueError):
+            self.search('old.json', generations=1)
+
+
+if __name__ == '__main__':
+    unittest.main()